@@ -2,7 +2,12 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.db.models import Count
 from django.utils.html import format_html
-from .models import ProductCategory, Product,ContactMessage
+from .models import ProductCategory, Product,ContactMessage, DailySales
+from .models import Order, OrderItem, OrderStatusEvent, Payment, Cart, CartItem
+from .analytics import dashboard, weight_label
+from .cart import recalculate_totals
+from .orders import set_status
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(ProductCategory)
@@ -26,7 +31,7 @@ class ProductCategoryAdmin(admin.ModelAdmin):
         try:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit:cover" />', 
-                obj.image.url
+                obj.thumbnail_url(50)
             ) if obj.image else ""
         except:
             return ""
@@ -37,6 +42,7 @@ class ProductCategoryAdmin(admin.ModelAdmin):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('title', 'category','base_price', 'price_display', 'weight_options_display', 'is_featured', 'image_preview')
     list_filter = ('category', 'is_featured', 'created_at')
+    list_select_related = ('category',)
     search_fields = ('title', 'description', 'detailed_description', 'ingredients','nutrition_info')
     list_editable = ('is_featured',)
     prepopulated_fields = {'slug': ('title',)}
@@ -86,7 +92,7 @@ class ProductAdmin(admin.ModelAdmin):
         try:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit:cover" />', 
-                obj.image.url
+                obj.thumbnail_url(50)
             ) if obj.image else ""
         except:
             return ""
@@ -106,4 +112,168 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
 
 
-       
\ No newline at end of file
+       
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    """
+    The sales dashboard: read-only rollup rows (kept by the ``rollup_sales``
+    command) with totals and best sellers for the selected dates above them.
+    """
+    list_display = ('day', 'dimension', 'label', 'orders', 'units', 'weight_sold', 'revenue')
+    search_fields = ('label',)
+    date_hierarchy = 'day'
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def weight_sold(self, obj):
+        return weight_label(obj.grams)
+    weight_sold.short_description = 'Weight'
+    weight_sold.admin_order_field = 'grams'
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None:
+            response.context_data['sales'] = dashboard(changelist.queryset)
+        return response
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelists for tables that grow with every order: no full-table
+    ``COUNT(*)`` per page view, and raw id inputs instead of select boxes
+    listing every product or user.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+def status_action(status, label):
+    """Admin action moving the selected orders to ``status`` in bulk."""
+    def action(modeladmin, request, queryset):
+        changed = set_status(queryset, status)
+        modeladmin.message_user(request, f"{changed} orders marked {label.lower()}.")
+    action.__name__ = f'mark_{status}'
+    return admin.action(description=f"Mark selected orders {label.lower()}")(action)
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    raw_id_fields = ('product',)
+    extra = 0
+
+
+class OrderStatusEventInline(admin.TabularInline):
+    model = OrderStatusEvent
+    fields = ('status', 'created_at')
+    readonly_fields = ('status', 'created_at')
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ('tracking_id', 'order_date', 'customer_name', 'user', 'status', 'payment_method', 'total_amount')
+    list_select_related = ('user',)
+    # Both served by the (status, -order_date) and (-order_date) indexes.
+    list_filter = ('status', 'order_date')
+    search_fields = ('=tracking_id', '=customer_mobile')
+    raw_id_fields = ('user',)
+    readonly_fields = ('tracking_id', 'order_date')
+    inlines = (OrderItemInline, OrderStatusEventInline)
+    actions = [status_action(status, label) for status, label in Order.ORDER_STATUSES if status != 'pending']
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(LargeTableAdmin):
+    list_display = ('order', 'product', 'weight', 'quantity', 'unit_price')
+    list_select_related = ('order', 'product')
+    search_fields = ('=order__tracking_id',)
+    raw_id_fields = ('order', 'product')
+
+
+@admin.register(Payment)
+class PaymentAdmin(LargeTableAdmin):
+    list_display = ('order', 'amount', 'status', 'payment_date', 'transaction_id')
+    list_filter = ('status', 'payment_date')
+    search_fields = ('=transaction_id', '=order__tracking_id')
+    raw_id_fields = ('order',)
+    actions = ['mark_completed', 'mark_failed', 'mark_refunded']
+
+    def _mark(self, request, queryset, status):
+        changed = queryset.exclude(status=status).update(status=status)
+        self.message_user(request, f"{changed} payments marked {status}.")
+
+    @admin.action(description="Mark selected payments completed")
+    def mark_completed(self, request, queryset):
+        self._mark(request, queryset, 'completed')
+
+    @admin.action(description="Mark selected payments failed")
+    def mark_failed(self, request, queryset):
+        self._mark(request, queryset, 'failed')
+
+    @admin.action(description="Mark selected payments refunded")
+    def mark_refunded(self, request, queryset):
+        self._mark(request, queryset, 'refunded')
+
+
+class CartItemInline(admin.TabularInline):
+    model = CartItem
+    raw_id_fields = ('product',)
+    extra = 0
+
+
+@admin.register(Cart)
+class CartAdmin(LargeTableAdmin):
+    list_display = ('id', 'user', 'item_count', 'subtotal', 'updated_at')
+    list_select_related = ('user',)
+    list_filter = ('updated_at',)
+    raw_id_fields = ('user',)
+    readonly_fields = ('subtotal', 'item_count')
+    inlines = (CartItemInline,)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        recalculate_totals(form.instance)
+
+
+@admin.register(CartItem)
+class CartItemAdmin(LargeTableAdmin):
+    list_display = ('cart', 'product', 'weight', 'quantity', 'price', 'added_at')
+    list_select_related = ('product',)
+    raw_id_fields = ('cart', 'product')
+
+    # Edits here bypass bakery.cart, so the affected carts' stored totals are
+    # recomputed afterwards.
+    def _recalculate(self, cart_ids):
+        for cart in Cart.objects.filter(pk__in=cart_ids):
+            recalculate_totals(cart)
+
+    def save_model(self, request, obj, form, change):
+        previous = form.initial.get('cart')
+        super().save_model(request, obj, form, change)
+        self._recalculate({obj.cart_id, previous})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._recalculate({obj.cart_id})
+
+    def delete_queryset(self, request, queryset):
+        cart_ids = set(queryset.values_list('cart_id', flat=True))
+        super().delete_queryset(request, queryset)
+        self._recalculate(cart_ids)
+
@@ -0,0 +1,195 @@
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySales, Order, OrderItem, OrderStatusEvent, RollupWatermark
+from .pricing import format_weight, parse_weight
+
+WATERMARK = 'sales'
+BATCH_SIZE = 5000
+# Events younger than this may still have lower-id neighbours in flight
+# (uncommitted transactions); they wait for the next run.
+SETTLE_TIME = timedelta(minutes=1)
+DASHBOARD_TOP = 10
+DASHBOARD_DAYS = 31
+
+MEASURES = ('orders', 'units', 'grams', 'revenue')
+
+
+def _counted(status):
+    """Whether an order in ``status`` belongs in the sales figures."""
+    return status is not None and status != 'cancelled'
+
+
+def _previous_statuses(order_ids, before_id):
+    """Each order's status just before event ``before_id``; missing if it had none."""
+    latest = (
+        OrderStatusEvent.objects.filter(order_id__in=order_ids, id__lt=before_id)
+        .values('order_id')
+        .annotate(latest_id=Max('id'))
+        .values('latest_id')
+    )
+    return dict(OrderStatusEvent.objects.filter(id__in=latest).values_list('order_id', 'status'))
+
+
+def order_signs(events):
+    """
+    ``{order_id: +1 or -1}`` for the orders that id-ordered ``events``
+    (``(id, order_id, status)``) bring into or take out of the figures: a
+    placed order counts, a cancelled one is taken back out.
+    """
+    statuses = _previous_statuses({order_id for _, order_id, _ in events}, events[0][0])
+    signs = {}
+    for _, order_id, status in events:
+        previous = statuses.get(order_id)
+        signs[order_id] = signs.get(order_id, 0) + _counted(status) - _counted(previous)
+        statuses[order_id] = status
+    return {order_id: sign for order_id, sign in signs.items() if sign}
+
+
+def line_grams(weight, quantity):
+    """
+    Whole grams sold by one order line.  Rounded per line, so taking a
+    cancelled order back out subtracts exactly what placing it added.
+    """
+    grams = parse_weight(weight)
+    if grams is None:
+        return 0
+    return int((grams * quantity).to_integral_value(ROUND_HALF_UP))
+
+
+def sales_deltas(signs):
+    """
+    ``{(dimension, day, key): {label, orders, units, grams, revenue}}``:
+    what the order lines of ``signs`` add to (or take from) each rollup row.
+    """
+    payment_labels = dict(Order.PAYMENT_METHODS)
+    lines = (
+        OrderItem.objects.filter(order_id__in=signs)
+        .annotate(day=TruncDate('order__order_date'))
+        .values_list(
+            'order_id', 'day', 'order__payment_method', 'order__delivery_location',
+            'product_id', 'product__title', 'product__category_id', 'product__category__name',
+            'quantity', 'unit_price', 'weight',
+        )
+        .iterator(chunk_size=2000)
+    )
+    deltas = {}
+    for (order_id, day, method, location, product_id, title, category_id, category,
+         quantity, unit_price, weight) in lines:
+        sign = signs[order_id]
+        keys = (
+            ('product', product_id, title),
+            ('category', category_id, category),
+            ('payment', method, payment_labels.get(method, method)),
+            ('location', location, location),
+        )
+        for dimension, key, label in keys:
+            row = deltas.setdefault((dimension, day, str(key)), {
+                'label': label, 'orders': set(), 'units': 0, 'grams': 0, 'revenue': Decimal('0.00'),
+            })
+            row['orders'].add(order_id)
+            row['units'] += sign * quantity
+            row['grams'] += sign * line_grams(weight, quantity)
+            row['revenue'] += sign * quantity * unit_price
+    for row in deltas.values():
+        row['orders'] = sum(signs[order_id] for order_id in row['orders'])
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Add ``deltas`` to the stored rows: one read, then bulk updates and inserts."""
+    days = {day for _, day, _ in deltas}
+    keys = {key for _, _, key in deltas}
+    existing = {
+        (row.dimension, row.day, row.key): row
+        for row in DailySales.objects.filter(day__in=days, key__in=keys)
+    }
+    changed, created = [], []
+    for (dimension, day, key), delta in deltas.items():
+        row = existing.get((dimension, day, key))
+        if row is None:
+            row = DailySales(dimension=dimension, day=day, key=key)
+            created.append(row)
+        else:
+            changed.append(row)
+        row.label = delta['label']
+        for measure in MEASURES:
+            setattr(row, measure, getattr(row, measure) + delta[measure])
+    DailySales.objects.bulk_update(changed, ['label', *MEASURES], batch_size=1000)
+    DailySales.objects.bulk_create(created, batch_size=1000)
+
+
+def rollup(batch_size=BATCH_SIZE, settle_time=SETTLE_TIME):
+    """
+    Fold the order status events recorded since the watermark into
+    ``DailySales``, ``batch_size`` events per transaction.  Returns the
+    number of events read.
+    """
+    read = 0
+    while True:
+        cutoff = timezone.now() - settle_time
+        with transaction.atomic():
+            watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+            events = []
+            for event_id, order_id, status, created_at in (
+                OrderStatusEvent.objects.filter(id__gt=watermark.position)
+                .order_by('id')
+                .values_list('id', 'order_id', 'status', 'created_at')[:batch_size]
+            ):
+                if created_at > cutoff:
+                    break
+                events.append((event_id, order_id, status))
+            if not events:
+                return read
+            signs = order_signs(events)
+            if signs:
+                apply_deltas(sales_deltas(signs))
+            watermark.position = events[-1][0]
+            watermark.save(update_fields=['position', 'updated_at'])
+        read += len(events)
+
+
+def reset():
+    """Drop every rollup row and rewind the watermark, for a full rebuild."""
+    with transaction.atomic():
+        DailySales.objects.all().delete()
+        RollupWatermark.objects.filter(name=WATERMARK).update(position=0)
+
+
+def weight_label(grams):
+    return format_weight(grams) if grams and grams > 0 else '-'
+
+
+def dashboard(queryset, top=DASHBOARD_TOP, days=DASHBOARD_DAYS):
+    """
+    The sales dashboard for the ``DailySales`` rows in ``queryset``: totals,
+    the best sellers of every dimension and revenue per day.  Every figure
+    is an aggregate over rollup rows, never over orders.
+    """
+    sums = {f'total_{measure}': Sum(measure) for measure in MEASURES}
+    # Every order line is in exactly one payment-method row.
+    per_order = queryset.filter(dimension='payment')
+    totals = per_order.aggregate(**sums)
+    totals['weight'] = weight_label(totals['total_grams'])
+    leaders = [
+        (label, list(
+            queryset.filter(dimension=dimension)
+            .values('key')
+            .annotate(name=Max('label'), **sums)
+            .order_by('-total_revenue')[:top]
+        ))
+        for dimension, label in DailySales.DIMENSIONS
+    ]
+    for _, rows in leaders:
+        for row in rows:
+            row['weight'] = weight_label(row['total_grams'])
+    by_day = list(per_order.values('day').annotate(**sums).order_by('-day')[:days])
+    busiest = max((day['total_revenue'] for day in by_day), default=0) or 1
+    for day in by_day:
+        day['share'] = round(100 * day['total_revenue'] / busiest)
+    return {'totals': totals, 'leaders': leaders, 'by_day': by_day}
@@ -3,5 +3,8 @@ from django.apps import AppConfig
 class BakeryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bakery'
+
+    def ready(self):
+        from . import signals  # noqa: F401
     
    
\ No newline at end of file
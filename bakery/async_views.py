@@ -0,0 +1,133 @@
+"""
+Async versions of the catalogue, search and wishlist pages, routed instead of
+their counterparts in ``bakery.views`` when ``settings.ASYNC_VIEWS`` is on
+(the default under ``bakeryproducts.asgi``).  Queries that have an async
+API run on the event loop; templates, the FTS5 search and the product form
+post go through ``sync_to_async``.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, render
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+from urllib.parse import urlencode
+
+from . import recommend
+from .catalogue import catalogue_version, get_catalogue
+from .conditional import category_validators, condition, product_validators
+from .models import Product, ProductCategory, Wishlist
+from .pagination import KeysetPage, seek
+from .views import _product_detail_post, _search_page
+
+# Templates are rendered in the request's sync thread: context processors
+# and lazy template variables may still touch the database.
+arender = sync_to_async(render)
+arender_to_string = sync_to_async(render_to_string)
+
+@login_required(login_url='login')
+async def wishlist_view(request):
+    user = await request.auser()
+    items = [
+        item async for item in
+        Wishlist.objects.filter(user=user).select_related('product__category')
+    ]
+    return await arender(request, 'bakery/wishlist.html', {'wishlist_items': items})
+
+async def all_products(request):
+    return await arender(request, 'bakery/products.html', {
+        'catalogue_version': await sync_to_async(catalogue_version)(),
+        'categories': SimpleLazyObject(lambda: get_catalogue().categories),
+    })
+
+async def _category_page(category, cursor):
+    rows = [
+        product async for product in
+        seek(Product.objects.filter(category=category).select_related('category'), cursor)
+    ]
+    return KeysetPage(rows)
+
+@condition(category_validators)
+async def category_products(request, slug):
+    category = await aget_object_or_404(ProductCategory, slug=slug)
+    products = await _category_page(category, request.GET.get('cursor'))
+
+    return await arender(request, 'bakery/category_products.html', {
+        'category': category,
+        'products': products
+    })
+
+async def category_products_more(request, slug):
+    """Infinite-scroll fragment: the next page of product cards as HTML."""
+    category = await aget_object_or_404(ProductCategory, slug=slug)
+    products = await _category_page(category, request.GET.get('cursor'))
+    html = await arender_to_string(
+        'bakery/include/category_product_cards.html', {'products': products}, request=request,
+    )
+    next_url = None
+    if products.has_next:
+        next_url = f"{reverse('category_products_more', args=[slug])}?cursor={products.next_cursor}"
+    return JsonResponse({'html': html, 'next': next_url})
+
+@login_required(login_url='login')
+@condition(product_validators)
+async def product_detail(request, category_slug, product_id):
+    product = await aget_object_or_404(
+        Product.objects.select_related('category'),
+        id=product_id,
+        category__slug=category_slug
+    )
+    related_products = [related async for related in recommend.related_products(product)]
+    if not related_products:
+        related_products = [related async for related in recommend.fallback_related(product)]
+
+    if request.method == 'POST':
+        # Session, messages and cart writes stay synchronous.
+        return await sync_to_async(_product_detail_post)(
+            request, product, related_products, category_slug,
+        )
+
+    return await arender(request, 'bakery/product_detail.html', {
+        'product': product,
+        'related_products': related_products,
+        'weight_options': product.weight_list,
+    })
+
+@login_required(login_url='login')
+async def search_products(request):
+    query = request.GET.get('q', '').strip()
+    products = []
+    categories = []
+    page_obj = None
+
+    if query:
+        # The FTS5 count and page queries run as raw SQL through the
+        # paginator, so they go through the sync thread as one unit.
+        page_obj = await sync_to_async(_search_page)(query, request.GET.get('page'))
+        products = page_obj.object_list
+
+        categories = list({product.category_id: product.category for product in products}.values())
+
+    return await arender(request, 'bakery/search_results.html', {
+        'query': query,
+        'products': products,
+        'categories': categories,
+        'page_obj': page_obj,
+    })
+
+@login_required(login_url='login')
+async def search_more(request):
+    """Infinite-scroll fragment: the next page of search results as HTML."""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'html': '', 'next': None})
+
+    page_obj = await sync_to_async(_search_page)(query, request.GET.get('page'))
+    html = await arender_to_string(
+        'bakery/include/search_result_cards.html', {'products': page_obj.object_list}, request=request,
+    )
+    next_url = None
+    if page_obj.has_next():
+        next_url = f"{reverse('search_more')}?{urlencode({'q': query, 'page': page_obj.next_page_number()})}"
+    return JsonResponse({'html': html, 'next': next_url})
@@ -0,0 +1,330 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from . import pricing
+from .models import Cart, CartItem, Product
+
+SESSION_KEY = 'cart'
+LEGACY_SESSION_KEY = 'cart_id'
+MAX_BATCH_SIZE = 100
+
+
+def _adjust_totals(cart_id, amount, count):
+    # Single UPDATE with F() so concurrent changes to one cart cannot
+    # overwrite each other's totals.
+    Cart.objects.filter(pk=cart_id).update(
+        subtotal=F('subtotal') + amount,
+        item_count=F('item_count') + count,
+        updated_at=timezone.now(),
+    )
+
+
+# Backends that support INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+UPSERT_VENDORS = {'sqlite', 'postgresql'}
+
+
+def _upsert_line(cart_id, product_id, weight, quantity, price):
+    """
+    Insert a cart line, or add ``quantity`` to the existing line for the
+    same product and weight, in one statement; the database serialises
+    concurrent adds, so none is lost.  Returns the stored
+    ``(id, quantity, price)``.
+    """
+    table = connection.ops.quote_name(CartItem._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (cart_id, product_id, weight, quantity, price, added_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s) "
+            "ON CONFLICT (cart_id, product_id, weight) "
+            f"DO UPDATE SET quantity = {table}.quantity + excluded.quantity "
+            "RETURNING id, quantity, price",
+            [
+                cart_id, product_id, weight, quantity,
+                connection.ops.adapt_decimalfield_value(price, 10, 2),
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+            ],
+        )
+        line_id, quantity, price = cursor.fetchone()
+    # SQLite hands decimals back as floats.
+    return line_id, quantity, Decimal(str(price)).quantize(pricing.CENT)
+
+
+def _increment_line(cart_id, product_id, weight, quantity, price):
+    """``_upsert_line()`` for other backends: UPDATE, else INSERT, else UPDATE."""
+    line = CartItem.objects.filter(cart_id=cart_id, product_id=product_id, weight=weight)
+    if not line.update(quantity=F('quantity') + quantity):
+        try:
+            with transaction.atomic():
+                item = CartItem.objects.create(
+                    cart_id=cart_id, product_id=product_id, weight=weight,
+                    quantity=quantity, price=price,
+                )
+            return item.pk, item.quantity, item.price
+        except IntegrityError:
+            # Another request inserted the line first.
+            line.update(quantity=F('quantity') + quantity)
+    return line.values_list('id', 'quantity', 'price').get()
+
+
+def add_item(cart, product, weight, quantity, price):
+    """
+    Add ``quantity`` of ``product`` to ``cart``: one upsert on the
+    ``(cart, product, weight)`` unique constraint plus one totals UPDATE.
+    The line keeps the price it was first added at.
+    """
+    if isinstance(cart, SessionCart):
+        return cart.add(product, weight, quantity, price)
+    add_line = _upsert_line if connection.vendor in UPSERT_VENDORS else _increment_line
+    with transaction.atomic():
+        line_id, line_quantity, line_price = add_line(cart.pk, product.pk, weight, quantity, price)
+        _adjust_totals(cart.pk, line_price * quantity, quantity)
+    return CartItem(
+        id=line_id, cart=cart, product=product, weight=weight,
+        quantity=line_quantity, price=line_price,
+    )
+
+
+def remove_item(item):
+    with transaction.atomic():
+        item.delete()
+        _adjust_totals(item.cart_id, -item.price * item.quantity, -item.quantity)
+
+
+def load_lines(cart):
+    """
+    Cart items with their products in one joined query, plus the
+    JSON-serialisable rows the checkout form posts back, built in the same
+    pass.
+    """
+    if isinstance(cart, SessionCart):
+        return cart.load_lines()
+    items = list(
+        cart.items
+        .select_related('product')
+        .only(
+            'id', 'cart_id', 'weight', 'quantity', 'price',
+            'product__id', 'product__title', 'product__description',
+            'product__image', 'product__image_digest',
+        )
+        .order_by('added_at', 'id')
+    )
+    rows = [
+        {
+            "product": item.product.title,
+            "price": float(item.price),
+            "quantity": item.quantity,
+            "weight": item.weight,
+            "total_price": float(item.total_price),
+        }
+        for item in items
+    ]
+    return items, rows
+
+
+def apply_updates(cart, quantities):
+    """
+    Apply many line changes at once.  ``quantities`` maps item id to the new
+    quantity, 0 meaning remove.  Every id must belong to ``cart``, otherwise
+    ``CartItem.DoesNotExist`` is raised and nothing changes.  Updates go out
+    as one ``bulk_update``, removals as one ``DELETE ... IN``, and the stored
+    totals are recomputed in the same transaction.
+    """
+    if isinstance(cart, SessionCart):
+        return cart.apply_updates(quantities)
+
+    with transaction.atomic():
+        items = (
+            CartItem.objects.select_for_update()
+            .filter(cart=cart)
+            .only('id', 'quantity')
+            .in_bulk(quantities)
+        )
+        if len(items) != len(quantities):
+            raise CartItem.DoesNotExist("Item not found")
+
+        removed = [pk for pk, quantity in quantities.items() if quantity == 0]
+        changed = []
+        for pk, quantity in quantities.items():
+            if quantity and items[pk].quantity != quantity:
+                items[pk].quantity = quantity
+                changed.append(items[pk])
+
+        if removed:
+            CartItem.objects.filter(pk__in=removed).delete()
+        if changed:
+            CartItem.objects.bulk_update(changed, ['quantity'])
+        recalculate_totals(cart)
+
+
+def recalculate_totals(cart):
+    """Recompute the stored totals from the cart's items; returns them."""
+    totals = cart.items.aggregate(
+        subtotal=Sum(F('price') * F('quantity')),
+        item_count=Sum('quantity'),
+    )
+    subtotal = (totals['subtotal'] or Decimal('0')).quantize(Decimal('0.01'))
+    item_count = totals['item_count'] or 0
+    Cart.objects.filter(pk=cart.pk).update(subtotal=subtotal, item_count=item_count)
+    cart.subtotal, cart.item_count = subtotal, item_count
+    return subtotal, item_count
+
+
+class SessionCartLine:
+    def __init__(self, line_id, product, weight, quantity, price):
+        self.id = line_id
+        self.product = product
+        self.weight = weight
+        self.quantity = quantity
+        self.price = price
+
+    @property
+    def total_price(self):
+        return self.price * self.quantity
+
+
+class SessionCart:
+    """
+    Guest cart kept in the session instead of a ``Cart`` row, so anonymous
+    browsing never writes to bakery_cart.  Lines are stored as
+    ``{line_id: {product_id, weight, quantity, price}}``; the totals mirror
+    ``Cart``.  It is folded into the user's cart on login.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.data = session.get(SESSION_KEY) or {'next_id': 1, 'lines': {}}
+
+    def _save(self):
+        self.session[SESSION_KEY] = self.data
+        self.session.modified = True
+
+    @property
+    def lines(self):
+        return self.data['lines']
+
+    def add(self, product, weight, quantity, price):
+        for line in self.lines.values():
+            if line['product_id'] == product.pk and line['weight'] == weight:
+                line['quantity'] += quantity
+                break
+        else:
+            line_id = self.data['next_id']
+            self.data['next_id'] += 1
+            self.lines[str(line_id)] = {
+                'product_id': product.pk,
+                'weight': weight,
+                'quantity': quantity,
+                'price': str(price),
+            }
+        self._save()
+
+    def apply_updates(self, quantities):
+        if any(str(line_id) not in self.lines for line_id in quantities):
+            raise CartItem.DoesNotExist("Item not found")
+        for line_id, quantity in quantities.items():
+            if quantity:
+                self.lines[str(line_id)]['quantity'] = quantity
+            else:
+                del self.lines[str(line_id)]
+        self._save()
+
+    def remove(self, line_id):
+        if self.lines.pop(str(line_id), None) is not None:
+            self._save()
+
+    def clear(self):
+        self.session.pop(SESSION_KEY, None)
+
+    @property
+    def subtotal(self):
+        return sum(
+            (Decimal(line['price']) * line['quantity'] for line in self.lines.values()),
+            Decimal('0.00'),
+        )
+
+    @property
+    def item_count(self):
+        return sum(line['quantity'] for line in self.lines.values())
+
+    @property
+    def quote(self):
+        return pricing.quote(self.subtotal)
+
+    @property
+    def discount(self):
+        return self.quote.discount
+
+    @property
+    def tax_amount(self):
+        return self.quote.gst
+
+    @property
+    def delivery_charge(self):
+        return self.quote.delivery_fee
+
+    @property
+    def total(self):
+        return self.quote.total
+
+    def load_lines(self):
+        products = Product.objects.only(
+            'id', 'title', 'description', 'image', 'image_digest',
+        ).in_bulk({line['product_id'] for line in self.lines.values()})
+        items = [
+            SessionCartLine(
+                int(line_id), products[line['product_id']], line['weight'],
+                line['quantity'], Decimal(line['price']),
+            )
+            for line_id, line in self.lines.items()
+            if line['product_id'] in products
+        ]
+        rows = [
+            {
+                "product": item.product.title,
+                "price": float(item.price),
+                "quantity": item.quantity,
+                "weight": item.weight,
+                "total_price": float(item.total_price),
+            }
+            for item in items
+        ]
+        return items, rows
+
+
+def get_cart(request):
+    """The user's ``Cart`` row, or a ``SessionCart`` for guests."""
+    if request.user.is_authenticated:
+        cart, created = Cart.objects.get_or_create(user=request.user)
+        return cart
+    return SessionCart(request.session)
+
+
+def merge_session_cart(request, user):
+    """
+    Fold the guest cart (and any legacy anonymous ``Cart`` row referenced
+    by ``cart_id``) into ``user``'s cart.  Call right after ``login()``.
+    """
+    session_cart = SessionCart(request.session)
+    legacy_id = request.session.pop(LEGACY_SESSION_KEY, None)
+    legacy_items = []
+    if legacy_id:
+        legacy_items = list(
+            CartItem.objects.filter(cart_id=legacy_id, cart__user__isnull=True)
+            .select_related('product')
+        )
+    if not session_cart.lines and not legacy_items:
+        if legacy_id:
+            Cart.objects.filter(pk=legacy_id, user__isnull=True).delete()
+        return
+
+    items, _ = session_cart.load_lines()
+    with transaction.atomic():
+        cart, created = Cart.objects.get_or_create(user=user)
+        for item in list(items) + legacy_items:
+            add_item(cart, item.product, item.weight, item.quantity, item.price)
+        if legacy_id:
+            Cart.objects.filter(pk=legacy_id, user__isnull=True).delete()
+    session_cart.clear()
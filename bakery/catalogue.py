@@ -0,0 +1,136 @@
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.urls import reverse
+
+from .models import CatalogueVersion, Product, ProductCategory
+
+SNAPSHOT_KEY = 'bakery:catalogue:snapshot:{}'
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    id: int
+    name: str
+    slug: str
+    image_name: str
+    image_digest: str
+    product_count: int
+
+    @property
+    def image(self):
+        field = ProductCategory._meta.get_field('image')
+        return field.attr_class(None, field, self.image_name)
+
+    def get_absolute_url(self):
+        return reverse('category_products', kwargs={'slug': self.slug})
+
+
+@dataclass(frozen=True)
+class ProductEntry:
+    id: int
+    title: str
+    category_slug: str
+
+    def get_absolute_url(self):
+        return reverse('product_detail', kwargs={
+            'category_slug': self.category_slug,
+            'product_id': self.id,
+        })
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    version: int
+    categories: tuple
+    products: tuple
+
+
+_local = None
+_version = None  # (version, time.monotonic() when read)
+
+
+def catalogue_version():
+    """
+    Current catalogue version.  It lives in the database, the one store
+    every worker (and the import commands) shares; each process re-reads it
+    once ``CATALOGUE_VERSION_TTL`` seconds have passed, so another worker's
+    edit shows up here within that time.
+    """
+    global _version
+    now = time.monotonic()
+    if _version is not None and now - _version[1] < getattr(settings, 'CATALOGUE_VERSION_TTL', 2):
+        return _version[0]
+    version = CatalogueVersion.objects.filter(pk=1).values_list('version', flat=True).first()
+    if version is None:
+        # First start (or a flushed database): a version from the clock
+        # can never collide with one already used for cached fragments.
+        CatalogueVersion.objects.bulk_create(
+            [CatalogueVersion(pk=1, version=time.time_ns())], ignore_conflicts=True,
+        )
+        version = CatalogueVersion.objects.values_list('version', flat=True).get(pk=1)
+    _version = (version, now)
+    return version
+
+
+def bump_catalogue_version():
+    """
+    Record a catalogue edit.  Returns ``(previous, version)``; the version
+    row stays locked in between, so concurrent edits see each other.
+    """
+    global _version
+    with transaction.atomic():
+        previous = (
+            CatalogueVersion.objects.select_for_update()
+            .filter(pk=1).values_list('version', flat=True).first()
+        )
+        version = max(time.time_ns(), (previous or 0) + 1)
+        if previous is None:
+            CatalogueVersion.objects.bulk_create(
+                [CatalogueVersion(pk=1, version=version)], ignore_conflicts=True,
+            )
+        CatalogueVersion.objects.filter(pk=1).update(version=version)
+    _version = (version, time.monotonic())
+    return previous, version
+
+
+def build_snapshot(version):
+    rows = (
+        ProductCategory.objects
+        .annotate(num_products=Count('products'))
+        .order_by('pk')
+        .values_list('id', 'name', 'slug', 'image', 'image_digest', 'num_products')
+    )
+    products = (
+        Product.objects
+        .order_by('pk')
+        .values_list('id', 'title', 'category__slug')
+    )
+    return CatalogueSnapshot(
+        version,
+        tuple(CategoryEntry(*row) for row in rows),
+        tuple(ProductEntry(*row) for row in products),
+    )
+
+
+def get_catalogue():
+    """
+    Catalogue snapshot for the current version: served from this process if
+    it is still current, otherwise from the shared cache, and only rebuilt
+    from the database after a catalogue edit.
+    """
+    global _local
+    version = catalogue_version()
+    if _local is not None and _local.version == version:
+        return _local
+
+    snapshot = cache.get(SNAPSHOT_KEY.format(version))
+    if snapshot is None:
+        snapshot = build_snapshot(version)
+        cache.set(SNAPSHOT_KEY.format(version), snapshot, None)
+    _local = snapshot
+    return snapshot
@@ -0,0 +1,322 @@
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+import django
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from . import search
+from .catalogue import bump_catalogue_version
+from .images import render_derivatives
+from .models import Product, ProductCategory
+from .pricing import parse_weight
+
+FORMATS = ('csv', 'jsonl')
+FIELDS = (
+    'slug', 'title', 'category', 'category_name', 'description', 'detailed_description',
+    'base_price', 'weight_options', 'nutrition_info', 'ingredients', 'allergy_info',
+    'is_featured', 'image', 'image_digest',
+)
+TEXT_FIELDS = ('description', 'detailed_description', 'nutrition_info', 'ingredients', 'allergy_info')
+# What an import overwrites on a product whose slug already exists; its
+# id and created_at are kept.
+UPDATE_FIELDS = (
+    'title', 'category', *TEXT_FIELDS, 'base_price', 'weight_options', 'is_featured',
+    'image', 'image_digest', 'updated_at',
+)
+BATCH_SIZE = 1000
+# Imported originals are stored under their content hash, so importing
+# the same file again stores (and renders) nothing new.
+IMPORTED_IMAGES = 'products/imported'
+
+MAX_PRICE = Decimal('999999.99')
+SLUG_RE = re.compile(r'^[-\w]+\Z')
+TRUE = {'1', 'true', 'yes', 'y'}
+FALSE = {'', '0', 'false', 'no', 'n'}
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    categories: int = 0
+    images: int = 0
+
+
+def detect_format(path):
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    """
+    ``(line_number, row)`` for every row of a CSV or JSONL text stream,
+    read one line at a time.  An unreadable JSONL line comes out as a
+    ``RowError`` in place of its row.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield number, RowError(f"invalid JSON: {exc}")
+
+
+def clean_row(row):
+    """The validated product values of one import row; raises ``RowError``."""
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError("expected an object per line")
+
+    def text(name):
+        value = row.get(name)
+        return '' if value is None else str(value).strip()
+
+    title = text('title')
+    if not title or len(title) > 200:
+        raise RowError("title is required and at most 200 characters")
+    # Given slugs are kept as they are: they identify existing products.
+    slug = text('slug') or slugify(title)
+    if not slug or len(slug) > 250 or not SLUG_RE.match(slug):
+        raise RowError(f"invalid slug {slug!r}")
+    category = text('category')
+    if not category or len(category) > 150 or not SLUG_RE.match(category):
+        raise RowError(f"invalid category slug {category!r}")
+
+    try:
+        base_price = Decimal(text('base_price'))
+    except InvalidOperation:
+        raise RowError(f"invalid base_price {text('base_price')!r}")
+    if not base_price.is_finite() or not Decimal('0.01') <= base_price <= MAX_PRICE:
+        raise RowError(f"base_price {base_price} is out of range")
+
+    weight_options = text('weight_options') or Product._meta.get_field('weight_options').default
+    invalid = [option for option in weight_options.split(',') if parse_weight(option) is None]
+    if invalid or len(weight_options) > 100:
+        raise RowError(f"invalid weight_options {weight_options!r}")
+
+    featured = row.get('is_featured')
+    if not isinstance(featured, bool):
+        flag = text('is_featured').lower()
+        if flag not in TRUE | FALSE:
+            raise RowError(f"invalid is_featured {flag!r}")
+        featured = flag in TRUE
+
+    return {
+        'slug': slug,
+        'title': title,
+        'category': category,
+        'category_name': text('category_name')[:100],
+        **{name: text(name) for name in TEXT_FIELDS},
+        'base_price': base_price.quantize(Decimal('0.01')),
+        'weight_options': weight_options,
+        'is_featured': featured,
+        'image': text('image'),
+        'image_digest': text('image_digest')[:64],
+    }
+
+
+def _init_worker():
+    # Workers started with "spawn" (macOS, Windows) begin without Django.
+    django.setup()
+
+
+def ingest_image(path):
+    """
+    Store the image file at ``path`` under its content hash and render its
+    derivatives.  Returns ``(path, storage_name, digest, error)``; runs in
+    the import's worker processes.
+    """
+    try:
+        with open(path, 'rb') as file:
+            content = file.read()
+        digest = render_derivatives(content)
+    except (OSError, ValueError) as exc:
+        return path, None, None, str(exc)
+    extension = os.path.splitext(path)[1].lower() or '.jpg'
+    name = f"{IMPORTED_IMAGES}/{digest[:2]}/{digest}{extension}"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return path, name, digest, None
+
+
+def _image_source(image_root, value):
+    path = os.path.realpath(os.path.join(image_root, value))
+    if os.path.commonpath([path, os.path.realpath(image_root)]) != os.path.realpath(image_root):
+        raise RowError(f"image {value!r} is outside the image directory")
+    return path
+
+
+class CatalogueImporter:
+    """
+    Upserts products (by slug) from validated rows, ``batch_size`` at a
+    time: one ``bulk_create(update_conflicts=True)`` per batch, categories
+    resolved through an in-memory slug map (unknown ones are created), and
+    images ingested by a process pool while the database waits.
+    """
+
+    def __init__(self, image_root=None, workers=None, batch_size=BATCH_SIZE, on_error=None):
+        self.image_root = image_root
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda line, message: None)
+        self.result = ImportResult()
+        self.categories = {category.slug: category for category in ProductCategory.objects.only('id', 'slug', 'name')}
+
+    def run(self, rows):
+        """Import ``(line_number, row)`` pairs; returns an ``ImportResult``."""
+        pool = None
+        if self.image_root and self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+        try:
+            rows = iter(rows)
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(self.clean(batch), pool)
+        finally:
+            if pool:
+                pool.shutdown()
+            if self.result.created or self.result.updated:
+                # bulk_create() sends no post_save, so nothing else noticed.
+                # The version is stored in the database, so the web workers
+                # pick it up even though this process exits right after.
+                bump_catalogue_version()
+        return self.result
+
+    def clean(self, batch):
+        cleaned = {}
+        for line, row in batch:
+            try:
+                values = clean_row(row)
+                if values['image'] and self.image_root:
+                    values['source'] = _image_source(self.image_root, values['image'])
+            except RowError as exc:
+                self.skip(line, str(exc))
+                continue
+            # A slug repeated within a batch: the last row wins, as it
+            # would across batches.
+            cleaned.pop(values['slug'], None)
+            cleaned[values['slug']] = (line, values)
+        return list(cleaned.values())
+
+    def skip(self, line, message):
+        self.result.skipped += 1
+        self.on_error(line, message)
+
+    def ingest_images(self, rows, pool):
+        sources = sorted({values['source'] for _, values in rows if 'source' in values})
+        if not sources:
+            return {}
+        results = pool.map(ingest_image, sources, chunksize=4) if pool else map(ingest_image, sources)
+        images = {}
+        for path, name, digest, error in results:
+            images[path] = (name, digest, error)
+            if not error:
+                self.result.images += 1
+        return images
+
+    def resolve_categories(self, rows):
+        missing = {}
+        for _, values in rows:
+            if values['category'] not in self.categories:
+                missing.setdefault(
+                    values['category'],
+                    values['category_name'] or values['category'].replace('-', ' ').title()[:100],
+                )
+        if not missing:
+            return
+        ProductCategory.objects.bulk_create(
+            [ProductCategory(slug=slug, name=name) for slug, name in missing.items()],
+            ignore_conflicts=True,
+        )
+        created = ProductCategory.objects.filter(slug__in=missing).only('id', 'slug', 'name')
+        self.categories.update((category.slug, category) for category in created)
+        self.result.categories += len(missing)
+
+    def import_batch(self, rows, pool):
+        images = self.ingest_images(rows, pool)
+        products = []
+        for line, values in rows:
+            if 'source' in values:
+                name, digest, error = images[values.pop('source')]
+                if error:
+                    self.skip(line, f"image {values['image']!r}: {error}")
+                    continue
+                values['image'], values['image_digest'] = name, digest
+            products.append(values)
+        if not products:
+            return
+
+        with transaction.atomic():
+            self.resolve_categories([(None, values) for values in products])
+            slugs = [values['slug'] for values in products]
+            existing = set(Product.objects.filter(slug__in=slugs).values_list('slug', flat=True))
+            objs = [
+                Product(**{
+                    **{field: value for field, value in values.items() if field != 'category_name'},
+                    'category': self.categories[values['category']],
+                })
+                for values in products
+            ]
+            Product.objects.bulk_create(
+                objs, update_conflicts=True, unique_fields=['slug'], update_fields=UPDATE_FIELDS,
+            )
+            if not connection.features.can_return_rows_from_bulk_insert:
+                ids = dict(Product.objects.filter(slug__in=slugs).values_list('slug', 'id'))
+                for obj in objs:
+                    obj.pk = ids[obj.slug]
+            search.index_products(objs)
+        self.result.updated += len(existing)
+        self.result.created += len(objs) - len(existing)
+
+
+def export_rows():
+    """Every product as an import row, streamed from the database."""
+    products = Product.objects.select_related('category').order_by('id').iterator(chunk_size=2000)
+    for product in products:
+        yield {
+            'slug': product.slug,
+            'title': product.title,
+            'category': product.category.slug,
+            'category_name': product.category.name,
+            **{name: getattr(product, name) for name in TEXT_FIELDS},
+            'base_price': str(product.base_price),
+            'weight_options': product.weight_options,
+            'is_featured': product.is_featured,
+            'image': product.image.name or '',
+            'image_digest': product.image_digest,
+        }
+
+
+def write_rows(rows, stream, fmt):
+    """Write import rows to a text stream as CSV or JSONL; returns the count."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'is_featured': 'true' if row['is_featured'] else 'false'})
+            count += 1
+        return count
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        count += 1
+    return count
@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from . import pricing
+from .cart import SessionCart
+from .models import Cart, CartItem, Order, OrderItem, Product
+
+SESSION_KEY = 'checkout_source'
+
+
+def cart_lines(cart):
+    """``(product_id, weight, quantity)`` for every line of a cart."""
+    if isinstance(cart, SessionCart):
+        return [
+            (line['product_id'], line['weight'], line['quantity'])
+            for line in cart.lines.values()
+        ]
+    return list(
+        CartItem.objects.filter(cart=cart)
+        .order_by('added_at', 'id')
+        .values_list('product_id', 'weight', 'quantity')
+    )
+
+
+def price_lines(lines):
+    """
+    Price ``(product_id, weight, quantity)`` lines from the current product
+    prices, fetched in one query; nothing posted by the client is trusted.
+    Returns the priced lines and the order ``pricing.Quote``.
+    """
+    products = Product.objects.only(
+        'id', 'title', 'description', 'base_price', 'weight_options', 'image', 'image_digest',
+    ).in_bulk({product_id for product_id, weight, quantity in lines})
+
+    basket = [
+        (products[product_id], weight, quantity)
+        for product_id, weight, quantity in lines
+        if product_id in products
+    ]
+    prices, quote = pricing.price_lines(basket)
+    priced = [
+        {
+            'product': product,
+            'weight': weight,
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': line_total,
+        }
+        for (product, weight, quantity), (unit_price, line_total) in zip(basket, prices)
+    ]
+    return priced, quote
+
+
+def create_order(lines, **order_fields):
+    """
+    Turn ``lines`` into an ``Order`` and its ``OrderItem`` rows in one
+    transaction, using a constant number of queries however many lines
+    there are.  ``order_fields`` are the customer/payment fields of
+    ``Order``.
+    """
+    priced, prices = price_lines(lines)
+    if not priced:
+        raise ValueError("Nothing to order")
+
+    with transaction.atomic():
+        order = Order.objects.create(
+            subtotal=prices.subtotal,
+            discount=prices.discount,
+            delivery_fee=prices.delivery_fee,
+            tax_amount=prices.gst,
+            total_amount=prices.total,
+            **order_fields,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line['product'],
+                quantity=line['quantity'],
+                unit_price=line['unit_price'],
+                weight=line['weight'],
+            )
+            for line in priced
+        ])
+    return order
+
+
+def clear_cart(cart):
+    if isinstance(cart, SessionCart):
+        cart.clear()
+        return
+    CartItem.objects.filter(cart=cart).delete()
+    Cart.objects.filter(pk=cart.pk).update(subtotal=Decimal('0.00'), item_count=0)
+
+
+def checkout_cart(cart, **order_fields):
+    """
+    Convert a whole cart into an order and empty the cart, atomically.  The
+    cart row is locked before its lines are read, so an item added
+    meanwhile either makes it into the order or waits and stays in the cart.
+    """
+    with transaction.atomic():
+        if not isinstance(cart, SessionCart):
+            Cart.objects.select_for_update().filter(pk=cart.pk).values_list('pk').get()
+        order = create_order(cart_lines(cart), **order_fields)
+        clear_cart(cart)
+    return order
@@ -0,0 +1,135 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .context_processors import _cart_item_count
+from .models import ProductCategory
+from .recommend import related_version
+from .wishlist import wishlist_product_ids
+
+
+def category_version(slug):
+    """
+    ``(last_modified, product_count)`` of a category page's content, or
+    None for an unknown slug.  The count catches deleted products, which
+    leave no newer ``updated_at`` behind.
+    """
+    try:
+        updated_at, products_updated, product_count = (
+            ProductCategory.objects.filter(slug=slug)
+            .annotate(products_updated=Max('products__updated_at'), product_count=Count('products'))
+            .values_list('updated_at', 'products_updated', 'product_count')
+            .get()
+        )
+    except ProductCategory.DoesNotExist:
+        return None
+    return max(filter(None, (updated_at, products_updated))), product_count
+
+
+def visitor_state(request):
+    """The per-visitor parts of a page: header, cart badge, wishlist hearts, CSRF secret."""
+    get_token(request)  # the secret the page's tokens will be made from
+    return (
+        request.user.pk,
+        _cart_item_count(request),
+        sorted(wishlist_product_ids(request.user)),
+        request.META['CSRF_COOKIE'],
+    )
+
+
+def _validators(request, last_modified, *versions):
+    digest = hashlib.md5(
+        repr((last_modified.isoformat(), versions, visitor_state(request))).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    # Weak: the masked CSRF tokens make every body differ byte-wise.
+    return f'W/"{digest}"', last_modified
+
+
+def category_validators(request, slug):
+    """``(etag, last_modified)`` of a category's product listing."""
+    version = category_version(slug)
+    if version is None:
+        return None, None
+    return _validators(request, *version)
+
+
+def product_validators(request, category_slug, product_id):
+    """
+    ``(etag, last_modified)`` of a product page: its category (the product
+    itself and the fallback related products) plus the precomputed related
+    products, which may live in other categories.
+    """
+    version = category_version(category_slug)
+    if version is None:
+        return None, None
+    last_modified, product_count = version
+    related = related_version(product_id)
+    related_changed = [related['computed_at'], related['updated_at']]
+    last_modified = max(filter(None, [last_modified, *related_changed]))
+    return _validators(request, last_modified, product_count, *related_changed, related['count'])
+
+
+def _conditional_response(request, etag, last_modified):
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return timestamp, get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def _add_validators(response, etag, timestamp):
+    if etag:
+        response.headers.setdefault('ETag', quote_etag(etag))
+    if timestamp and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(timestamp)
+    if etag or timestamp:
+        # The page is per-visitor: browsers may keep it but must
+        # revalidate, shared caches must not store it.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def condition(validators):
+    """
+    ``django.views.decorators.http.condition()`` with a single validator
+    function: ``validators(request, *args, **kwargs)`` returns ``(etag,
+    last_modified)``, so both come from the same queries.  Matching
+    GET/HEAD requests get a 304 without running the view.  Async views are
+    supported too; the validators then run in a thread, since they query
+    the database.
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            avalidators = sync_to_async(validators)
+
+            @wraps(view)
+            async def ainner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+
+                etag, last_modified = await avalidators(request, *args, **kwargs)
+                timestamp, response = _conditional_response(request, etag, last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _add_validators(response, etag, timestamp)
+
+            return ainner
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = validators(request, *args, **kwargs)
+            timestamp, response = _conditional_response(request, etag, last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _add_validators(response, etag, timestamp)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,28 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cart import SessionCart
+from .models import Cart
+from .wishlist import wishlist_product_ids
+
+
+def wishlist(request):
+    """Expose ``wishlist_ids`` to templates; only queried if a template uses it."""
+    return {
+        'wishlist_ids': SimpleLazyObject(lambda: wishlist_product_ids(request.user)),
+    }
+
+
+def _cart_item_count(request):
+    if not request.user.is_authenticated:
+        return SessionCart(request.session).item_count
+    return (
+        Cart.objects.filter(user=request.user)
+        .values_list('item_count', flat=True).first() or 0
+    )
+
+
+def cart_summary(request):
+    """Header mini-cart count: the stored total, or the session cart for guests."""
+    return {
+        'cart_item_count': SimpleLazyObject(lambda: _cart_item_count(request)),
+    }
@@ -0,0 +1,146 @@
+import hashlib
+import posixpath
+from functools import lru_cache
+from io import BytesIO
+
+from django.contrib.staticfiles import finders
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# Widths (in px) rendered for every uploaded product / category image.
+DERIVATIVE_WIDTHS = (160, 320, 640, 1024)
+DERIVATIVE_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+DERIVATIVE_ROOT = 'derivatives'
+
+# Modern-format copies of the PNG/JPEG artwork in bakery/static, built by
+# build_static_variants and preferred in this order by <picture>.
+STATIC_VARIANT_FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': 60, 'speed': 6},
+    'webp': {'format': 'WEBP', 'quality': 82, 'method': 6},
+}
+STATIC_VARIANT_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+def image_digest(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def derivative_name(digest, width, fmt):
+    """Storage path of a derivative, addressed by the original's content hash."""
+    ext = 'jpg' if fmt == 'jpeg' else fmt
+    return f"{DERIVATIVE_ROOT}/{digest[:2]}/{digest}/{width}.{ext}"
+
+
+def derivative_url(digest, width, fmt='webp'):
+    return default_storage.url(derivative_name(digest, width, fmt))
+
+
+def srcset(digest, fmt='webp'):
+    return ', '.join(
+        f"{derivative_url(digest, width, fmt)} {width}w" for width in DERIVATIVE_WIDTHS
+    )
+
+
+def image_url(field_file, digest, width, fmt='webp'):
+    """URL of the derivative that covers ``width``, or the original if none."""
+    if not field_file:
+        return ''
+    if not digest:
+        return field_file.url
+    return derivative_url(digest, closest_width(width), fmt)
+
+
+def closest_width(width):
+    """Smallest generated width that still covers ``width`` px."""
+    for candidate in DERIVATIVE_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return DERIVATIVE_WIDTHS[-1]
+
+
+def _flatten(image):
+    # JPEG has no alpha channel; paste transparent PNGs onto white.
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_derivatives(field_file, storage=None):
+    """
+    Render every width/format derivative of an image field file and return
+    the content digest under which they were stored.  Derivatives that
+    already exist for the same content are left untouched, so re-uploading
+    or backfilling an identical file is cheap.
+    """
+    field_file.open('rb')
+    try:
+        field_file.seek(0)
+        content = field_file.read()
+    finally:
+        field_file.seek(0)
+    return render_derivatives(content, storage)
+
+
+def render_derivatives(content, storage=None):
+    """``generate_derivatives()`` for the raw bytes of an image."""
+    storage = storage or default_storage
+    digest = image_digest(content)
+    missing = [
+        (width, fmt)
+        for width in DERIVATIVE_WIDTHS
+        for fmt in DERIVATIVE_FORMATS
+        if not storage.exists(derivative_name(digest, width, fmt))
+    ]
+    if not missing:
+        return digest
+
+    with Image.open(BytesIO(content)) as original:
+        original = ImageOps.exif_transpose(original)
+        for width, fmt in missing:
+            resized = original.copy()
+            resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+            if fmt == 'jpeg':
+                resized = _flatten(resized)
+            elif resized.mode not in ('RGB', 'RGBA'):
+                resized = resized.convert('RGBA')
+            buffer = BytesIO()
+            resized.save(buffer, **DERIVATIVE_FORMATS[fmt])
+            storage.save(derivative_name(digest, width, fmt), ContentFile(buffer.getvalue()))
+    return digest
+
+
+def static_variant_name(path, fmt):
+    """``images/slide1.png`` -> ``images/variants/slide1.png.avif``."""
+    directory, filename = posixpath.split(path)
+    return posixpath.join(directory, 'variants', f"{filename}.{fmt}")
+
+
+@lru_cache(maxsize=None)
+def static_variants(path):
+    """(format, static path) of each variant built for the static image ``path``."""
+    return tuple(
+        (fmt, static_variant_name(path, fmt))
+        for fmt in STATIC_VARIANT_FORMATS
+        if finders.find(static_variant_name(path, fmt))
+    )
+
+
+def encode_static_variant(source, fmt):
+    """Encoded bytes of ``source`` (an image file path) in ``fmt``."""
+    with Image.open(source) as image:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        buffer = BytesIO()
+        image.save(buffer, **STATIC_VARIANT_FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def static_variant_formats():
+    return [fmt for fmt in STATIC_VARIANT_FORMATS if features.check(fmt)]
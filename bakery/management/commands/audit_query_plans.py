@@ -0,0 +1,148 @@
+import re
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from bakery import search
+from bakery.models import (
+    Cart, CartItem, ContactMessage, CustomUser, Order, Product, ProductCategory, Wishlist,
+)
+
+# "SCAN <table>" without an index is a full table scan; "SCAN <table> USING
+# [COVERING] INDEX" walks an index, "SEARCH" is an index lookup and virtual
+# tables (the FTS5 index) report their own lookups as "VIRTUAL TABLE INDEX".
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING (?:COVERING )?INDEX| VIRTUAL TABLE)(?!\w)')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every storefront view against a seeded throwaway database, "
+        "run EXPLAIN QUERY PLAN on each query it issues and flag full table scans"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument(
+            '--allow', nargs='*', default=['django_content_type', 'bakery_productcategory'],
+            help="Tables whose full scans are expected (small, read whole)",
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan, not only scans")
+        parser.add_argument('--strict', action='store_true', help="Exit non-zero if any scan is flagged")
+
+    def populate(self, count):
+        categories = ProductCategory.objects.bulk_create([
+            ProductCategory(name=name.title(), slug=name)
+            for name in ("cakes", "cookies", "breads", "sweets")
+        ])
+        Product.objects.bulk_create([
+            Product(
+                title=f"Chocolate Cake {i}",
+                slug=f"chocolate-cake-{i}",
+                category=categories[i % len(categories)],
+                description="Rich chocolate sponge",
+                base_price=Decimal('500.00'),
+                is_featured=i % 10 == 0,
+            )
+            for i in range(count)
+        ])
+        search.rebuild_index()
+
+        user = CustomUser.objects.create_user(
+            email='audit@example.com', password='Qz7pLmw9', first_name='Plan', last_name='Audit',
+        )
+        cart = Cart.objects.create(user=user)
+        for product in Product.objects.all()[:5]:
+            Wishlist.objects.create(user=user, product=product)
+            CartItem.objects.create(cart=cart, product=product, weight='1 KG', quantity=1, price=product.base_price)
+        ContactMessage.objects.create(name='Plan', email='audit@example.com', phone='9876543210',
+                                      subject='Audit', message='Hello')
+        Order.objects.create(
+            customer_name='Plan Audit', customer_mobile='9876543210', delivery_location='Chennai',
+            delivery_address='1 Main Road', payment_method='cod', subtotal=500, delivery_fee=0,
+            tax_amount=25, total_amount=450,
+        )
+        return user
+
+    def requests(self):
+        product = Product.objects.select_related('category').first()
+        category = product.category.slug
+        return [
+            ('GET', reverse('home'), None),
+            ('GET', reverse('about'), None),
+            ('GET', reverse('blog'), None),
+            ('GET', reverse('contact'), None),
+            ('GET', reverse('all_products'), None),
+            ('GET', reverse('category_products', kwargs={'slug': category}), None),
+            ('GET', product.get_absolute_url(), None),
+            ('POST', product.get_absolute_url(),
+             {'pincode': '600001', 'weight': '1 KG', 'quantity': '1', 'add_to_cart': '1'}),
+            ('GET', reverse('search_products') + '?q=choc', None),
+            ('GET', reverse('search_suggest') + '?q=choc', None),
+            ('GET', reverse('cart_page'), None),
+            ('GET', reverse('wishlist'), None),
+        ]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def audit(self, client, method, url, data, allowed, verbose):
+        with CaptureQueriesContext(connection) as context:
+            if method == 'POST':
+                client.post(url, data)
+            else:
+                client.get(url)
+
+        flagged = 0
+        self.stdout.write(f"{method} {url}  ({len(context)} queries)")
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = self.explain(sql)
+            scans = [
+                table for line in plan for table in FULL_SCAN.findall(line)
+                if table not in allowed
+            ]
+            sorts = any(TEMP_SORT in line for line in plan)
+            if scans:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f"  full scan of {', '.join(scans)}: {sql[:160]}"))
+            elif sorts:
+                self.stdout.write(f"  sort without index: {sql[:160]}")
+            if scans or sorts or verbose:
+                for line in plan:
+                    self.stdout.write(f"      {line}")
+        return flagged
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("EXPLAIN QUERY PLAN output is only parsed for SQLite.")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = self.populate(options['products'])
+            client = Client()
+            client.force_login(user)
+            flagged = sum(
+                self.audit(client, method, url, data, set(options['allow']), options['verbose_plans'])
+                for method, url, data in self.requests()
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if flagged:
+            message = f"{flagged} {'query scans' if flagged == 1 else 'queries scan'} a whole table"
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No full table scans"))
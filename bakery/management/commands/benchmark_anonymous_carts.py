@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bakery.models import Cart, Product, ProductCategory
+
+
+def legacy_cart_page(session):
+    # Cart resolution cart_page used before guest carts moved to the session.
+    cart_id = session.get('cart_id')
+    cart = Cart.objects.filter(id=cart_id).first() if cart_id else None
+    if not cart:
+        cart = Cart.objects.create()
+        session['cart_id'] = cart.id
+    list(cart.items.select_related('product'))
+
+
+def cart_writes(queries):
+    return sum(
+        1 for q in queries
+        if 'bakery_cart' in q['sql'] and q['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate anonymous visitors hitting the cart page and report bakery_cart "
+        "growth and write rate, legacy (row per visitor) vs. session carts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--visitors', type=int, default=500)
+        parser.add_argument(
+            '--views', type=int, default=3,
+            help="Cart page views per visitor (default: 3)",
+        )
+
+    def run_legacy(self, visitors, views):
+        sessions = [{} for _ in range(visitors)]
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(views):
+                for session in sessions:
+                    legacy_cart_page(session)
+        return Cart.objects.count(), cart_writes(context.captured_queries)
+
+    def run_session(self, visitors, views):
+        clients = [Client() for _ in range(visitors)]
+        url = reverse('cart_page')
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(views):
+                for client in clients:
+                    client.get(url)
+        return Cart.objects.count(), cart_writes(context.captured_queries)
+
+    def handle(self, *args, **options):
+        visitors, views = options['visitors'], options['views']
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+            Product.objects.create(
+                title='Plum Cake', category=category, base_price=Decimal('400.00'),
+            )
+            requests = visitors * views
+            self.stdout.write(f"{visitors} anonymous visitors x {views} cart views = {requests} requests")
+            self.stdout.write(f"{'strategy':<12}{'cart rows':>12}{'cart writes':>14}{'writes/req':>12}")
+
+            for label, runner in (('legacy', self.run_legacy), ('session', self.run_session)):
+                Cart.objects.all().delete()
+                rows, writes = runner(visitors, views)
+                self.stdout.write(f"{label:<12}{rows:>12}{writes:>14}{writes / requests:>12.2f}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,191 @@
+import http.client
+import os
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = {
+    'wsgi': 'bakeryproducts.wsgi',
+    'asgi': 'bakeryproducts.asgi:application',
+}
+# (label, gunicorn profile, settings.ASYNC_VIEWS) of each measured run.
+RUNS = [
+    ('wsgi', 'wsgi', '0'),
+    ('asgi', 'asgi', '1'),
+    ('asgi-sync', 'asgi', '0'),
+]
+SHOPPER = ('loadtest@example.com', 'Qz7pLmw9')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a copy of the database with gunicorn sync (WSGI) workers, "
+        "then uvicorn (ASGI) workers with the async and with the sync views, "
+        "and compare requests/sec and p99 latency of the catalogue, search "
+        "and wishlist pages at equal worker counts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per run")
+
+    def manage(self, env, *args):
+        subprocess.run(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *args],
+            env=env, check=True, cwd=settings.BASE_DIR,
+        )
+
+    def prepare(self, workdir):
+        database = os.path.join(workdir, 'db.sqlite3')
+        shutil.copy(settings.DATABASES['default']['NAME'], database)
+        env = {**os.environ, 'DATABASE_URL': f'sqlite:///{database}'}
+        self.manage(env, 'migrate', '-v0')
+        self.manage(env, 'enable_wal')
+        self.manage(env, 'shell', '-v0', '-c', (
+            "from bakery.models import CustomUser, Product, Wishlist\n"
+            f"user, _ = CustomUser.objects.get_or_create(email='{SHOPPER[0]}', "
+            "defaults={'first_name': 'Load', 'last_name': 'Test'})\n"
+            f"user.set_password('{SHOPPER[1]}'); user.save()\n"
+            "for product in Product.objects.all()[:6]:\n"
+            "    Wishlist.objects.get_or_create(user=user, product=product)\n"
+        ))
+        with sqlite3.connect(database) as db:
+            row = db.execute(
+                "SELECT p.id, c.slug FROM bakery_product p "
+                "JOIN bakery_productcategory c ON c.id = p.category_id ORDER BY p.id LIMIT 1"
+            ).fetchone()
+        if row is None:
+            raise CommandError("The database has no products to request.")
+        product_id, slug = row
+        paths = [
+            '/products/',
+            f'/products/{slug}/',
+            f'/products/{slug}/{product_id}/',
+            '/search/?q=cake',
+            '/wishlist/',
+        ]
+        return env, paths
+
+    def request(self, port, method, path, headers=None, body=None):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            response.read()
+            return response
+        finally:
+            conn.close()
+
+    def login(self, port):
+        response = self.request(port, 'GET', '/registration/login/')
+        cookies = SimpleCookie(response.getheader('Set-Cookie'))
+        token = cookies['csrftoken'].value
+        response = self.request(
+            port, 'POST', '/registration/login/',
+            headers={
+                'Cookie': f'csrftoken={token}',
+                'Content-Type': 'application/x-www-form-urlencoded',
+            },
+            body=urlencode({'csrfmiddlewaretoken': token, 'email': SHOPPER[0], 'password': SHOPPER[1]}),
+        )
+        session = SimpleCookie(', '.join(response.headers.get_all('Set-Cookie') or []))
+        if 'sessionid' not in session:
+            raise CommandError("Could not log the load-test shopper in.")
+        return f"sessionid={session['sessionid'].value}"
+
+    def wait_until_up(self, port, server):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited during start-up.")
+            try:
+                self.request(port, 'GET', '/registration/login/')
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError("gunicorn did not start within 30 s.")
+
+    def load(self, port, paths, cookie, concurrency, duration):
+        latencies, errors = [], []
+        stop = time.monotonic() + duration
+
+        def client(offset):
+            i = offset
+            while time.monotonic() < stop:
+                path = paths[i % len(paths)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    status = self.request(port, 'GET', path, headers={'Cookie': cookie}).status
+                except OSError:
+                    status = None
+                if status == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors.append(status)
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as workdir:
+            env, paths = self.prepare(workdir)
+            self.stdout.write(
+                f"{options['workers']} workers, {options['concurrency']} concurrent clients, "
+                f"{options['duration']:.0f}s per run over {len(paths)} pages"
+            )
+            self.stdout.write(f"{'profile':<10}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+            for label, profile, async_views in RUNS:
+                port = free_port()
+                server = subprocess.Popen(
+                    ['gunicorn', '-c', 'gunicorn.conf.py', PROFILES[profile]],
+                    cwd=settings.BASE_DIR,
+                    env={
+                        **env,
+                        'GUNICORN_PROFILE': profile,
+                        'ASYNC_VIEWS': async_views,
+                        'GUNICORN_BIND': f'127.0.0.1:{port}',
+                        'WEB_CONCURRENCY': str(options['workers']),
+                    },
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                try:
+                    self.wait_until_up(port, server)
+                    cookie = self.login(port)
+                    # Warm the caches and connections before measuring.
+                    self.load(port, paths, cookie, options['concurrency'], 1)
+                    latencies, errors = self.load(
+                        port, paths, cookie, options['concurrency'], options['duration'],
+                    )
+                finally:
+                    server.terminate()
+                    server.wait()
+
+                p50 = statistics.median(latencies) if latencies else 0
+                p99 = statistics.quantiles(latencies, n=100)[-1] if len(latencies) > 1 else 0
+                self.stdout.write(
+                    f"{label:<10}{len(latencies):>10}{len(errors):>8}"
+                    f"{len(latencies) / options['duration']:>10.0f}{p50:>10.1f}{p99:>10.1f}"
+                )
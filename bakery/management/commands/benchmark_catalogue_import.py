@@ -0,0 +1,112 @@
+import os
+import resource
+import tempfile
+import time
+from decimal import Decimal
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from PIL import Image
+
+from bakery import catalogue_io
+from bakery.models import Product, ProductCategory
+
+
+def generate_rows(count, categories, images=0, prefix='product'):
+    for n in range(count):
+        yield {
+            'slug': f'{prefix}-{n}',
+            'title': f'{prefix.title()} {n}',
+            'category': f'category-{n % categories}',
+            'category_name': f'Category {n % categories}',
+            'description': 'Layered sponge with fresh cream and seasonal fruit.',
+            'detailed_description': '',
+            'base_price': str(Decimal(300 + n % 700)),
+            'weight_options': '500G,1KG,2KG',
+            'nutrition_info': '',
+            'ingredients': 'Flour, sugar, butter, eggs',
+            'allergy_info': 'Contains gluten, dairy and egg',
+            'is_featured': n % 50 == 0,
+            'image': f'image-{n % images}.png' if images else '',
+            'image_digest': '',
+        }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Time import_catalogue on a generated catalogue (100k products by "
+        "default): first creating, then updating every product, against "
+        "saving a sample of products one at a time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--format', choices=catalogue_io.FORMATS, default='csv')
+        parser.add_argument('--batch-size', type=int, default=catalogue_io.BATCH_SIZE)
+        parser.add_argument('--images', type=int, default=0, help="Distinct generated images to ingest")
+        parser.add_argument('--workers', type=int, help="Image worker processes (default: one per CPU)")
+        parser.add_argument('--baseline', type=int, default=2000, help="Products saved one at a time for comparison")
+
+    def import_file(self, path, fmt, options, image_root):
+        start = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as stream:
+            result = catalogue_io.CatalogueImporter(
+                image_root=image_root, workers=options['workers'], batch_size=options['batch_size'],
+            ).run(catalogue_io.read_rows(stream, fmt))
+        return time.perf_counter() - start, result
+
+    def handle(self, *args, **options):
+        count, fmt = options['products'], options['format']
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=os.path.join(tmp, 'media')):
+                image_root = None
+                if options['images']:
+                    image_root = os.path.join(tmp, 'images')
+                    os.makedirs(image_root)
+                    for n in range(options['images']):
+                        Image.new('RGB', (1200, 900), (n * 37 % 256, 120, 200)).save(
+                            os.path.join(image_root, f'image-{n}.png'),
+                        )
+
+                path = os.path.join(tmp, f'catalogue.{fmt}')
+                with open(path, 'w', encoding='utf-8', newline='') as stream:
+                    catalogue_io.write_rows(
+                        generate_rows(count, options['categories'], options['images']), stream, fmt,
+                    )
+                self.stdout.write(f"{count} products, {os.path.getsize(path) / 2**20:.1f} MB of {fmt}")
+
+                for label in ('create', 'update'):
+                    elapsed, result = self.import_file(path, fmt, options, image_root)
+                    self.stdout.write(
+                        f"import ({label}): {elapsed:8.2f}s {count / elapsed:10.0f} rows/s  "
+                        f"{result.created} created, {result.updated} updated, {result.skipped} skipped, "
+                        f"{result.images} images; peak RSS {peak_rss_mb():.0f} MB"
+                    )
+
+                baseline = options['baseline']
+                categories = {category.slug: category for category in ProductCategory.objects.all()}
+                start = time.perf_counter()
+                for row in islice(generate_rows(baseline, options['categories'], prefix='saved'), baseline):
+                    Product(**{
+                        **{field: row[field] for field in catalogue_io.UPDATE_FIELDS if field in row},
+                        'slug': row['slug'],
+                        'category': categories[row['category']],
+                    }).save()
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"save() per row ({baseline} products): {baseline / elapsed:10.0f} rows/s, "
+                    f"~{count * elapsed / baseline:.0f}s for {count}"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,129 @@
+import io
+import os
+import statistics
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+from django.db.backends.signals import connection_created
+
+from bakery import cart as cart_service
+from bakery.models import Cart, CustomUser, Product, ProductCategory
+from bakery.signals import configure_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a throwaway file-backed SQLite database with concurrent "
+        "add-to-cart transactions, first with SQLite's defaults and then "
+        "with the WAL / IMMEDIATE / busy_timeout configuration, and report "
+        "'database is locked' failures and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200, help="Transactions per thread")
+
+    def populate(self, threads):
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        products = Product.objects.bulk_create([
+            Product(title=f'Cake {i}', slug=f'cake-{i}', category=category, base_price=Decimal('500.00'))
+            for i in range(20)
+        ])
+        carts = []
+        for i in range(threads):
+            user = CustomUser.objects.create_user(
+                email=f'load{i}@example.com', password='Qz7pLmw9', first_name='Load', last_name='Test',
+            )
+            carts.append(Cart.objects.create(user=user))
+        return carts, products
+
+    def worker(self, cart_id, products, writes, latencies, errors, barrier):
+        barrier.wait()
+        try:
+            for i in range(writes):
+                start = time.perf_counter()
+                try:
+                    # Read, then write in one transaction: the pattern the
+                    # cart and checkout views follow.
+                    with transaction.atomic():
+                        cart = Cart.objects.get(pk=cart_id)
+                        product = products[i % len(products)]
+                        cart_service.add_item(cart, product, '1 KG', 1, product.base_price)
+                except OperationalError as exc:
+                    errors.append(str(exc))
+                else:
+                    latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connections.close_all()
+
+    def run(self, label, carts, products, options):
+        latencies, errors = [], []
+        barrier = threading.Barrier(options['threads'])
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(cart.pk, products, options['writes'], latencies, errors, barrier),
+            )
+            for cart in carts
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal = cursor.fetchone()[0]
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+        self.stdout.write(
+            f"{label:<10}{journal:>9}{len(latencies):>10}{len(errors):>8}"
+            f"{len(latencies) / elapsed:>10.0f}{p95:>10.1f}"
+        )
+        return errors
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This load test targets SQLite locking.")
+
+        database = settings.DATABASES['default']
+        saved_options = dict(database.get('OPTIONS', {}))
+        workdir = tempfile.TemporaryDirectory()
+        database.setdefault('TEST', {})['NAME'] = os.path.join(workdir.name, 'load.sqlite3')
+
+        # SQLite defaults: rollback journal, deferred transactions, Python's
+        # 5 s busy handler.
+        database['OPTIONS'] = {}
+        connection_created.disconnect(configure_sqlite, dispatch_uid='bakery.configure_sqlite')
+        close_old_connections()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            carts, products = self.populate(options['threads'])
+            connection.close()
+            self.stdout.write(f"{'config':<10}{'journal':>9}{'commits':>10}{'locked':>8}{'tx/s':>10}{'p95 ms':>10}")
+            baseline = self.run('default', carts, products, options)
+
+            database['OPTIONS'] = saved_options
+            connection_created.connect(configure_sqlite, dispatch_uid='bakery.configure_sqlite')
+            connection.close()
+            call_command('enable_wal', stdout=io.StringIO())
+            tuned = self.run('tuned', carts, products, options)
+        finally:
+            database['OPTIONS'] = saved_options
+            connection_created.connect(configure_sqlite, dispatch_uid='bakery.configure_sqlite')
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            del database['TEST']['NAME']
+            workdir.cleanup()
+
+        if baseline:
+            self.stdout.write(f"default config failed with: {baseline[0]}")
+        if tuned:
+            raise CommandError(f"{len(tuned)} writes still failed: {tuned[0]}")
+        self.stdout.write(self.style.SUCCESS("No lock errors with the tuned configuration"))
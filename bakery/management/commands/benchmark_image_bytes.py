@@ -0,0 +1,73 @@
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from bakery.images import closest_width, derivative_name
+from bakery.models import Cart, ProductCategory
+
+
+def _size(name):
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+class Command(BaseCommand):
+    help = "Report image bytes per listing page served from originals vs. derivatives"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--width', type=int, default=400,
+            help="Rendered CSS width of a listing card image (default: 400)",
+        )
+        parser.add_argument(
+            '--dpr', type=float, default=1.5,
+            help="Device pixel ratio the browser picks from srcset for (default: 1.5)",
+        )
+        parser.add_argument('--format', default='webp', choices=('webp', 'jpeg'))
+
+    def page_bytes(self, objects, width, fmt):
+        before = after = 0
+        for obj in objects:
+            if not obj.image:
+                continue
+            original = _size(obj.image.name)
+            before += original
+            if obj.image_digest:
+                after += _size(derivative_name(obj.image_digest, width, fmt))
+            else:
+                after += original
+        return before, after
+
+    def handle(self, *args, **options):
+        width = closest_width(int(options['width'] * options['dpr']))
+        fmt = options['format']
+
+        pages = [('products.html', list(ProductCategory.objects.all()))]
+        for category in ProductCategory.objects.prefetch_related('products'):
+            pages.append((f"category_products.html [{category.slug}]", list(category.products.all())))
+        largest_cart = Cart.objects.annotate(lines=Count('items')).order_by('-lines').first()
+        if largest_cart:
+            pages.append((
+                f"cart.html [cart #{largest_cart.pk}]",
+                [item.product for item in largest_cart.items.select_related('product')],
+            ))
+
+        self.stdout.write(f"Derivative: {width}w {fmt}")
+        self.stdout.write(f"{'page':<48}{'images':>8}{'before':>14}{'after':>14}{'saved':>8}")
+        total_before = total_after = 0
+        for label, objects in pages:
+            before, after = self.page_bytes(objects, width, fmt)
+            total_before += before
+            total_after += after
+            saved = f"{100 - after * 100 / before:.0f}%" if before else "-"
+            self.stdout.write(
+                f"{label:<48}{len(objects):>8}{before:>14,}{after:>14,}{saved:>8}"
+            )
+        if total_before:
+            self.stdout.write(self.style.SUCCESS(
+                f"Total: {total_before:,} -> {total_after:,} bytes "
+                f"({100 - total_after * 100 / total_before:.0f}% smaller)"
+            ))
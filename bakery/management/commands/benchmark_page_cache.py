@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.signals import template_rendered
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from bakery.models import CustomUser
+from bakery.pagecache import page_cache_key
+
+PAGES = {
+    'home': 'bakery/home.html',
+    'about': 'bakery/about.html',
+    'blog': 'bakery/blog.html',
+    'contact': 'bakery/contact.html',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the home, about, blog and contact pages rendered on every "
+        "request vs. served from the page cache, and count the templates "
+        "each request renders"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per page and mode")
+
+    def measure(self, client, url, count, before_each=None):
+        rendered = []
+
+        def on_render(sender, template, **kwargs):
+            rendered.append(template.name)
+
+        timings = []
+        template_rendered.connect(on_render)
+        try:
+            for _ in range(count):
+                if before_each:
+                    before_each()
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.status_code
+        finally:
+            template_rendered.disconnect(on_render)
+        return statistics.median(timings) * 1000, len(rendered) / count
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            client = Client()
+            client.force_login(CustomUser.objects.create_user(
+                email='bench@example.com', password='Qz7pLmw9', first_name='Page', last_name='Cache',
+            ))
+            self.stdout.write(f"{'page':<10}{'uncached ms':>14}{'templates':>11}{'cached ms':>12}{'templates':>11}{'speedup':>9}")
+            for name, template_name in PAGES.items():
+                url = reverse(name)
+                with override_settings(PAGE_CACHE_TIMEOUT=0):
+                    cold_ms, cold_templates = self.measure(client, url, count)
+                key = page_cache_key(template_name, True)
+                with override_settings(PAGE_CACHE_TIMEOUT=600):
+                    cache.delete(key)
+                    client.get(url)  # fill
+                    warm_ms, warm_templates = self.measure(client, url, count)
+                    cache.delete(key)
+                self.stdout.write(
+                    f"{name:<10}{cold_ms:>14.2f}{cold_templates:>11.0f}"
+                    f"{warm_ms:>12.2f}{warm_templates:>11.0f}{cold_ms / warm_ms:>8.1f}x"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
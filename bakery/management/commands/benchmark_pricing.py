@@ -0,0 +1,71 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from bakery import pricing
+from bakery.models import Product
+
+WEIGHT_OPTIONS = ("500G,1KG,2KG,3KG,4KG,5KG", "250G,500G,1KG", "1KG,2KG")
+
+
+def naive_price_lines(lines):
+    # Per-line re-parsing, as the views used to do it inline.
+    subtotal = Decimal('0')
+    for product, weight, quantity in lines:
+        weights = [w.strip() for w in product.weight_options.split(',')]
+        label = weight.replace(' ', '')
+        if label in weights:
+            grams = Decimal(label[:-2]) * 1000 if label.endswith('KG') else Decimal(label[:-1])
+        else:
+            grams = Decimal(1000)
+        subtotal += (product.base_price * grams / 1000).quantize(Decimal('0.01')) * quantity
+    return pricing.quote(subtotal)
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark pricing a basket of cart lines (no database access)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=10_000)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def best_of(self, func, lines, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(lines)
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        products = [
+            Product(
+                id=i,
+                title=f"Product {i}",
+                base_price=Decimal(rng.randint(200, 1500)),
+                weight_options=rng.choice(WEIGHT_OPTIONS),
+            )
+            for i in range(options['products'])
+        ]
+        lines = []
+        for _ in range(options['lines']):
+            product = rng.choice(products)
+            lines.append((product, rng.choice(product.weight_list), rng.randint(1, 5)))
+
+        naive_ms = self.best_of(naive_price_lines, lines, options['repeat'])
+        for cached in (pricing.unit_price, pricing.price_table, pricing.weight_options):
+            cached.cache_clear()
+        start = time.perf_counter()
+        pricing.price_lines(lines)
+        cold_ms = (time.perf_counter() - start) * 1000
+        warm_ms = self.best_of(pricing.price_lines, lines, options['repeat'])
+
+        count = options['lines']
+        self.stdout.write(f"Pricing {count:,} lines over {options['products']} products")
+        self.stdout.write(f"  inline parsing     {naive_ms:8.1f} ms  ({naive_ms * 1000 / count:.2f} us/line)")
+        self.stdout.write(f"  engine, cold cache {cold_ms:8.1f} ms  ({cold_ms * 1000 / count:.2f} us/line)")
+        self.stdout.write(f"  engine, warm cache {warm_ms:8.1f} ms  ({warm_ms * 1000 / count:.2f} us/line)")
@@ -0,0 +1,98 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from bakery import search
+from bakery.models import Product, ProductCategory
+
+WORDS = (
+    "chocolate vanilla butter almond cashew pista rose saffron honey walnut "
+    "strawberry mango pineapple coconut caramel coffee cream cheese sourdough "
+    "multigrain garlic masala jeera cookie cake bread bun puff roll tart muffin "
+    "brownie laddu barfi halwa mysore pak murukku mixture chips"
+).split()
+QUERIES = ("chocolate", "cake", "almond cookie", "mysore pak", "choc", "zzz")
+
+
+def legacy_search(query):
+    products = Product.objects.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(category__name__icontains=query)
+    ).select_related('category')
+    categories = ProductCategory.objects.filter(products__in=products).distinct()
+    return list(products), list(categories)
+
+
+def indexed_search(query):
+    results = search.RankedSearchResults(query)
+    return results.count(), results[:search.SEARCH_PAGE_SIZE]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare search_products latency (icontains scan vs. FTS5 index) on a "
+        "synthetic catalogue built in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def populate(self, count, rng):
+        categories = ProductCategory.objects.bulk_create([
+            ProductCategory(name=name.title(), slug=name)
+            for name in ("cakes", "cookies", "breads", "sweets", "savouries", "gift box")
+        ])
+        batch = []
+        for i in range(count):
+            title = ' '.join(rng.sample(WORDS, 3)).title()
+            batch.append(Product(
+                title=title,
+                slug=f"product-{i}",
+                category=rng.choice(categories),
+                description=' '.join(rng.choices(WORDS, k=20)),
+                base_price=Decimal(rng.randint(100, 2000)),
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        search.rebuild_index()
+
+    def time_it(self, func, query, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(query)
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write("This benchmark targets the SQLite FTS5 index.")
+            return
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            start = time.perf_counter()
+            self.populate(options['products'], random.Random(options['seed']))
+            self.stdout.write(
+                f"Built {options['products']:,} products in {time.perf_counter() - start:.1f}s"
+            )
+            self.stdout.write(f"{'query':<16}{'hits':>8}{'icontains ms':>16}{'fts5 ms':>12}{'speed-up':>10}")
+            for query in QUERIES:
+                hits = search.RankedSearchResults(query).count()
+                legacy = self.time_it(legacy_search, query, options['repeat'])
+                indexed = self.time_it(indexed_search, query, options['repeat'])
+                self.stdout.write(
+                    f"{query:<16}{hits:>8}{legacy:>16.1f}{indexed:>12.1f}{legacy / indexed:>9.0f}x"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
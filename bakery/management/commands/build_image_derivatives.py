@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from bakery.catalogue import bump_catalogue_version
+from bakery.images import generate_derivatives
+from bakery.models import Product, ProductCategory
+
+
+class Command(BaseCommand):
+    help = "Generate responsive WebP/JPEG derivatives for existing product and category images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Recompute the digest even for rows that already have one",
+        )
+
+    def handle(self, *args, **options):
+        for model in (ProductCategory, Product):
+            queryset = model.objects.exclude(image='').only('id', 'image', 'image_digest')
+            if not options['force']:
+                queryset = queryset.filter(image_digest='')
+
+            done = failed = 0
+            for obj in queryset.iterator():
+                try:
+                    digest = generate_derivatives(obj.image)
+                except (OSError, ValueError) as exc:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} #{obj.pk} ({obj.image.name}): {exc}")
+                    continue
+                # update() rather than save() so slugs/timestamps are untouched.
+                model.objects.filter(pk=obj.pk).update(image_digest=digest)
+                done += 1
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.verbose_name_plural}: {done} processed, {failed} failed"
+            ))
+        # Digests were written with update(), which sends no signals.
+        bump_catalogue_version()
@@ -0,0 +1,65 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bakery import images
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+class Command(BaseCommand):
+    help = (
+        "Write AVIF/WebP variants of the PNG/JPEG images in STATICFILES_DIRS "
+        "(next to them, under variants/) for {% static_sources %} to offer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-size', type=int, default=8 * 1024,
+            help="Skip images smaller than this many bytes (default: 8 KiB)",
+        )
+        parser.add_argument('--force', action='store_true', help="Rebuild variants that are up to date")
+
+    def sources(self):
+        for root in settings.STATICFILES_DIRS:
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames[:] = [name for name in dirnames if name != 'variants']
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(SOURCE_EXTENSIONS):
+                        path = os.path.join(directory, filename)
+                        yield path, os.path.relpath(path, root).replace(os.sep, '/')
+
+    def handle(self, *args, **options):
+        formats = images.static_variant_formats()
+        self.stdout.write(f"Formats: {', '.join(formats)}")
+        before = after = 0
+        for source, name in self.sources():
+            size = os.path.getsize(source)
+            if size < options['min_size']:
+                continue
+            smallest = size
+            for fmt in formats:
+                target = os.path.join(source[:-len(name)], images.static_variant_name(name, fmt))
+                if (not options['force'] and os.path.exists(target)
+                        and os.path.getmtime(target) >= os.path.getmtime(source)):
+                    smallest = min(smallest, os.path.getsize(target))
+                    continue
+                data = images.encode_static_variant(source, fmt)
+                if len(data) >= size:
+                    # Not worth offering; drop any stale copy.
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'wb') as fh:
+                    fh.write(data)
+                smallest = min(smallest, len(data))
+            before += size
+            after += smallest
+            self.stdout.write(f"{name:<60}{size // 1024:>8} KiB -> {smallest // 1024:>6} KiB")
+        if before:
+            self.stdout.write(self.style.SUCCESS(
+                f"{before // 1024} KiB of artwork -> {after // 1024} KiB "
+                f"in the best variant ({100 - after * 100 // before}% smaller)"
+            ))
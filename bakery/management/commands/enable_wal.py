@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Switch the SQLite database to write-ahead logging, so readers no "
+        "longer block the writer.  The mode is stored in the database file: "
+        "run this once when setting up a deployment, not on every connection"
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("Write-ahead logging is only configured on SQLite; nothing to do.")
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            mode = cursor.fetchone()[0]
+        if mode.lower() != 'wal':
+            raise CommandError(f"SQLite kept journal_mode = {mode}")
+        self.stdout.write(self.style.SUCCESS("Journal mode is now WAL"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bakery import catalogue_io
+
+
+class Command(BaseCommand):
+    help = (
+        "Write every product to a CSV or JSONL file that import_catalogue "
+        "reads back. Rows are streamed from the database, so any catalogue "
+        "size exports in constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, or - for standard output")
+        parser.add_argument('--format', choices=catalogue_io.FORMATS, help="Default: from the file extension")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or catalogue_io.detect_format(path)
+        if path == '-':
+            catalogue_io.write_rows(catalogue_io.export_rows(), self.stdout, fmt)
+            return
+        try:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                count = catalogue_io.write_rows(catalogue_io.export_rows(), stream, fmt)
+        except OSError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} products to {path}"))
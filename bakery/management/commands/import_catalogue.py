@@ -0,0 +1,55 @@
+import io
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bakery import catalogue_io
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update products (matched by slug) from a CSV or JSONL file "
+        "as written by export_catalogue. The file is streamed and written in "
+        "batches, unknown category slugs are created, and with --images the "
+        "image column names files under that directory, which are stored and "
+        "resized by a pool of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for standard input")
+        parser.add_argument('--format', choices=catalogue_io.FORMATS, help="Default: from the file extension")
+        parser.add_argument('--images', metavar='DIR', help="Directory the image column is relative to")
+        parser.add_argument('--workers', type=int, help="Image worker processes (default: one per CPU)")
+        parser.add_argument('--batch-size', type=int, default=catalogue_io.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or catalogue_io.detect_format(path)
+
+        def report(line, message):
+            self.stderr.write(f"line {line}: {message}")
+
+        start = time.perf_counter()
+        try:
+            # utf-8-sig: spreadsheet exports often start with a BOM.
+            stream = (
+                io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='') if path == '-'
+                else open(path, encoding='utf-8-sig', newline='')
+            )
+        except OSError as exc:
+            raise CommandError(exc)
+        with stream:
+            importer = catalogue_io.CatalogueImporter(
+                image_root=options['images'],
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                on_error=report,
+            )
+            result = importer.run(catalogue_io.read_rows(stream, fmt))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.created} products created, {result.updated} updated, {result.skipped} skipped; "
+            f"{result.categories} categories created, {result.images} images processed in {elapsed:.2f}s"
+        ))
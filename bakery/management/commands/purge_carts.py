@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from bakery.models import Cart
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stale carts: anonymous carts and empty user carts not touched "
+        "for --days days. Run periodically (cron) next to clearsessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        stale = Cart.objects.filter(updated_at__lt=cutoff).filter(
+            Q(user__isnull=True) | Q(item_count=0)
+        )
+        if options['dry_run']:
+            self.stdout.write(f"{stale.count()} stale carts would be deleted")
+            return
+        deleted, per_model = stale.delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {per_model.get('bakery.Cart', 0)} carts "
+            f"({per_model.get('bakery.CartItem', 0)} items)"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bakery import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text product search index from the product table"
+
+    def handle(self, *args, **options):
+        if not search.fts_enabled():
+            self.stdout.write("Full-text index is only used on SQLite; nothing to do.")
+            return
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Sum
+
+from bakery.models import Cart
+
+
+class Command(BaseCommand):
+    help = "Recompute stored cart subtotals/item counts from their items and fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Only report carts whose stored totals are wrong",
+        )
+
+    def handle(self, *args, **options):
+        carts = Cart.objects.annotate(
+            actual_subtotal=Sum(F('items__price') * F('items__quantity')),
+            actual_count=Sum('items__quantity'),
+        ).only('id', 'subtotal', 'item_count')
+
+        checked = fixed = 0
+        for cart in carts.iterator():
+            checked += 1
+            subtotal = cart.actual_subtotal or Decimal('0.00')
+            count = cart.actual_count or 0
+            if cart.subtotal == subtotal and cart.item_count == count:
+                continue
+            fixed += 1
+            self.stdout.write(
+                f"Cart #{cart.pk}: {cart.subtotal}/{cart.item_count} -> {subtotal}/{count}"
+            )
+            if not options['dry_run']:
+                Cart.objects.filter(pk=cart.pk).update(subtotal=subtotal, item_count=count)
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{checked} carts checked, {fixed} {verb}"))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from bakery import tasks
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (contact notifications, emails), retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=20, help="Tasks claimed per poll")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--burst', action='store_true', help="Exit once no task is due")
+
+    def handle(self, *args, **options):
+        processed = 0
+        try:
+            while True:
+                close_old_connections()
+                ran = tasks.run_pending(options['batch'])
+                processed += ran
+                if ran:
+                    continue
+                if options['burst']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Processed {processed} tasks")
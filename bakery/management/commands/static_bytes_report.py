@@ -0,0 +1,129 @@
+import os
+import re
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from bakery.models import CustomUser
+
+PICTURE = re.compile(r'<picture\b.*?</picture>', re.S)
+SOURCE_SRCSET = re.compile(r'<source\b[^>]*\bsrcset="([^"\s]+)')
+IMG_SRC = re.compile(r'<img\b[^>]*\bsrc="([^"]+)"')
+LINK_HREF = re.compile(r'<link\b[^>]*\brel="stylesheet"[^>]*\bhref="([^"]+)"')
+SCRIPT_SRC = re.compile(r'<script\b[^>]*\bsrc="([^"]+)"')
+CSS_URL = re.compile(r'url\(\s*["\']?([^"\')]+)')
+IMAGE_SET = re.compile(r'image-set\((.*?)\)\s*[;}]', re.S)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bytes a first visit to a page transfers for its local static assets, "
+        "as served now (minified, Brotli, AVIF/WebP variants) vs. the "
+        "original source files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('pages', nargs='*', default=['home', 'about'], help="URL names (default: home about)")
+
+    def original_name(self, name):
+        if not hasattr(self, '_unhashed'):
+            self._unhashed = {hashed: original for original, hashed in staticfiles_storage.hashed_files.items()}
+        name = self._unhashed.get(name, name)
+        # images/variants/slide1.png.avif replaces images/slide1.png
+        directory, filename = os.path.split(name)
+        if os.path.basename(directory) == 'variants':
+            name = os.path.join(os.path.dirname(directory), filename.rsplit('.', 1)[0])
+        return name
+
+    def served_size(self, name):
+        path = os.path.join(settings.STATIC_ROOT, name)
+        for encoded in (path + '.br', path + '.gz', path):
+            if os.path.exists(encoded):
+                return os.path.getsize(encoded)
+        return 0
+
+    def source_size(self, name):
+        path = finders.find(name)
+        return os.path.getsize(path) if path else 0
+
+    def static_name(self, url):
+        if url.startswith(settings.STATIC_URL):
+            return unquote(url[len(settings.STATIC_URL):])
+        return None
+
+    def css_assets(self, css):
+        """
+        Images a stylesheet loads: the first candidate of each image-set(),
+        which overrides the plain url() fallback for the same image, and any
+        other url().
+        """
+        chosen, covered = [], set()
+        for candidates in IMAGE_SET.findall(css):
+            urls = CSS_URL.findall(candidates)
+            chosen.append(urls[0])
+            covered.update(self.original_name(self.static_name(url) or '') for url in urls)
+        others = [
+            url for url in CSS_URL.findall(IMAGE_SET.sub(';', css))
+            if self.original_name(self.static_name(url) or '') not in covered
+        ]
+        return chosen + others
+
+    def assets(self, html):
+        """(served name, original name) of every local asset the page loads."""
+        found = []
+        for picture in PICTURE.findall(html):
+            fallback = IMG_SRC.search(picture)
+            source = SOURCE_SRCSET.search(picture)  # the browser takes the first it supports
+            chosen = source.group(1) if source else fallback and fallback.group(1)
+            found.append(chosen)
+        html = PICTURE.sub('', html)
+        found += IMG_SRC.findall(html) + LINK_HREF.findall(html) + SCRIPT_SRC.findall(html)
+
+        assets = []
+        for url in dict.fromkeys(found):
+            name = self.static_name(url or '')
+            if name is None:
+                continue
+            assets.append((name, self.original_name(name)))
+            if name.endswith('.css'):
+                with open(os.path.join(settings.STATIC_ROOT, name), encoding='utf-8') as fh:
+                    for ref in self.css_assets(fh.read()):
+                        ref_name = self.static_name(ref)
+                        if ref_name:
+                            assets.append((ref_name, self.original_name(ref_name)))
+        return assets
+
+    def handle(self, *args, **options):
+        if not staticfiles_storage.hashed_files:
+            raise CommandError("No staticfiles manifest; run collectstatic first.")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            client = Client()
+            client.force_login(CustomUser.objects.create_user(
+                email='report@example.com', password='Qz7pLmw9', first_name='Bytes', last_name='Report',
+            ))
+            for page in options['pages']:
+                response = client.get(reverse(page))
+                assets = self.assets(response.content.decode())
+                self.stdout.write(f"\n{page}: {len(assets)} static assets")
+                self.stdout.write(f"  {'asset':<52}{'before':>12}{'after':>12}")
+                before = after = 0
+                for name, original in assets:
+                    size_before, size_after = self.source_size(original), self.served_size(name)
+                    before += size_before
+                    after += size_after
+                    self.stdout.write(f"  {original:<52}{size_before:>12,}{size_after:>12,}")
+                saved = 100 - after * 100 // before if before else 0
+                self.stdout.write(self.style.SUCCESS(f"  {'total':<52}{before:>12,}{after:>12,}  ({saved}% less)"))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
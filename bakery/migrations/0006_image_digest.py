@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0005_alter_cart_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='productcategory',
+            name='image_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:40
+
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS bakery_product_fts USING fts5("
+        "title, description, category, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO bakery_product_fts (rowid, title, description, category) "
+        "SELECT p.id, p.title, p.description, c.name "
+        "FROM bakery_product p JOIN bakery_productcategory c ON c.id = p.category_id"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS bakery_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0006_image_digest'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
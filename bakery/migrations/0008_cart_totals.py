@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:07
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def backfill_totals(apps, schema_editor):
+    Cart = apps.get_model('bakery', 'Cart')
+    for cart in Cart.objects.annotate(
+        total=Sum(F('items__price') * F('items__quantity')),
+        count=Sum('items__quantity'),
+    ):
+        Cart.objects.filter(pk=cart.pk).update(
+            subtotal=cart.total or Decimal('0.00'),
+            item_count=cart.count or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0007_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:15
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, Sum
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    # Fold repeated (cart, product, weight) lines into the oldest one so the
+    # unique constraint below can be created.
+    CartItem = apps.get_model('bakery', 'CartItem')
+    duplicates = list(
+        CartItem.objects.values('cart_id', 'product_id', 'weight')
+        .annotate(lines=Count('id'), keep=Min('id'), quantity=Sum('quantity'))
+        .filter(lines__gt=1)
+    )
+    for group in duplicates:
+        CartItem.objects.filter(
+            cart_id=group['cart_id'], product_id=group['product_id'], weight=group['weight'],
+        ).exclude(pk=group['keep']).delete()
+        CartItem.objects.filter(pk=group['keep']).update(quantity=group['quantity'])
+
+    Cart = apps.get_model('bakery', 'Cart')
+    for cart_id in {group['cart_id'] for group in duplicates}:
+        totals = CartItem.objects.filter(cart_id=cart_id).aggregate(
+            subtotal=Sum(F('price') * F('quantity')), count=Sum('quantity'),
+        )
+        Cart.objects.filter(pk=cart_id).update(
+            subtotal=totals['subtotal'] or 0, item_count=totals['count'] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0008_cart_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at'], name='contact_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-order_date'], name='order_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-order_date'], name='order_status_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', '-created_at'], name='product_category_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_featured', '-created_at'], name='product_featured_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['cart', 'added_at'], name='cartitem_cart_added_idx'),
+        ),
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product', 'weight'), name='unique_cart_line'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+def backfill_product_updated_at(apps, schema_editor):
+    # Unchanged products were last modified when they were created.
+    Product = apps.get_model('bakery', 'Product')
+    Product.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0011_product_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='productcategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_product_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'updated_at'], name='product_category_updated_idx'),
+        ),
+    ]
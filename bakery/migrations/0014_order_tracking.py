@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:05
+
+import bakery.models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_tracking(apps, schema_editor):
+    """Give existing orders a tracking id and a timeline of their current status."""
+    Order = apps.get_model('bakery', 'Order')
+    OrderStatusEvent = apps.get_model('bakery', 'OrderStatusEvent')
+    orders = list(Order.objects.only('id', 'status', 'order_date'))
+    for order in orders:
+        order.tracking_id = bakery.models.generate_tracking_id()
+    Order.objects.bulk_update(orders, ['tracking_id'], batch_size=500)
+    events = []
+    for order in orders:
+        events.append(OrderStatusEvent(order=order, status='pending', created_at=order.order_date))
+        if order.status != 'pending':
+            # When it changed was never recorded.
+            events.append(OrderStatusEvent(order=order, status=order.status, created_at=order.order_date))
+    OrderStatusEvent.objects.bulk_create(events, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0013_related_product'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='bakery.order')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['order', 'created_at'], name='order_event_timeline_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='tracking_id',
+            field=models.CharField(editable=False, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_tracking, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='tracking_id',
+            field=models.CharField(default=bakery.models.generate_tracking_id, editable=False, max_length=20, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-order_date'], name='order_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:30
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bakery', '0014_order_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('product', 'Product'), ('category', 'Category'), ('payment', 'Payment method'), ('location', 'Delivery location')], max_length=10)),
+                ('key', models.CharField(max_length=100)),
+                ('label', models.CharField(max_length=200)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.BigIntegerField(default=0)),
+                ('grams', models.BigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'daily sales',
+                'ordering': ['-day', 'dimension', '-revenue'],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'day', 'key'), name='unique_daily_sales')],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
-from django.db import models
+import secrets
+
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils.html import format_html
+from django.utils import timezone
 from django.utils.text import slugify
 from django.conf import settings
 from django.core.validators import MinValueValidator
@@ -12,17 +15,31 @@ from django.core.validators import EmailValidator
 from django.contrib.auth.hashers import make_password
 from django.db.models import Sum
 from decimal import Decimal
+from .images import generate_derivatives, image_url
+from . import pricing
 
 class ProductCategory(models.Model):
     name = models.CharField(max_length=100)
     image = models.ImageField(upload_to='category_images/', blank=True)
     slug = models.SlugField(unique=True, max_length=150) 
+    image_digest = models.CharField(max_length=64, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = "Product Categories"
     
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        if self.image and not self.image._committed:
+            self.image_digest = generate_derivatives(self.image)
+        elif not self.image:
+            self.image_digest = ''
+        super().save(*args, **kwargs)
+
+    def thumbnail_url(self, width, fmt='jpeg'):
+        return image_url(self.image, self.image_digest, width, fmt)
     
     @property
     def product_count(self):
@@ -59,14 +76,22 @@ class Product(models.Model):
     allergy_info = models.TextField(blank=True)
 
     image = models.ImageField(upload_to='products/', blank=True)
+    image_digest = models.CharField(max_length=64, blank=True, editable=False)
     
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
+        indexes = [
+            models.Index(fields=['category', '-created_at', '-id'], name='product_category_recent_idx'),
+            models.Index(fields=['is_featured', '-created_at'], name='product_featured_recent_idx'),
+            # Covers the Last-Modified/ETag lookup of bakery.conditional.
+            models.Index(fields=['category', 'updated_at'], name='product_category_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -74,6 +99,10 @@ class Product(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        if self.image and not self.image._committed:
+            self.image_digest = generate_derivatives(self.image)
+        elif not self.image:
+            self.image_digest = ''
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
@@ -82,18 +111,20 @@ class Product(models.Model):
             'product_id': self.id
         })
     
+    def thumbnail_url(self, width, fmt='jpeg'):
+        return image_url(self.image, self.image_digest, width, fmt)
+
     def image_preview(self):
         return format_html(
             '<img src="{}" width="50" height="50" style="object-fit: cover;" />', 
-            self.image.url
+            self.thumbnail_url(50)
         ) if self.image else ""
     image_preview.short_description = 'Image Preview'
 
     def in_wishlist(self, user):
         """Check if product is in user's wishlist"""
-        if not user.is_authenticated:
-            return False
-        return self.in_wishlists.filter(user=user).exists()
+        from .wishlist import wishlist_product_ids
+        return self.pk in wishlist_product_ids(user)
     
     @property
     def formatted_price(self):
@@ -101,7 +132,10 @@ class Product(models.Model):
     
     @property
     def weight_list(self):
-        return [w.strip() for w in self.weight_options.split(',')]
+        return [label for label, grams in pricing.weight_options(self.weight_options)]
+
+    def price_for(self, weight):
+        return pricing.unit_price(self.weight_options, self.base_price, weight)
 
 class UserManager(BaseUserManager):
     def _create_user(self, email, password=None, **extra_fields):
@@ -190,10 +224,23 @@ class ContactMessage(models.Model):
     message = models.TextField(max_length=1000)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='contact_recent_idx'),
+        ]
+
     def __str__(self):
         return f"Message from {self.name} - {self.subject}"
 
 
+TRACKING_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+
+def generate_tracking_id():
+    """Unguessable public order reference, e.g. ``TRK7QX2M9KD4HPA``."""
+    return 'TRK' + ''.join(secrets.choice(TRACKING_ALPHABET) for _ in range(12))
+
+
 class Order(models.Model):
     PAYMENT_METHODS = (
         ('upi', 'UPI'),
@@ -215,6 +262,14 @@ class Order(models.Model):
     delivery_location = models.CharField(max_length=100)
     delivery_address = models.TextField()
     special_notes = models.TextField(blank=True, null=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='orders',
+    )
+    tracking_id = models.CharField(max_length=20, unique=True, editable=False, default=generate_tracking_id)
 
     order_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=ORDER_STATUSES, default='pending')
@@ -229,9 +284,51 @@ class Order(models.Model):
     
     class Meta:
         ordering = ['-order_date']
+        indexes = [
+            models.Index(fields=['-order_date'], name='order_recent_idx'),
+            models.Index(fields=['status', '-order_date'], name='order_status_recent_idx'),
+            models.Index(fields=['user', '-order_date'], name='order_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.customer_name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        order = super().from_db(db, field_names, values)
+        order._saved_status = order.__dict__.get('status')
+        return order
+
+    def save(self, *args, **kwargs):
+        """Save, and record an ``OrderStatusEvent`` when the status is new or changed."""
+        changed = 'status' not in self.get_deferred_fields() and (
+            self._state.adding or self.status != getattr(self, '_saved_status', None)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if changed:
+                OrderStatusEvent.objects.create(order=self, status=self.status)
+        self._saved_status = self.__dict__.get('status')
+
+    def get_absolute_url(self):
+        return reverse('order_detail', kwargs={'tracking_id': self.tracking_id})
+
+
+class OrderStatusEvent(models.Model):
+    """One entry of an order's tracking timeline, written by ``Order.save()``."""
+
+    order = models.ForeignKey(Order, related_name='events', on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=Order.ORDER_STATUSES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='order_event_timeline_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} {self.status} at {self.created_at:%Y-%m-%d %H:%M}"
     
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
@@ -267,11 +364,15 @@ class Payment(models.Model):
     card_last4 = models.CharField(max_length=4, blank=True, null=True)
     card_expiry = models.CharField(max_length=5, blank=True, null=True)  # MM/YY format
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-payment_date'], name='payment_status_recent_idx'),
+            models.Index(fields=['-payment_date'], name='payment_recent_idx'),
+        ]
+
     def __str__(self):
-        return f"Payment for Order #{self.order.id}"
-    
+        return f"Payment for Order #{self.order_id}"
 
-from django.db.models import Sum, F
 
 class Cart(models.Model):
     user = models.OneToOneField(
@@ -283,23 +384,35 @@ class Cart(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalised from the cart's items; kept in step by bakery.cart and
+    # repaired by the reconcile_carts command.
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    item_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-updated_at'], name='cart_recent_idx'),
+        ]
+
+    @property
+    def quote(self):
+        return pricing.quote(self.subtotal)
+
     @property
-    def subtotal(self):
-        return self.items.aggregate(
-            subtotal=Sum(F('price') * F('quantity'))
-        )['subtotal'] or Decimal('0.00')
+    def discount(self):
+        return self.quote.discount
 
     @property
     def tax_amount(self):
-        return self.subtotal * Decimal('0.18')  # 18% GST
+        return self.quote.gst
 
     @property
     def delivery_charge(self):
-        return Decimal('50.00')
+        return self.quote.delivery_fee
 
     @property
     def total(self):
-        return self.subtotal + self.tax_amount + self.delivery_charge
+        return self.quote.total
 
 
 class CartItem(models.Model):
@@ -323,4 +436,126 @@ class CartItem(models.Model):
 
     @property
     def total_price(self):
-        return self.price * self.quantity
\ No newline at end of file
+        return self.price * self.quantity
+
+    class Meta:
+        constraints = [
+            # One line per product/weight, so add-to-cart can upsert.
+            models.UniqueConstraint(fields=['cart', 'product', 'weight'], name='unique_cart_line'),
+        ]
+        indexes = [
+            models.Index(fields=['cart', 'added_at'], name='cartitem_cart_added_idx'),
+        ]
+
+
+class Task(models.Model):
+    """A unit of background work run by the ``run_tasks`` worker."""
+
+    STATUSES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # Earliest time the task may run; while running, the end of its lease.
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class RelatedProduct(models.Model):
+    """
+    Precomputed recommendation: ``related`` is shown ``rank``-th on
+    ``product``'s page.  Rebuilt by the ``build_related_products`` command.
+    """
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommended_on')
+    rank = models.PositiveSmallIntegerField()
+    # Weighted co-occurrence count; 0 for same-category filler.
+    score = models.FloatField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='unique_related_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} (#{self.rank})"
+
+
+class DailySales(models.Model):
+    """
+    One day's sales for one product, category, payment method or delivery
+    location.  Maintained incrementally by the ``rollup_sales`` command
+    from order status events, so reports never aggregate raw orders.
+    """
+
+    DIMENSIONS = (
+        ('product', 'Product'),
+        ('category', 'Category'),
+        ('payment', 'Payment method'),
+        ('location', 'Delivery location'),
+    )
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=10, choices=DIMENSIONS)
+    # Product/category id, payment method code or the location itself.
+    key = models.CharField(max_length=100)
+    label = models.CharField(max_length=200)
+    orders = models.IntegerField(default=0)
+    units = models.BigIntegerField(default=0)
+    grams = models.BigIntegerField(default=0)
+    # Line totals: before discount, delivery fee and GST.
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        ordering = ['-day', 'dimension', '-revenue']
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'day', 'key'], name='unique_daily_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.get_dimension_display()} {self.label}"
+
+
+class RollupWatermark(models.Model):
+    """How far an incremental rollup has read its source table."""
+
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+
+class CatalogueVersion(models.Model):
+    """
+    The catalogue's current version, a single row.  Every catalogue edit
+    bumps it and every process reads it, so the fragments and snapshots
+    cached under it go stale in all workers at once (``bakery.catalogue``).
+    """
+
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .models import Order, OrderItem, OrderStatusEvent
+
+ORDERS_PAGE_SIZE = 10
+# Orders moved per UPDATE by set_status(); keeps the id list within the
+# database's bound-parameter limit.
+STATUS_BATCH = 500
+
+# Tracking steps in order: the status that completes each one, its label
+# before and after, and when it is expected after the order was placed.
+TIMELINE_STEPS = (
+    ('pending', 'PLACE YOUR ORDER', 'ORDER PLACED', timedelta()),
+    ('processing', 'BILLING YOUR ORDER', 'ORDER BILLED', timedelta(hours=1)),
+    ('shipped', 'LOADING YOUR ORDER', 'ORDER LOADED', timedelta(hours=3, minutes=30)),
+    ('delivered', 'DELIVERY EXPECTED', 'DELIVERED', timedelta(days=1)),
+)
+DELIVERY_TIME = TIMELINE_STEPS[-1][3]
+
+
+def with_details(queryset):
+    """
+    ``queryset`` with everything an order page shows: payment joined in,
+    items with their products and the status events prefetched, so any
+    number of orders costs three queries.
+    """
+    return queryset.select_related('payment').prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('id')),
+        Prefetch('events', queryset=OrderStatusEvent.objects.order_by('created_at', 'id')),
+    )
+
+
+def user_orders(user):
+    return with_details(Order.objects.filter(user=user).order_by('-order_date', '-id'))
+
+
+def timeline(order):
+    """
+    The tracking steps of ``order`` from its recorded (prefetched) status
+    events.  Every step up to the latest status reached is done, with the
+    time it was recorded where there is one; the rest show when they are
+    expected.
+    """
+    reached = {}
+    for event in order.events.all():
+        reached.setdefault(event.status, event.created_at)
+    statuses = [status for status, *_ in TIMELINE_STEPS]
+    progress = max((statuses.index(status) for status in reached if status in statuses), default=0)
+
+    steps = []
+    for position, (status, label, done_label, expected_after) in enumerate(TIMELINE_STEPS):
+        done = position <= progress
+        if 'cancelled' in reached and not done:
+            break
+        steps.append({
+            'step': done_label if done else label,
+            'time': reached.get(status) or order.order_date + expected_after,
+            'done': done,
+        })
+    if 'cancelled' in reached:
+        steps.append({'step': 'ORDER CANCELLED', 'time': reached['cancelled'], 'done': True})
+    return steps
+
+
+def set_status(queryset, status):
+    """
+    Move the orders in ``queryset`` to ``status`` with one UPDATE per
+    ``STATUS_BATCH`` orders, recording the timeline events ``Order.save()``
+    would have.  Orders already in ``status`` are left alone; returns how
+    many changed.
+    """
+    changed = 0
+    with transaction.atomic():
+        ids = list(queryset.exclude(status=status).select_for_update().values_list('id', flat=True))
+        for start in range(0, len(ids), STATUS_BATCH):
+            batch = ids[start:start + STATUS_BATCH]
+            changed += Order.objects.filter(id__in=batch).update(status=status)
+            OrderStatusEvent.objects.bulk_create(OrderStatusEvent(order_id=pk, status=status) for pk in batch)
+    return changed
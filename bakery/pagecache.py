@@ -0,0 +1,56 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+from .context_processors import _cart_item_count
+
+PAGE_KEY = 'bakery:page:{}:{}:{}'
+
+# Rendered in place of the per-request values and swapped back in on every
+# response, so one cached body serves every visitor.
+CSRF_PLACEHOLDER = 'bakery-csrf-token-placeholder'
+CART_COUNT_PLACEHOLDER = 'bakery-cart-count-placeholder'
+CART_BADGE_TEMPLATE = 'bakery/include/cart_badge.html'
+
+
+def page_cache_key(template_name, authenticated):
+    # New static file hashes (a deploy) must not be served from old pages.
+    manifest = getattr(staticfiles_storage, 'manifest_hash', '')
+    return PAGE_KEY.format(manifest, template_name, int(authenticated))
+
+
+@lru_cache(maxsize=128)
+def _cart_badge(count):
+    return render_to_string(CART_BADGE_TEMPLATE, {'cart_item_count': count})
+
+
+def render_cached(request, template_name, context=None):
+    """
+    ``render()`` for pages whose content is the same for every visitor
+    except the CSRF token and the header cart count.  The body is rendered
+    once per authentication state and kept for ``PAGE_CACHE_TIMEOUT``
+    seconds; hits only substitute those two values.
+    """
+    timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return render(request, template_name, context)
+
+    key = page_cache_key(template_name, request.user.is_authenticated)
+    body = cache.get(key)
+    if body is None:
+        body = render_to_string(template_name, {
+            **(context or {}),
+            'csrf_token': CSRF_PLACEHOLDER,
+            'cart_item_count': CART_COUNT_PLACEHOLDER,
+        }, request)
+        cache.set(key, body, timeout)
+
+    body = body.replace(_cart_badge(CART_COUNT_PLACEHOLDER), _cart_badge(_cart_item_count(request)))
+    body = body.replace(CSRF_PLACEHOLDER, get_token(request))
+    return HttpResponse(body)
@@ -0,0 +1,110 @@
+import re
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from types import MappingProxyType
+
+DISCOUNT_RATE = Decimal('0.15')
+GST_RATE = Decimal('0.05')
+DELIVERY_FEE = Decimal('40')
+FREE_DELIVERY_FROM = Decimal('500')
+
+CENT = Decimal('0.01')
+_WEIGHT_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(KG|G)\s*$', re.IGNORECASE)
+
+
+def parse_weight(label):
+    """
+    Grams in a weight label such as ``500G``, ``1 KG`` or ``0.5g``, as a
+    ``Decimal`` so fractions of a gram survive; None if invalid.
+    """
+    match = _WEIGHT_RE.match(label or '')
+    if not match:
+        return None
+    amount, unit = Decimal(match.group(1)), match.group(2).upper()
+    grams = amount * 1000 if unit == 'KG' else amount
+    if grams <= 0:
+        return None
+    # 1.5 KG -> 1500, not 1500.0 or 1.5E+3.
+    return grams.to_integral_value() if grams == grams.to_integral_value() else grams.normalize()
+
+
+def format_weight(grams):
+    grams = Decimal(grams)
+    if grams < 1000:
+        return f"{grams.normalize():f} G"
+    return f"{(grams / 1000).normalize():f} KG"
+
+
+@lru_cache(maxsize=1024)
+def weight_options(options):
+    """``((label, grams), ...)`` for a comma-separated option string, in order."""
+    parsed = []
+    for option in options.split(','):
+        grams = parse_weight(option)
+        if grams is not None:
+            parsed.append((format_weight(grams), grams))
+    return tuple(parsed)
+
+
+def _price(base_price, grams):
+    return (base_price * grams / 1000).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+@lru_cache(maxsize=8192)
+def price_table(options, base_price):
+    """
+    Read-only ``{weight label: unit price}`` for one product.  Cached on the
+    option string and the per-kg price, so a ``Product.save`` that changes
+    either simply produces a new table.
+    """
+    return MappingProxyType({
+        label: _price(base_price, grams) for label, grams in weight_options(options)
+    })
+
+
+@lru_cache(maxsize=65536)
+def unit_price(options, base_price, weight):
+    """
+    Price of one unit of ``weight``.  Listed weights come from the
+    precomputed table; other well-formed weights are priced per kg, and
+    unparseable labels fall back to the per-kg price.
+    """
+    grams = parse_weight(weight)
+    if grams is None:
+        return base_price
+    table = price_table(options, base_price)
+    return table.get(format_weight(grams)) or _price(base_price, grams)
+
+
+@dataclass(frozen=True)
+class Quote:
+    subtotal: Decimal
+    discount: Decimal
+    delivery_fee: Decimal
+    gst: Decimal
+    total: Decimal
+
+
+def quote(subtotal):
+    """Apply the order-level rules to a basket subtotal."""
+    subtotal = Decimal(subtotal).quantize(CENT)
+    discount = (subtotal * DISCOUNT_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+    delivery_fee = DELIVERY_FEE if subtotal < FREE_DELIVERY_FROM else Decimal('0')
+    gst = (subtotal * GST_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+    return Quote(subtotal, discount, delivery_fee, gst, subtotal - discount + delivery_fee + gst)
+
+
+def price_lines(lines):
+    """
+    Price a whole basket of ``(product, weight, quantity)`` in one pass.
+    Returns ``([(unit_price, line_total), ...], Quote)``.
+    """
+    priced = []
+    subtotal = Decimal('0')
+    for product, weight, quantity in lines:
+        price = unit_price(product.weight_options, product.base_price, weight)
+        line_total = price * quantity
+        subtotal += line_total
+        priced.append((price, line_total))
+    return priced, quote(subtotal)
@@ -0,0 +1,123 @@
+import heapq
+from collections import defaultdict
+from itertools import combinations, groupby
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import CartItem, OrderItem, Product, RelatedProduct, Wishlist
+
+RELATED_LIMIT = 3   # shown on a product page
+TOP_N = 6           # stored per product
+
+# How much one shared basket says about two products belonging together.
+BASKET_SOURCES = (
+    (OrderItem, 'order_id', 3.0),
+    (CartItem, 'cart_id', 2.0),
+    (Wishlist, 'user_id', 1.0),
+)
+# Bigger baskets (a wishlist of everything) are noise and cost O(n²) pairs.
+MAX_BASKET = 50
+
+
+def baskets(model, basket_field):
+    """Distinct product ids per order/cart/user, one basket at a time."""
+    rows = (
+        model.objects.order_by(basket_field)
+        .values_list(basket_field, 'product_id')
+        .iterator(chunk_size=5000)
+    )
+    for _, group in groupby(rows, key=lambda row: row[0]):
+        yield {product_id for _, product_id in group}
+
+
+def co_occurrence():
+    """``{product_id: {other_id: score}}`` summed over every basket source."""
+    scores = defaultdict(lambda: defaultdict(float))
+    for model, basket_field, weight in BASKET_SOURCES:
+        for basket in baskets(model, basket_field):
+            if len(basket) > MAX_BASKET:
+                continue
+            for a, b in combinations(basket, 2):
+                scores[a][b] += weight
+                scores[b][a] += weight
+    return scores
+
+
+def compute_related(top_n=TOP_N):
+    """
+    ``{product_id: [(related_id, score), ...]}``: the products most often
+    bought, carted or wishlisted together with each product, topped up with
+    the newest products of its own category.
+    """
+    products = list(Product.objects.order_by('-created_at', '-id').values_list('id', 'category_id'))
+    by_category = defaultdict(list)
+    for product_id, category_id in products:
+        by_category[category_id].append(product_id)
+
+    scores = co_occurrence()
+    newest = {product_id: position for position, (product_id, _) in enumerate(products)}
+    related = {}
+    for product_id, category_id in products:
+        candidates = scores.get(product_id, {})
+        # Ties go to the newer product.
+        chosen = heapq.nlargest(
+            top_n,
+            ((score, -newest[other], other) for other, score in candidates.items() if other in newest),
+        )
+        picks = [(other, score) for score, _, other in chosen]
+        seen = {product_id, *(other for other, _ in picks)}
+        for other in by_category[category_id]:
+            if len(picks) >= top_n:
+                break
+            if other not in seen:
+                picks.append((other, 0.0))
+        related[product_id] = picks
+    return related
+
+
+def rebuild(top_n=TOP_N, batch_size=1000):
+    """Replace every stored recommendation; returns the number of rows written."""
+    related = compute_related(top_n)
+    now = timezone.now()
+    rows = [
+        RelatedProduct(product_id=product_id, related_id=other, rank=rank, score=score, computed_at=now)
+        for product_id, picks in related.items()
+        for rank, (other, score) in enumerate(picks)
+    ]
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        RelatedProduct.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def related_products(product, limit=RELATED_LIMIT):
+    """
+    Products to show on ``product``'s page: one keyed lookup on
+    ``(product, rank)``.  Empty for products added since the last rebuild;
+    those show ``fallback_related()``.
+    """
+    return (
+        Product.objects.filter(recommended_on__product=product)
+        .order_by('recommended_on__rank')
+        .select_related('category')[:limit]
+    )
+
+
+def fallback_related(product, limit=RELATED_LIMIT):
+    """The newest other products of ``product``'s category."""
+    return (
+        Product.objects.filter(category_id=product.category_id)
+        .exclude(id=product.id)
+        .select_related('category')[:limit]
+    )
+
+
+def related_version(product_id):
+    """What a product page's recommendations depend on, for its ETag."""
+    return RelatedProduct.objects.filter(product_id=product_id).aggregate(
+        computed_at=Max('computed_at'),
+        updated_at=Max('related__updated_at'),
+        count=Count('id'),
+    )
@@ -0,0 +1,117 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Product
+
+FTS_TABLE = 'bakery_product_fts'
+# bm25() column weights: a hit in the title outranks the category name,
+# which outranks the description.
+RANKING = f"bm25({FTS_TABLE}, 10.0, 2.0, 5.0)"
+SEARCH_PAGE_SIZE = 24
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 MATCH expression where every word must
+    match as a prefix, e.g. ``choc cak`` -> ``"choc"* "cak"*``.
+    """
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(query.lower()))
+
+
+def index_products(products):
+    if not fts_enabled():
+        return
+    rows = [
+        (p.pk, p.title, p.description, p.category.name)
+        for p in products
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, category) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def remove_product(product_id):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+
+
+def rebuild_index():
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, category) "
+            "SELECT p.id, p.title, p.description, c.name "
+            "FROM bakery_product p JOIN bakery_productcategory c ON c.id = p.category_id"
+        )
+
+
+class RankedSearchResults:
+    """
+    Lazily evaluated, BM25-ranked product matches.  Supports ``count()`` and
+    slicing, so it can be handed straight to ``Paginator``; only the ids of
+    the requested slice are read from the index.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                        [self.match],
+                    )
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        if not self.match or stop <= start:
+            return []
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY {RANKING} LIMIT %s OFFSET %s",
+                [self.match, stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        products = Product.objects.select_related('category').in_bulk(ids)
+        return [products[pk] for pk in ids if pk in products]
+
+
+def search(query):
+    """Ranked FTS5 results on SQLite, a plain ``icontains`` queryset elsewhere."""
+    if fts_enabled():
+        return RankedSearchResults(query)
+    return Product.objects.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(category__name__icontains=query)
+    ).select_related('category').order_by('-created_at', '-id')
@@ -0,0 +1,52 @@
+import copy
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search, suggest
+from .catalogue import bump_catalogue_version
+from .models import Product, ProductCategory
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+def catalogue_changed(sender, instance, signal, **kwargs):
+    previous, version = bump_catalogue_version()
+    # Only a committed edit may reach the suggestions; after a rollback the
+    # index simply stays at the version it was built for.  A copy, because
+    # delete() clears the instance's pk before the commit.
+    transaction.on_commit(partial(
+        suggest.index.apply, copy.copy(instance), signal is post_delete, previous, version,
+    ))
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_products([instance])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.remove_product(instance.pk)
+
+
+@receiver(post_save, sender=ProductCategory)
+def reindex_category(sender, instance, created=False, raw=False, **kwargs):
+    # The category name is indexed with every product in it.
+    if not created and not raw:
+        search.index_products(instance.products.select_related('category'))
+
+
+@receiver(connection_created, dispatch_uid='bakery.configure_sqlite')
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply ``settings.SQLITE_PRAGMAS`` to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -1,70 +1,90 @@
-
 document.addEventListener('DOMContentLoaded', function() {
+    const cart = document.getElementById('cart');
+    if (!cart) {
+        return;
+    }
+
+    // Quantity changes are collected and sent as one batch once the user
+    // stops clicking for FLUSH_DELAY ms.
+    const FLUSH_DELAY = 400;
+    const pending = new Map();
+    let timer = null;
+
+    function csrfToken() {
+        const input = document.querySelector('[name=csrfmiddlewaretoken]');
+        return input ? input.value : '';
+    }
+
+    function queueUpdate(itemId, quantity) {
+        pending.set(itemId, parseInt(quantity));
+        clearTimeout(timer);
+        timer = setTimeout(flush, FLUSH_DELAY);
+    }
+
+    function flush() {
+        if (!pending.size) {
+            return;
+        }
+        const updates = Array.from(pending, ([itemId, quantity]) => ({
+            item_id: itemId,
+            quantity: quantity
+        }));
+        pending.clear();
+
+        // keepalive lets the request outlive the page when this is the
+        // pagehide flush.
+        fetch(cart.dataset.bulkUrl, {
+            method: 'POST',
+            keepalive: true,
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken()
+            },
+            body: JSON.stringify({updates: updates})
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                location.reload();
+            }
+        });
+    }
+
     document.querySelectorAll('.increment').forEach(btn => {
         btn.addEventListener('click', function() {
             const input = this.parentNode.querySelector('.quantity');
             input.value = parseInt(input.value) + 1;
-            updateCartItem(this.dataset.itemId, input.value);
+            queueUpdate(this.dataset.itemId, input.value);
         });
     });
-    
+
     document.querySelectorAll('.decrement').forEach(btn => {
         btn.addEventListener('click', function() {
             const input = this.parentNode.querySelector('.quantity');
             if (input.value > 1) {
                 input.value = parseInt(input.value) - 1;
-                updateCartItem(this.dataset.itemId, input.value);
+                queueUpdate(this.dataset.itemId, input.value);
             }
         });
     });
 
-    document.querySelectorAll('.remove-item').forEach(btn => {
-        btn.addEventListener('click', function() {
-            if (confirm('Are you sure you want to remove this item?')) {
-                removeCartItem(this.dataset.itemId);
+    document.querySelectorAll('.quantity').forEach(input => {
+        input.addEventListener('change', function() {
+            if (parseInt(this.value) >= 1) {
+                queueUpdate(this.dataset.itemId, this.value);
             }
         });
     });
-    
-    function updateCartItem(itemId, quantity) {
-        fetch('{% url "update_cart_item" %}', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-CSRFToken': '{{ csrf_token }}'
-            },
-            body: JSON.stringify({
-                item_id: itemId,
-                quantity: quantity
-            })
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                location.reload();
-            }
-        });
-    }
-    
-   function removeCartItem(itemId) {
-        fetch("{% url 'remove_cart_item' %}", {
-            method: "POST",
-            headers: {
-                "Content-Type": "application/json",
-                "X-CSRFToken": "{{ csrf_token }}"
-            },
-            body: JSON.stringify({
-                item_id: itemId
-            })
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                location.reload();
-            }
-        });
-    }
-});
-
 
+    // Guest carts live in the session; their lines are removed through the
+    // batch endpoint with a quantity of 0.
+    document.querySelectorAll('.remove').forEach(btn => {
+        btn.addEventListener('click', function() {
+            queueUpdate(this.dataset.itemId, 0);
+            clearTimeout(timer);
+            flush();
+        });
+    });
 
+    window.addEventListener('pagehide', flush);
+});
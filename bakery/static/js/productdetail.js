@@ -8,7 +8,7 @@ document.addEventListener('DOMContentLoaded', function() {
   const incrementBtn = document.getElementById('incrementQty');
   const pincodeError = document.getElementById('pincodeError');
   const weightError = document.getElementById('weightError');
-  const buyNowBtn = document.getElementById('buyNowBtn');
+  const addedMessage = document.getElementById('addedMessage');
 
   let selectedWeight = null;
 
@@ -84,15 +84,48 @@ document.addEventListener('DOMContentLoaded', function() {
       if (firstError) {
         firstError.scrollIntoView({ behavior: 'smooth', block: 'center' });
       }
-    } else {
-      console.log('Form submitted with:', {
-        pincode: pincodeInput.value,
+    } else if (e.submitter && e.submitter.name === 'add_to_cart') {
+      // Add in place; without JS the form posts and redirects to the cart.
+      e.preventDefault();
+      addToCart(e.submitter);
+    }
+  });
+
+  function addToCart(button) {
+    button.disabled = true;
+    fetch(form.dataset.addUrl, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-CSRFToken': form.querySelector('[name=csrfmiddlewaretoken]').value
+      },
+      body: JSON.stringify({
+        product_id: form.dataset.productId,
         weight: selectedWeight,
         quantity: quantityInput.value
-      });
-     
+      })
+    })
+    .then(response => response.json())
+    .then(data => {
+      if (data.success) {
+        updateCartBadge(data.item_count);
+        addedMessage.classList.remove('d-none');
+        setTimeout(() => addedMessage.classList.add('d-none'), 3000);
+      }
+    })
+    .finally(() => { button.disabled = false; });
+  }
+
+  function updateCartBadge(count) {
+    let badge = document.getElementById('cartCount');
+    if (!badge) {
+      badge = document.createElement('span');
+      badge.id = 'cartCount';
+      badge.className = 'position-absolute top-0 start-100 translate-middle badge rounded-pill bg-danger fs-6';
+      document.querySelector('[data-cart-link]').appendChild(badge);
     }
-  });
+    badge.textContent = count;
+  }
 
   function animateButton(button) {
     button.classList.add('clicked');
@@ -105,37 +138,3 @@ document.addEventListener('DOMContentLoaded', function() {
   }
 });
 
-
-document.addEventListener('DOMContentLoaded', function() {
-  document.querySelector('.add-to-cart').addEventListener('click', function() {
-    const productId = this.dataset.productId;
-    const csrfToken = this.dataset.csrf;
-    const weight = document.getElementById('selectedWeight').value;
-    const quantity = document.getElementById('quantityInput').value;
-    
-    if (!weight) {
-      document.getElementById('weightError').classList.remove('d-none');
-      return;
-    }
-
-    fetch('{% url "add_to_cart" %}', {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'X-CSRFToken': csrfToken
-      },
-      body: JSON.stringify({
-        product_id: productId,
-        weight: weight,
-        quantity: quantity
-      })
-    })
-    .then(response => response.json())
-    .then(data => {
-      if (data.success) {
-        document.getElementById('cart-count').textContent = data.cart_count;
-        alert('Product added to cart!');
-      }
-    });
-  });
-});
\ No newline at end of file
@@ -0,0 +1,35 @@
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.search-suggest').forEach(input => {
+        const list = document.getElementById(input.getAttribute('list'));
+        let timer = null;
+        let controller = null;
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (query.length < 2) {
+                list.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(() => {
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                fetch(input.dataset.suggestUrl + '?q=' + encodeURIComponent(query), {
+                    signal: controller.signal
+                })
+                .then(response => response.json())
+                .then(data => {
+                    list.innerHTML = '';
+                    data.suggestions.forEach(suggestion => {
+                        const option = document.createElement('option');
+                        option.value = suggestion.label;
+                        list.appendChild(option);
+                    });
+                })
+                .catch(() => {});
+            }, 150);
+        });
+    });
+});
@@ -0,0 +1,54 @@
+import os
+
+import rcssmin
+import rjsmin
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+MINIFIERS = {
+    '.css': rcssmin.cssmin,
+    '.js': rjsmin.jsmin,
+}
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed + gzip/Brotli storage that also minifies our own
+    CSS and JS in STATIC_ROOT before they are hashed and compressed.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # A template naming a file that does not exist keeps rendering (with
+        # the unhashed URL) instead of raising.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            # Hashing reads each file from the storage it was found in, so
+            # point minified files at their copy in STATIC_ROOT instead.
+            paths = {
+                name: (self, name) if self.minify(name) else source
+                for name, source in paths.items()
+            }
+        yield from super().post_process(paths, dry_run, **options)
+
+    def minify(self, name):
+        """Minify ``name`` in place; return whether it was rewritten."""
+        if name.startswith('admin/') or '.min.' in name:
+            return False
+        minifier = MINIFIERS.get(os.path.splitext(name)[1].lower())
+        if minifier is None:
+            return False
+        path = self.path(name)
+        with open(path, encoding='utf-8') as fh:
+            source = fh.read()
+        minified = minifier(source)
+        if len(minified) >= len(source):
+            return False
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(minified)
+        return True
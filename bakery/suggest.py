@@ -0,0 +1,110 @@
+import re
+import threading
+from bisect import bisect_left, insort
+
+from .catalogue import ProductEntry, catalogue_version, get_catalogue
+
+SUGGEST_LIMIT = 8
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalise(text):
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def _terms(label):
+    # Every word start is a term, so "vel" finds "Red Velvet Cake".
+    words = normalise(label).split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+class SuggestionIndex:
+    """
+    Sorted array of ``(term, kind, key, label, url)`` tuples searched with
+    bisect.  Lookups only read the catalogue version: the index is built
+    from the catalogue snapshot and patched when this process edits the
+    catalogue; edits made elsewhere show up as a version change and
+    trigger a rebuild on the next lookup.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._entries = []
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _add(entries, by_key, kind, key, label, url):
+        rows = [(term, kind, key, label, url) for term in _terms(label)]
+        for row in rows:
+            insort(entries, row)
+        by_key[(kind, key)] = rows
+
+    @staticmethod
+    def _remove(entries, by_key, kind, key):
+        for row in by_key.pop((kind, key), ()):
+            position = bisect_left(entries, row)
+            if position < len(entries) and entries[position] == row:
+                del entries[position]
+
+    def rebuild(self, snapshot):
+        entries, by_key = [], {}
+        for category in snapshot.categories:
+            rows = [(term, 'category', category.id, category.name, category.get_absolute_url())
+                    for term in _terms(category.name)]
+            entries.extend(rows)
+            by_key[('category', category.id)] = rows
+        for product in snapshot.products:
+            rows = [(term, 'product', product.id, product.title, product.get_absolute_url())
+                    for term in _terms(product.title)]
+            entries.extend(rows)
+            by_key[('product', product.id)] = rows
+        entries.sort()
+        with self._lock:
+            self._entries, self._by_key, self.version = entries, by_key, snapshot.version
+
+    def apply(self, instance, deleted, previous_version, version):
+        """
+        Patch one edited product in if the index was current.  The patch is
+        made to a copy that is swapped in whole, as ``rebuild()`` does, so
+        a concurrent ``lookup()`` never sees a half-edited list.
+        """
+        with self._lock:
+            if self.version is None or self.version != previous_version:
+                return
+            if instance._meta.model_name == 'productcategory':
+                # A renamed slug changes every product URL in the category.
+                self.version = None
+                return
+            entries, by_key = list(self._entries), dict(self._by_key)
+            self._remove(entries, by_key, 'product', instance.pk)
+            if not deleted:
+                url = ProductEntry(instance.pk, instance.title, instance.category.slug).get_absolute_url()
+                self._add(entries, by_key, 'product', instance.pk, instance.title, url)
+            self._entries, self._by_key, self.version = entries, by_key, version
+
+    def lookup(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = normalise(prefix)
+        if not prefix:
+            return []
+        if self.version != catalogue_version():
+            self.rebuild(get_catalogue())
+
+        entries = self._entries
+        results, seen = [], set()
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(results) < limit:
+            term, kind, key, label, url = entries[position]
+            if not term.startswith(prefix):
+                break
+            if (kind, key) not in seen:
+                seen.add((kind, key))
+                results.append({'label': label, 'kind': kind, 'url': url})
+            position += 1
+        # Categories first, then products, each alphabetically.
+        results.sort(key=lambda r: (r['kind'] != 'category', r['label'].lower()))
+        return results
+
+
+index = SuggestionIndex()
@@ -0,0 +1,121 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ContactMessage, Task
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 30      # seconds before the first retry, doubled per attempt
+MAX_RETRY_DELAY = 3600
+LEASE = 300           # seconds a claimed task may run before it is retried
+
+_registry = {}
+
+
+def task(func):
+    """Register ``func`` so it can be enqueued and run by name."""
+    _registry[func.__name__] = func
+    return func
+
+
+def enqueue(func, *, delay=0, max_attempts=5, **payload):
+    """
+    Store a call to the registered ``func`` with JSON-serialisable keyword
+    arguments.  Enqueued inside a transaction, the task only becomes visible
+    to the worker once that transaction commits.
+    """
+    if _registry.get(func.__name__) is not func:
+        raise ValueError(f"{func.__name__} is not a registered task")
+    return Task.objects.create(
+        name=func.__name__,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def claim(limit):
+    """
+    Claim up to ``limit`` due tasks.  Each claim is a conditional UPDATE, so
+    concurrent workers never run the same task, and it counts the attempt,
+    so a task that keeps killing its worker still runs out of attempts.
+    Tasks whose lease ran out (a worker died mid-task) are due again, or
+    failed once they have no attempts left.
+    """
+    now = timezone.now()
+    abandoned = Task.objects.filter(
+        status='running', run_at__lte=now, attempts__gte=F('max_attempts'),
+    ).update(
+        status='failed', last_error='The worker stopped before the task finished.', updated_at=now,
+    )
+    if abandoned:
+        logger.error("%d task(s) failed permanently after their worker stopped", abandoned)
+
+    due = Task.objects.filter(status__in=('pending', 'running'), run_at__lte=now)
+    claimed = []
+    for pk in due.order_by('run_at', 'id').values_list('id', flat=True)[:limit]:
+        # A task another worker claimed first now has its lease in the future.
+        if due.filter(pk=pk).update(
+            status='running', attempts=F('attempts') + 1,
+            run_at=now + timedelta(seconds=LEASE), updated_at=now,
+        ):
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_at', 'id'))
+
+
+def execute(job):
+    """Run a claimed task and record the outcome of the attempt ``claim()`` counted."""
+    func = _registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"No task registered as {job.name!r}")
+        func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            logger.error("Task %s failed permanently", job, exc_info=True)
+        else:
+            job.status = 'pending'
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+            logger.warning("Task %s failed, retrying at %s", job, job.run_at, exc_info=True)
+    else:
+        job.status = 'done'
+        job.last_error = ''
+    job.save(update_fields=['status', 'run_at', 'last_error', 'updated_at'])
+    return job.status
+
+
+def run_pending(limit=20):
+    """Claim and run up to ``limit`` due tasks; return how many ran."""
+    jobs = claim(limit)
+    for job in jobs:
+        execute(job)
+    return len(jobs)
+
+
+@task
+def send_contact_notification(message_id):
+    message = ContactMessage.objects.select_related('user').get(pk=message_id)
+    send_mail(
+        f'New Contact Message: {message.subject}',
+        f'''From: {message.name} <{message.email}>
+Phone: {message.phone}
+User: {message.user.email if message.user else 'guest'}
+
+Message:
+{message.message}''',
+        settings.DEFAULT_FROM_EMAIL,
+        [settings.CONTACT_EMAIL],
+        fail_silently=False,
+    )
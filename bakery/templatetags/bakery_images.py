@@ -0,0 +1,55 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.encoding import iri_to_uri
+from django.utils.html import format_html_join
+
+from .. import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(obj, fmt='webp'):
+    """srcset string for an object with ``image`` and ``image_digest`` fields."""
+    if not obj.image or not obj.image_digest:
+        return ''
+    return images.srcset(obj.image_digest, fmt)
+
+
+@register.simple_tag
+def thumbnail_url(obj, width, fmt='jpeg'):
+    return images.image_url(obj.image, obj.image_digest, width, fmt)
+
+
+@register.inclusion_tag('bakery/include/picture.html')
+def picture(obj, alt='', sizes='100vw', width=640, css_class='', style=''):
+    """
+    Render a <picture> with a WebP srcset, a JPEG srcset fallback and a
+    plain <img src> sized for ``width`` for browsers without srcset.
+    """
+    digest = obj.image_digest if obj.image else ''
+    return {
+        'src': images.image_url(obj.image, digest, width, 'jpeg'),
+        'webp_srcset': images.srcset(digest, 'webp') if digest else '',
+        'jpeg_srcset': images.srcset(digest, 'jpeg') if digest else '',
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+        'style': style,
+    }
+
+
+@register.simple_tag
+def static_sources(path):
+    """
+    <source> elements for the AVIF/WebP variants of the static image
+    ``path``, to place before its <img> inside a <picture>.
+    """
+    return format_html_join(
+        '', '<source type="{}" srcset="{}" />',
+        (
+            # srcset is whitespace-separated, so spaces in file names must be escaped.
+            (images.STATIC_VARIANT_TYPES[fmt], iri_to_uri(static(name)))
+            for fmt, name in images.static_variants(path)
+        ),
+    )
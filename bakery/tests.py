@@ -1,3 +1,1482 @@
-from django.test import TestCase
+import base64
+import importlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.exceptions import BadRequest
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections, transaction
+from django.template import Context, Template
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import (
+    analytics, cart as cart_service, catalogue, catalogue_io, checkout, images, pagecache, pagination,
+    pricing, recommend, search, suggest, tasks, urls, views, wishlist,
+)
+from .models import (
+    Cart, CartItem, ContactMessage, CustomUser, DailySales, Order, OrderItem, OrderStatusEvent, Payment, Product,
+    ProductCategory, Task, Wishlist,
+)
+from .storage import StaticFilesStorage
+from bakeryproducts import urls as project_urls
+
+
+class ImageDerivativeTests(TestCase):
+    """Uploaded images get resized WebP/JPEG derivatives, served through <picture> srcsets."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+
+    def upload(self, size=(1200, 900), mode='RGBA'):
+        buffer = io.BytesIO()
+        Image.new(mode, size, (200, 120, 40, 128)).save(buffer, 'PNG')
+        return SimpleUploadedFile('cake.png', buffer.getvalue(), content_type='image/png')
+
+    def test_derivatives_are_rendered_once_per_content(self):
+        product = Product.objects.create(
+            title='Cake', slug='cake', category=self.category, base_price=Decimal('500.00'),
+            image=self.upload(),
+        )
+        self.assertEqual(len(product.image_digest), 64)
+        for width in images.DERIVATIVE_WIDTHS:
+            for fmt in images.DERIVATIVE_FORMATS:
+                name = images.derivative_name(product.image_digest, width, fmt)
+                with self.subTest(name=name), default_storage.open(name) as file, Image.open(file) as image:
+                    self.assertEqual(image.size, (width, width * 3 // 4))
+                    self.assertEqual(image.format, images.DERIVATIVE_FORMATS[fmt]['format'])
+        # Transparent PNGs are flattened for JPEG, not saved with alpha.
+        with default_storage.open(images.derivative_name(product.image_digest, 160, 'jpeg')) as file:
+            self.assertEqual(Image.open(file).mode, 'RGB')
+
+        with mock.patch.object(default_storage, 'save') as save:
+            self.assertEqual(images.generate_derivatives(product.image), product.image_digest)
+        save.assert_not_called()
+
+    def test_picture_tag(self):
+        product = Product.objects.create(
+            title='Cake', slug='cake', category=self.category, base_price=Decimal('500.00'),
+            image=self.upload(size=(200, 150)),
+        )
+        html = Template(
+            "{% load bakery_images %}{% picture product alt='Cake' sizes='50vw' width=300 %}"
+        ).render(Context({'product': product}))
+        digest = product.image_digest
+        self.assertIn(f'src="{images.derivative_url(digest, 320, "jpeg")}"', html)
+        self.assertIn(f'<source type="image/webp" srcset="{images.srcset(digest, "webp")}" sizes="50vw"', html)
+        self.assertIn(f'srcset="{images.srcset(digest, "jpeg")}" sizes="50vw"', html)
+        self.assertEqual(
+            images.srcset(digest, 'webp').split(', ')[0], f"{images.derivative_url(digest, 160, 'webp')} 160w",
+        )
+
+        product.image = ''
+        html = Template("{% load bakery_images %}{% picture product %}").render(Context({'product': product}))
+        self.assertNotIn('srcset', html)
+        self.assertIn('src=""', html)
+
+
+class StaticFilesStorageTests(SimpleTestCase):
+    """Our CSS and JS are minified before hashing; admin and .min files are left alone."""
+
+    def test_minified_hashed_and_compressed(self):
+        rule = "/* banner */\nbody {\n    color: red;\n}\n\n.card  {  margin : 0 ; }\n"
+        source = rule * 50  # big enough to be worth compressing
+        names = ('css/site.css', 'js/site.min.js', 'admin/css/base.css')
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = StaticFilesStorage(location=tmp, base_url='/static/')
+            for name in names:
+                os.makedirs(os.path.dirname(storage.path(name)), exist_ok=True)
+                with open(storage.path(name), 'w') as fh:
+                    fh.write(source)
+            list(storage.post_process({name: (storage, name) for name in names}))
+
+            contents = {}
+            for name in names:
+                hashed = storage.stored_name(name)
+                self.assertNotEqual(hashed, name)
+                self.assertTrue(storage.exists(hashed + '.gz'))
+                with storage.open(hashed) as fh:
+                    contents[name] = fh.read().decode()
+        self.assertEqual(contents['css/site.css'], 'body{color:red}.card{margin:0}' * 50)
+        self.assertEqual(contents['js/site.min.js'], source)
+        self.assertEqual(contents['admin/css/base.css'], source)
+
+
+@override_settings(WISHLIST_CACHE_TIMEOUT=600)
+class WishlistCacheTests(TestCase):
+    """The cached wishlist id set is dropped whenever the wishlist changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        self.product = Product.objects.create(
+            title='Cake', slug='cake', category=category, base_price=Decimal('500.00'),
+        )
+        self.client.force_login(self.user)
+
+    def cached_ids(self):
+        # A fresh user object, as the next request would have.
+        return wishlist.wishlist_product_ids(CustomUser.objects.get(pk=self.user.pk))
+
+    def toggle(self):
+        response = self.client.get(
+            reverse('toggle_wishlist', args=[self.product.pk]), headers={'x-requested-with': 'XMLHttpRequest'},
+        )
+        self.assertEqual(response.json(), {'success': True})
+
+    def test_toggle_invalidates_the_cached_ids(self):
+        self.assertEqual(self.cached_ids(), frozenset())
+        with self.assertNumQueries(1):  # the user row; the ids come from the cache
+            self.cached_ids()
+
+        self.toggle()
+        self.assertEqual(self.cached_ids(), {self.product.pk})
+
+        self.toggle()
+        self.assertEqual(self.cached_ids(), frozenset())
+
+
+class QueryCountTests(TestCase):
+    """
+    Guard the catalogue, cart and wishlist pages against N+1 regressions:
+    the number of queries a page issues must not grow with the number of
+    products/lines it shows.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        cls.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.cart = Cart.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.serial = 0
+
+    def add_products(self, count):
+        for _ in range(count):
+            self.serial += 1
+            product = Product.objects.create(
+                title=f'Cake {self.serial}',
+                slug=f'cake-{self.serial}',
+                category=self.category,
+                description='Chocolate sponge',
+                base_price=Decimal('500.00'),
+            )
+            Wishlist.objects.create(user=self.user, product=product)
+            CartItem.objects.create(
+                cart=self.cart, product=product, weight='1 KG',
+                quantity=1, price=product.base_price,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def assertConstantQueries(self, url):
+        self.add_products(2)
+        small = self.count_queries(url)
+        self.add_products(10)
+        large = self.count_queries(url)
+        self.assertEqual(
+            small, large,
+            f"{url} issued {small} queries for 2 items but {large} for 12",
+        )
+
+    def test_cart_page(self):
+        self.assertConstantQueries(reverse('cart_page'))
+
+    def test_wishlist_page(self):
+        self.assertConstantQueries(reverse('wishlist'))
+
+    def test_all_products_page(self):
+        self.assertConstantQueries(reverse('all_products'))
+
+    def test_category_page(self):
+        self.assertConstantQueries(reverse('category_products', kwargs={'slug': 'cakes'}))
+
+    def test_search_page(self):
+        self.assertConstantQueries(reverse('search_products') + '?q=cake')
+
+    def test_product_detail_page(self):
+        self.add_products(4)
+        product = Product.objects.first()
+        self.assertConstantQueries(product.get_absolute_url())
+
+
+class QueryPlanAuditTests(TestCase):
+    """audit_query_plans walks the storefront and the hot lookups use their indexes."""
+
+    def test_audit_reports_index_lookups(self):
+        # The command normally seeds its own throwaway database; here it runs
+        # against the test database instead.
+        module = 'bakery.management.commands.audit_query_plans'
+        out = io.StringIO()
+        with mock.patch.object(connection.creation, 'create_test_db'), \
+                mock.patch.object(connection.creation, 'destroy_test_db'), \
+                mock.patch(f'{module}.setup_test_environment'), \
+                mock.patch(f'{module}.teardown_test_environment'):
+            call_command('audit_query_plans', '--products', '20', '--verbose-plans', stdout=out)
+        output = out.getvalue()
+        self.assertIn('USING INDEX product_category_recent_idx', output)
+        self.assertIn('USING INDEX cartitem_cart_added_idx', output)
+        self.assertNotIn('full scan of bakery_cartitem', output)
+
+
+class SearchIndexTests(TestCase):
+    """The FTS5 index follows product saves and deletes and ranks title hits first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+
+    def create(self, title, description=''):
+        return Product.objects.create(
+            title=title, slug=title.lower().replace(' ', '-'), category=self.category,
+            description=description, base_price=Decimal('500.00'),
+        )
+
+    def test_saved_product_is_indexed(self):
+        product = self.create('Pineapple Pastry')
+        self.assertEqual(list(search.search('pinea past')), [product])
+
+        product.title = 'Mango Pastry'
+        product.save()
+        self.assertEqual(list(search.search('pineapple')), [])
+        self.assertEqual(list(search.search('mango')), [product])
+
+    def test_deleted_product_is_removed(self):
+        product = self.create('Pineapple Pastry')
+        product.delete()
+        self.assertEqual(search.search('pineapple').count(), 0)
+
+    def test_renamed_category_is_reindexed(self):
+        product = self.create('Pineapple Pastry')
+        self.category.name = 'Gateaux'
+        self.category.save()
+        self.assertEqual(list(search.search('gateaux')), [product])
+
+    def test_title_hits_rank_above_description_hits(self):
+        mentions = self.create('Vanilla Sponge', 'Layered with chocolate ganache')
+        titled = self.create('Chocolate Truffle', 'Rich and dark')
+        self.assertEqual(list(search.search('chocolate')), [titled, mentions])
+
+
+class SuggestionIndexTests(TestCase):
+    """Prefix suggestions, kept current by patching the index on catalogue edits."""
+
+    def setUp(self):
+        index = suggest.SuggestionIndex()
+        patcher = mock.patch.object(suggest, 'index', index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.index = index
+        self.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        self.product = Product.objects.create(
+            title='Red Velvet Cake', slug='red-velvet-cake', category=self.category,
+            base_price=Decimal('500.00'),
+        )
+
+    def labels(self, prefix, limit=suggest.SUGGEST_LIMIT):
+        return [result['label'] for result in self.index.lookup(prefix, limit)]
+
+    def test_lookup_matches_word_starts(self):
+        Product.objects.create(
+            title='Velvet Brownie', slug='velvet-brownie', category=self.category,
+            base_price=Decimal('300.00'),
+        )
+        self.assertEqual(self.labels('vel'), ['Red Velvet Cake', 'Velvet Brownie'])
+        self.assertEqual(self.labels('VELVET c'), ['Red Velvet Cake'])
+        self.assertEqual(self.labels('cake'), ['Cakes', 'Red Velvet Cake'])
+        self.assertEqual(len(self.labels('vel', limit=1)), 1)
+        self.assertEqual(self.labels('  '), [])
+
+    def test_edit_is_applied_without_touching_the_live_list(self):
+        self.labels('red')  # builds the index
+        live = self.index._entries
+        snapshot = list(live)
+
+        self.product.title = 'Black Forest Cake'
+        with mock.patch.object(self.index, 'rebuild') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.product.save()
+            self.assertEqual(self.labels('red'), [])
+            self.assertEqual(self.labels('fore'), ['Black Forest Cake'])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.product.delete()
+            self.assertEqual(self.labels('black'), [])
+        rebuild.assert_not_called()
+        self.assertEqual(live, snapshot)
+
+    def test_rolled_back_edit_is_not_suggested(self):
+        self.labels('red')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError), transaction.atomic():
+                Product.objects.create(
+                    title='Black Forest Cake', slug='black-forest-cake', category=self.category,
+                    base_price=Decimal('450.00'),
+                )
+                raise ValueError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.labels('black'), [])
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    CONTACT_EMAIL='orders@example.com',
+)
+class TaskQueueTests(TestCase):
+    """Contact mail is queued by the request and delivered by the worker."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        self.client.force_login(self.user)
+
+    def post_contact(self):
+        return self.client.post(reverse('contact'), {
+            'name': 'Test Shopper', 'email': 'shopper@example.com', 'phone': '9876543210',
+            'subject': 'Birthday cake', 'message': 'Do you deliver on Sundays?',
+        })
+
+    def test_contact_form_queues_mail(self):
+        response = self.post_contact()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('database', response.context['errors'])
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['orders@example.com'])
+        self.assertIn('Do you deliver on Sundays?', mail.outbox[0].body)
+        self.assertEqual(Task.objects.get().status, 'done')
+
+    def test_failed_task_is_retried_with_backoff(self):
+        self.post_contact()
+        with mock.patch('bakery.tasks.send_mail', side_effect=ConnectionRefusedError), \
+                self.assertLogs('bakery.tasks', 'WARNING'):
+            tasks.run_pending()
+        job = Task.objects.get()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=tasks.RETRY_DELAY - 5))
+        self.assertIn('ConnectionRefusedError', job.last_error)
+
+        # Not due yet; once it is, the retry delivers the mail.
+        self.assertEqual(tasks.run_pending(), 0)
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_task_fails_after_max_attempts(self):
+        message = ContactMessage.objects.create(
+            name='Test', email='shopper@example.com', phone='9876543210',
+            subject='Hello', message='Hello there',
+        )
+        tasks.enqueue(tasks.send_contact_notification, max_attempts=1, message_id=message.pk)
+        with mock.patch('bakery.tasks.send_mail', side_effect=ConnectionRefusedError), \
+                self.assertLogs('bakery.tasks', 'ERROR'):
+            tasks.run_pending()
+        self.assertEqual(Task.objects.get().status, 'failed')
+
+    def test_task_that_kills_its_worker_runs_out_of_attempts(self):
+        message = ContactMessage.objects.create(
+            name='Test', email='shopper@example.com', phone='9876543210',
+            subject='Hello', message='Hello there',
+        )
+        tasks.enqueue(tasks.send_contact_notification, max_attempts=2, message_id=message.pk)
+        for attempt in (1, 2):
+            # The worker claims the task and dies; its lease then runs out.
+            self.assertEqual(len(tasks.claim(10)), 1)
+            self.assertEqual(Task.objects.get().attempts, attempt)
+            Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('bakery.tasks', 'ERROR'):
+            self.assertEqual(tasks.claim(10), [])
+        job = Task.objects.get()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=600)
+class PageCacheTests(TestCase):
+    """Cached pages are shared, but the header and CSRF token stay per-user."""
+
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            CustomUser.objects.create_user(
+                email=f'shopper{i}@example.com', password='secret123',
+                first_name='Test', last_name='Shopper',
+            )
+            for i in (1, 2)
+        ]
+        Cart.objects.create(user=self.users[0], item_count=3)
+
+    def test_cart_badge_is_per_user(self):
+        badge = 'bg-danger fs-6">{}</span>'
+        for user, expected in zip(self.users, (3, None)):
+            client = Client()
+            client.force_login(user)
+            content = client.get(reverse('home')).content.decode()
+            self.assertNotIn(pagecache.CART_COUNT_PLACEHOLDER, content)
+            if expected:
+                self.assertIn(badge.format(expected), content)
+            else:
+                self.assertNotIn('bg-danger fs-6', content)
+
+    def test_cached_contact_form_posts_with_its_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.users[1])
+        client.get(reverse('contact'))  # fills the cache
+        content = client.get(reverse('contact')).content.decode()
+        self.assertNotIn(pagecache.CSRF_PLACEHOLDER, content)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', content).group(1)
+        response = client.post(reverse('contact'), {
+            'csrfmiddlewaretoken': token,
+            'name': 'Test Shopper', 'email': 'shopper2@example.com', 'phone': '9876543210',
+            'subject': 'Birthday cake', 'message': 'Do you deliver on Sundays?',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+
+class CatalogueVersionTests(TestCase):
+    """A catalogue edit made in another worker reaches this one's pages and suggestions."""
+
+    def setUp(self):
+        cache.clear()
+        self.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        Product.objects.create(
+            title='Red Velvet Cake', slug='red-velvet-cake', category=self.category,
+            base_price=Decimal('500.00'),
+        )
+
+    def test_edit_in_another_worker(self):
+        self.assertContains(self.client.get(reverse('all_products')), '1 TYPES')
+        self.assertEqual(suggest.index.lookup('black'), [])
+
+        # Another process: its own cache, version memo and suggestion index.
+        with mock.patch.object(catalogue, 'cache', LocMemCache('other-worker', {})), \
+                mock.patch.object(catalogue, '_version', None), \
+                mock.patch.object(catalogue, '_local', None), \
+                mock.patch.object(suggest, 'index', suggest.SuggestionIndex()):
+            Product.objects.create(
+                title='Black Forest Cake', slug='black-forest-cake', category=self.category,
+                base_price=Decimal('450.00'),
+            )
+
+        with override_settings(CATALOGUE_VERSION_TTL=0):
+            self.assertContains(self.client.get(reverse('all_products')), '2 TYPES')
+            self.assertEqual(
+                [s['label'] for s in suggest.index.lookup('black')], ['Black Forest Cake'],
+            )
+
+
+class ConditionalGetTests(TestCase):
+    """Repeat visits to unchanged catalogue pages are answered with a 304."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        self.client.force_login(self.user)
+        self.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        self.product = Product.objects.create(
+            title='Cake', slug='cake', category=self.category, base_price=Decimal('500.00'),
+        )
+        self.urls = [
+            reverse('category_products', kwargs={'slug': 'cakes'}),
+            reverse('product_detail', kwargs={'category_slug': 'cakes', 'product_id': self.product.pk}),
+        ]
+
+    def revalidate(self, url, response):
+        return self.client.get(url, headers={
+            'if-none-match': response['ETag'],
+            'if-modified-since': response['Last-Modified'],
+        })
+
+    def test_unchanged_page_is_not_modified(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('private', response['Cache-Control'])
+            self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+    def test_product_change_and_cart_change_invalidate(self):
+        responses = [self.client.get(url) for url in self.urls]
+        self.product.base_price = Decimal('550.00')
+        self.product.save()
+        for url, response in zip(self.urls, responses):
+            self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+        responses = [self.client.get(url) for url in self.urls]
+        Cart.objects.create(user=self.user, item_count=2)
+        for url, response in zip(self.urls, responses):
+            self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+
+class AsyncViewTests(TestCase):
+    """With ASYNC_VIEWS the catalogue, search and wishlist pages are served by bakery.async_views."""
+
+    def route(self, async_views):
+        with self.settings(ASYNC_VIEWS=async_views):
+            importlib.reload(urls)
+            importlib.reload(project_urls)
+        clear_url_caches()
+
+    def setUp(self):
+        self.route(True)
+        self.addCleanup(self.route, settings.ASYNC_VIEWS)
+        self.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        self.product = Product.objects.create(
+            title='Cake', slug='cake', category=category, base_price=Decimal('500.00'),
+            weight_options='500G,1KG',
+        )
+        Wishlist.objects.create(user=self.user, product=self.product)
+        self.product_url = reverse('product_detail', kwargs={'category_slug': 'cakes', 'product_id': self.product.pk})
+
+    async def test_pages_render(self):
+        await self.async_client.aforce_login(self.user)
+        for url in (
+            reverse('all_products'),
+            reverse('category_products', kwargs={'slug': 'cakes'}),
+            reverse('category_products_more', kwargs={'slug': 'cakes'}),
+            self.product_url,
+            reverse('search_products') + '?q=cake',
+            reverse('search_more') + '?q=cake',
+            reverse('wishlist'),
+        ):
+            with self.subTest(url=url):
+                self.assertTrue(iscoroutinefunction(resolve(url.split('?')[0]).func))
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Cake')
+
+    async def test_unchanged_page_is_not_modified(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.product_url)
+        self.assertIn('private', response['Cache-Control'])
+        response = await self.async_client.get(self.product_url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_product_form_adds_to_cart(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(self.product_url, {
+            'pincode': '560001', 'weight': '1 KG', 'quantity': 2, 'add_to_cart': '',
+        })
+        self.assertRedirects(response, reverse('cart_page'), fetch_redirect_response=False)
+        cart = await Cart.objects.aget(user=self.user)
+        self.assertEqual(cart.item_count, 2)
+
+
+class RelatedProductTests(TestCase):
+    """Product pages show precomputed co-purchases, then same-category items."""
+
+    def setUp(self):
+        cakes = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        breads = ProductCategory.objects.create(name='Breads', slug='breads')
+        self.cake, self.tart, self.muffin = (
+            Product.objects.create(title=title, slug=title.lower(), category=cakes, base_price=Decimal('500.00'))
+            for title in ('Cake', 'Tart', 'Muffin')
+        )
+        self.loaf = Product.objects.create(title='Loaf', slug='loaf', category=breads, base_price=Decimal('90.00'))
+        order = Order.objects.create(
+            customer_name='Test Shopper', customer_mobile='9876543210', delivery_location='Chennai',
+            delivery_address='1 Anna Salai', payment_method='cod',
+            subtotal=Decimal('590.00'), delivery_fee=0, tax_amount=0, total_amount=Decimal('590.00'),
+        )
+        for product in (self.cake, self.loaf):
+            OrderItem.objects.create(order=order, product=product, unit_price=product.base_price)
+        self.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        self.client.force_login(self.user)
+
+    def related_on_page(self, product):
+        response = self.client.get(product.get_absolute_url())
+        return list(response.context['related_products'])
+
+    def test_co_purchases_rank_before_category_filler(self):
+        recommend.rebuild(top_n=3)
+        self.assertEqual(self.related_on_page(self.cake), [self.loaf, self.muffin, self.tart])
+        self.assertEqual(self.related_on_page(self.loaf), [self.cake])
+
+    def test_products_added_after_rebuild_fall_back_to_category(self):
+        self.assertEqual(self.related_on_page(self.cake), [self.muffin, self.tart])
+
+
+class GuestCartTests(TestCase):
+    """Guest carts live in the session and are merged into the user's cart on login."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='Qz7pLmw9',
+            first_name='Test', last_name='Shopper',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.cake = Product.objects.create(
+            title='Cake', slug='cake', category=category, base_price=Decimal('500.00'),
+            weight_options='500G,1KG',
+        )
+        cls.tart = Product.objects.create(
+            title='Tart', slug='tart', category=category, base_price=Decimal('300.00'),
+            weight_options='500G,1KG',
+        )
+
+    def add(self, product, weight, quantity):
+        response = self.client.post(
+            reverse('add_to_cart'),
+            {'product_id': product.pk, 'weight': weight, 'quantity': quantity},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_merge_into_existing_cart(self):
+        cart = Cart.objects.create(user=self.user)
+        cart_service.add_item(cart, self.cake, '1 KG', 1, self.cake.price_for('1 KG'))
+        cart_service.add_item(cart, self.tart, '500 G', 1, self.tart.price_for('500 G'))
+
+        self.add(self.cake, '1 KG', 2)    # overlaps the stored line
+        self.add(self.cake, '500 G', 1)   # same product, other weight
+        self.assertFalse(Cart.objects.exclude(pk=cart.pk).exists())
+        response = self.client.post(reverse('login'), {'email': 'shopper@example.com', 'password': 'Qz7pLmw9'})
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+
+        lines = {(item.product_id, item.weight): item.quantity for item in cart.items.all()}
+        self.assertEqual(lines, {
+            (self.cake.pk, '1 KG'): 3,
+            (self.cake.pk, '500 G'): 1,
+            (self.tart.pk, '500 G'): 1,
+        })
+        cart.refresh_from_db()
+        self.assertEqual(cart.item_count, 5)
+        self.assertEqual(cart.subtotal, (
+            3 * self.cake.price_for('1 KG') + self.cake.price_for('500 G') + self.tart.price_for('500 G')
+        ))
+        self.assertEqual(cart.subtotal, cart_service.recalculate_totals(cart)[0])
+        self.assertNotIn(cart_service.SESSION_KEY, self.client.session)
+
+    def test_remove_from_cart_needs_a_post_from_the_owner(self):
+        cart = Cart.objects.create(user=self.user)
+        item = cart_service.add_item(cart, self.cake, '1 KG', 2, self.cake.price_for('1 KG'))
+        url = reverse('remove_from_cart', args=[item.pk])
+
+        self.assertRedirects(self.client.post(url), f"{reverse('login')}?next={url}")
+        other = CustomUser.objects.create_user(
+            email='other@example.com', password='secret123', first_name='Other', last_name='Shopper',
+        )
+        self.client.force_login(other)
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertTrue(CartItem.objects.filter(pk=item.pk).exists())
+
+        self.assertRedirects(self.client.post(url), reverse('cart_page'))
+        self.assertFalse(CartItem.objects.filter(pk=item.pk).exists())
+        cart.refresh_from_db()
+        self.assertEqual((cart.item_count, cart.subtotal), (0, Decimal('0.00')))
+
+    def test_add_quantities_are_bounded_on_both_paths(self):
+        for quantity in (0, views.MAX_ADD_QUANTITY + 1, 'lots'):
+            with self.subTest(quantity=quantity):
+                response = self.client.post(
+                    reverse('add_to_cart'),
+                    {'product_id': self.cake.pk, 'weight': '1 KG', 'quantity': quantity},
+                    content_type='application/json',
+                )
+                self.assertEqual(response.status_code, 400)
+
+        self.client.force_login(self.user)
+        url = reverse('product_detail', kwargs={'category_slug': 'cakes', 'product_id': self.cake.pk})
+        for quantity in (-3, views.MAX_ADD_QUANTITY + 1, 'lots'):
+            with self.subTest(quantity=quantity):
+                response = self.client.post(url, {
+                    'pincode': '560001', 'weight': '1 KG', 'quantity': quantity, 'add_to_cart': '',
+                })
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['quantity_error'])
+        self.assertFalse(CartItem.objects.exists())
+        self.assertNotIn(cart_service.SESSION_KEY, self.client.session)
+
+    def test_update_cart_item_validates_guest_quantities(self):
+        self.add(self.cake, '1 KG', 2)
+        url = reverse('update_cart_item')
+        for quantity in (-1, 'two'):
+            with self.subTest(quantity=quantity):
+                response = self.client.post(url, {'item_id': 1, 'quantity': quantity}, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'item_id': 1, 'quantity': 3}, content_type='application/json')
+        self.assertEqual(response.json()['item_count'], 3)
+        response = self.client.post(url, {'item_id': 1, 'quantity': 0}, content_type='application/json')
+        self.assertEqual(response.json()['item_count'], 0)
+        self.assertEqual(self.client.session[cart_service.SESSION_KEY]['lines'], {})
+
+
+class BulkCartUpdateTests(TestCase):
+    """Batched cart changes only touch the shopper's own lines and valid quantities."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.cake = Product.objects.create(
+            title='Cake', slug='cake', category=category, base_price=Decimal('500.00'),
+            weight_options='500G,1KG',
+        )
+        cls.carts = []
+        for email in ('shopper@example.com', 'other@example.com'):
+            user = CustomUser.objects.create_user(
+                email=email, password='secret123', first_name='Test', last_name='Shopper',
+            )
+            cart = Cart.objects.create(user=user)
+            cart_service.add_item(cart, cls.cake, '1 KG', 1, cls.cake.price_for('1 KG'))
+            cart_service.add_item(cart, cls.cake, '500 G', 2, cls.cake.price_for('500 G'))
+            cls.carts.append(cart)
+
+    def setUp(self):
+        self.cart, self.other_cart = self.carts
+        self.client.force_login(self.cart.user)
+        self.lines = {item.weight: item for item in self.cart.items.all()}
+
+    def post(self, updates):
+        return self.client.post(reverse('bulk_update_cart'), {'updates': updates}, content_type='application/json')
+
+    def quantities(self, cart):
+        return sorted(cart.items.values_list('weight', 'quantity'))
+
+    def test_updates_and_removals(self):
+        response = self.post([
+            {'item_id': self.lines['1 KG'].pk, 'quantity': 4},
+            {'item_id': self.lines['500 G'].pk, 'remove': True},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(self.cart), [('1 KG', 4)])
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.item_count, 4)
+        self.assertEqual(self.cart.subtotal, 4 * self.cake.price_for('1 KG'))
+        self.assertEqual(response.json()['subtotal'], str(self.cart.subtotal))
+
+    def test_other_users_lines_are_rejected(self):
+        foreign = self.other_cart.items.first()
+        response = self.post([
+            {'item_id': self.lines['1 KG'].pk, 'quantity': 5},
+            {'item_id': foreign.pk, 'quantity': 0},
+        ])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.quantities(self.cart), [('1 KG', 1), ('500 G', 2)])
+        self.assertEqual(self.quantities(self.other_cart), [('1 KG', 1), ('500 G', 2)])
+        with self.assertRaises(CartItem.DoesNotExist):
+            cart_service.apply_updates(self.cart, {foreign.pk: 3})
+
+    def test_invalid_quantities_are_rejected(self):
+        item_id = self.lines['1 KG'].pk
+        for updates in (
+            [{'item_id': item_id, 'quantity': -1}],
+            [{'item_id': item_id, 'quantity': 'many'}],
+            [{'item_id': item_id}],
+            [{'item_id': 'first', 'quantity': 2}],
+            [],
+            [{'item_id': item_id, 'quantity': 1}] * (cart_service.MAX_BATCH_SIZE + 1),
+        ):
+            with self.subTest(updates=updates[:1]):
+                self.assertEqual(self.post(updates).status_code, 400)
+        self.assertEqual(self.quantities(self.cart), [('1 KG', 1), ('500 G', 2)])
+
+    def test_single_line_update_is_scoped_to_the_shoppers_cart(self):
+        url = reverse('update_cart_item')
+        foreign = self.other_cart.items.get(weight='1 KG')
+        response = self.client.post(url, {'item_id': foreign.pk, 'quantity': 50}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.quantities(self.other_cart), [('1 KG', 1), ('500 G', 2)])
+        self.other_cart.refresh_from_db()
+        self.assertEqual(self.other_cart.item_count, 3)
+
+        for quantity in (-2, 'many', None):
+            with self.subTest(quantity=quantity):
+                response = self.client.post(
+                    url, {'item_id': self.lines['1 KG'].pk, 'quantity': quantity}, content_type='application/json',
+                )
+                self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, {'item_id': self.lines['1 KG'].pk, 'quantity': 3}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(self.cart), [('1 KG', 3), ('500 G', 2)])
+        self.assertEqual(response.json()['item_count'], 5)
+
+
+class ReconcileCartsTests(TestCase):
+    """reconcile_carts repairs stored cart totals that drifted from their items."""
+
+    def setUp(self):
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cake = Product.objects.create(
+            title='Cake', slug='cake', category=category, base_price=Decimal('500.00'),
+            weight_options='500G,1KG',
+        )
+        user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123', first_name='Test', last_name='Shopper',
+        )
+        self.cart = Cart.objects.create(user=user)
+        cart_service.add_item(self.cart, cake, '1 KG', 2, cake.price_for('1 KG'))
+        self.expected = (2 * cake.price_for('1 KG'), 2)
+        Cart.objects.filter(pk=self.cart.pk).update(subtotal=Decimal('1.00'), item_count=7)
+
+    def totals(self):
+        self.cart.refresh_from_db()
+        return self.cart.subtotal, self.cart.item_count
+
+    def test_dry_run_only_reports(self):
+        out = io.StringIO()
+        call_command('reconcile_carts', '--dry-run', stdout=out)
+        self.assertIn('1 carts checked, 1 would be fixed', out.getvalue())
+        self.assertEqual(self.totals(), (Decimal('1.00'), 7))
+
+    def test_drifted_totals_are_repaired(self):
+        out = io.StringIO()
+        call_command('reconcile_carts', stdout=out)
+        self.assertIn('1 carts checked, 1 fixed', out.getvalue())
+        self.assertEqual(self.totals(), self.expected)
+        call_command('reconcile_carts', stdout=out)
+        self.assertIn('1 carts checked, 0 fixed', out.getvalue())
+
+
+class PricingTests(SimpleTestCase):
+    """Weights parse to exact grams and prices follow the per-kg base price."""
+
+    def test_parse_weight(self):
+        for label, grams in (
+            ('500G', Decimal('500')), (' 1 kg ', Decimal('1000')), ('1.5KG', Decimal('1500')),
+            ('0.5G', Decimal('0.5')), ('1.5G', Decimal('1.5')), ('1.500 G', Decimal('1.5')),
+        ):
+            with self.subTest(label=label):
+                self.assertEqual(pricing.parse_weight(label), grams)
+        for label in ('0G', '0.0KG', '', None, '1 LB', '-5G', '1,5KG'):
+            with self.subTest(label=label):
+                self.assertIsNone(pricing.parse_weight(label))
+
+    def test_format_weight(self):
+        for grams, label in (
+            (500, '500 G'), (Decimal('0.5'), '0.5 G'), (Decimal('1.5'), '1.5 G'),
+            (1000, '1 KG'), (Decimal('1500'), '1.5 KG'), (2250, '2.25 KG'),
+        ):
+            with self.subTest(grams=grams):
+                self.assertEqual(pricing.format_weight(grams), label)
+        self.assertEqual(
+            pricing.weight_options('0.5G, 1.5g,500G,1KG,bad'),
+            (('0.5 G', Decimal('0.5')), ('1.5 G', Decimal('1.5')), ('500 G', 500), ('1 KG', 1000)),
+        )
+
+    def test_unit_price(self):
+        base = Decimal('500.00')
+        self.assertEqual(pricing.unit_price('500G,1KG', base, '500 G'), Decimal('250.00'))
+        self.assertEqual(pricing.unit_price('500G,1KG', base, '1.5KG'), Decimal('750.00'))
+        self.assertEqual(pricing.unit_price('0.5G', Decimal('500'), '0.5G'), Decimal('0.25'))
+        self.assertEqual(pricing.unit_price('500G,1KG', base, 'a slice'), base)
+
+    def test_quote(self):
+        small = pricing.quote(Decimal('400'))
+        self.assertEqual(
+            (small.discount, small.delivery_fee, small.gst, small.total),
+            (Decimal('60.00'), Decimal('40'), Decimal('20.00'), Decimal('400.00')),
+        )
+        large = pricing.quote(1000)
+        self.assertEqual(large.subtotal, Decimal('1000.00'))
+        self.assertEqual(large.delivery_fee, 0)
+        self.assertEqual(large.total, large.subtotal - large.discount + large.gst)
+
+
+class CheckoutTests(TestCase):
+    """Orders are priced from the catalogue in a constant number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.products = [
+            Product.objects.create(
+                title=f'Cake {i}', slug=f'cake-{i}', category=category,
+                base_price=Decimal('500.00'), weight_options='500G,1KG',
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user=self.user)
+
+    def fill(self, count):
+        for product in self.products[:count]:
+            cart_service.add_item(self.cart, product, '1 KG', 2, product.price_for('1 KG'))
+
+    def order_fields(self):
+        return {
+            'customer_name': 'Test Shopper', 'customer_mobile': '9876543210',
+            'delivery_location': 'Kochi', 'delivery_address': '12 Bakers Street, Kochi',
+            'payment_method': 'cod', 'user': self.user,
+        }
+
+    def test_query_counts_do_not_grow_with_lines(self):
+        self.fill(1)
+        with self.assertNumQueries(1):
+            checkout.cart_lines(self.cart)
+        with CaptureQueriesContext(connection) as one_line:
+            checkout.checkout_cart(self.cart, **self.order_fields())
+
+        self.fill(5)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(checkout.cart_lines(self.cart)), 5)
+        with self.assertNumQueries(len(one_line)):
+            order = checkout.checkout_cart(self.cart, **self.order_fields())
+        self.assertEqual(order.items.count(), 5)
+
+    def test_create_order_prices_lines_from_the_catalogue(self):
+        cake = self.products[0]
+        order = checkout.create_order(
+            [(cake.pk, '500 G', 3), (cake.pk, '1 KG', 1), (0, '1 KG', 1)], **self.order_fields(),
+        )
+        self.assertEqual(
+            sorted(order.items.values_list('weight', 'quantity', 'unit_price')),
+            [('1 KG', 1, cake.price_for('1 KG')), ('500 G', 3, cake.price_for('500 G'))],
+        )
+        self.assertEqual(order.subtotal, 3 * cake.price_for('500 G') + cake.price_for('1 KG'))
+        self.assertEqual(order.total_amount, pricing.quote(order.subtotal).total)
+        with self.assertRaises(ValueError):
+            checkout.create_order([(0, '1 KG', 1)], **self.order_fields())
+
+    def test_checkout_cart_empties_the_cart(self):
+        self.fill(2)
+        order = checkout.checkout_cart(self.cart, **self.order_fields())
+        self.assertEqual(order.items.count(), 2)
+        self.assertFalse(self.cart.items.exists())
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (0, Decimal('0.00')))
+
+        guest = cart_service.SessionCart(self.client.session)
+        guest.add(self.products[0], '1 KG', 1, self.products[0].price_for('1 KG'))
+        checkout.checkout_cart(guest, **self.order_fields())
+        self.assertEqual(guest.session.get(cart_service.SESSION_KEY), None)
+
+    def test_posted_totals_are_ignored(self):
+        self.fill(1)
+        self.client.force_login(self.user)
+        tampered = json.dumps([{'product': 'Cake 0', 'price': 1, 'quantity': 2, 'total_price': 2}])
+        self.client.post(reverse('payment_page'), {'cart_data': tampered})
+        response = self.client.post(reverse('process_payment'), {
+            'name': 'Test Shopper', 'mobile': '9876543210', 'location': 'Kochi',
+            'address': '12 Bakers Street, Kochi', 'paymentOption': 'cod',
+            'subtotal': '1.00', 'total_amount': '1.00', 'unit_price': '1.00',
+        })
+        order = Order.objects.get()
+        self.assertRedirects(response, order.get_absolute_url(), fetch_redirect_response=False)
+        price = self.products[0].price_for('1 KG')
+        self.assertEqual(order.items.get().unit_price, price)
+        self.assertEqual(order.subtotal, 2 * price)
+        self.assertEqual(order.total_amount, pricing.quote(2 * price).total)
+
+
+class SQLitePragmaTests(TestCase):
+    """Every new SQLite connection is tuned with settings.SQLITE_PRAGMAS."""
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234, 'synchronous': 'NORMAL', 'temp_store': 'MEMORY'})
+    def test_new_connection_gets_pragmas(self):
+        conn = connections.create_connection('default')
+        self.addCleanup(conn.close)
+        with conn.cursor() as cursor:
+            values = {}
+            for name in ('busy_timeout', 'synchronous', 'temp_store'):
+                cursor.execute(f"PRAGMA {name}")
+                values[name] = cursor.fetchone()[0]
+        # synchronous NORMAL is 1, temp_store MEMORY is 2.
+        self.assertEqual(values, {'busy_timeout': 1234, 'synchronous': 1, 'temp_store': 2})
+
+
+class AddToCartConcurrencyTests(TransactionTestCase):
+    """Concurrent adds of the same line are all counted."""
+
+    THREADS = 8
+    ADDS_PER_THREAD = 10
+
+    def setUp(self):
+        # Deployments run in WAL mode; the test database has to be switched
+        # explicitly, like the site's (outside of any transaction).
+        call_command('enable_wal', stdout=io.StringIO())
+        self.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        self.product = Product.objects.create(
+            title='Cake', slug='cake', category=category, base_price=Decimal('500.00'),
+            weight_options='500G,1KG',
+        )
+
+    def hammer(self, cookies, barrier, errors):
+        client = Client()
+        client.cookies = cookies
+        try:
+            barrier.wait()
+            for _ in range(self.ADDS_PER_THREAD):
+                response = client.post(
+                    reverse('add_to_cart'),
+                    {'product_id': self.product.pk, 'weight': '1 KG', 'quantity': 2},
+                    content_type='application/json',
+                )
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_no_increment_is_lost(self):
+        self.client.force_login(self.user)
+        barrier, errors = threading.Barrier(self.THREADS), []
+        threads = [
+            threading.Thread(target=self.hammer, args=(self.client.cookies, barrier, errors))
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        expected = self.THREADS * self.ADDS_PER_THREAD * 2
+        line = CartItem.objects.get()
+        self.assertEqual(line.quantity, expected)
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(cart.item_count, expected)
+        self.assertEqual(cart.subtotal, Decimal('500.00') * expected)
+
+
+class OrderTrackingTests(TestCase):
+    """Orders keep their tracking id and status history; order pages don't grow N+1s."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='shopper@example.com', password='secret123',
+            first_name='Test', last_name='Shopper',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.products = [
+            Product.objects.create(title=f'Cake {n}', slug=f'cake-{n}', category=category, base_price=Decimal('500.00'))
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def place_order(self):
+        order = Order.objects.create(
+            user=self.user, customer_name='Test Shopper', customer_mobile='9876543210',
+            delivery_location='Chennai', delivery_address='1 Anna Salai', payment_method='cod',
+            subtotal=Decimal('1500.00'), delivery_fee=0, tax_amount=0, total_amount=Decimal('1500.00'),
+        )
+        for product in self.products:
+            OrderItem.objects.create(order=order, product=product, unit_price=product.base_price)
+        return order
+
+    def test_status_changes_are_recorded(self):
+        order = self.place_order()
+        order.status = 'shipped'
+        order.save()
+        order.save()
+        order = Order.objects.get(pk=order.pk)
+        order.status = 'delivered'
+        order.save(update_fields=['status'])
+        self.assertEqual(
+            list(OrderStatusEvent.objects.filter(order=order).values_list('status', flat=True)),
+            ['pending', 'shipped', 'delivered'],
+        )
+
+        response = self.client.get(reverse('order_detail', args=[order.tracking_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([step['done'] for step in response.context['timeline']], [True] * 4)
+
+    def test_confirmation_lists_every_line(self):
+        order = self.place_order()
+        response = self.client.get(reverse('order_detail', args=[order.tracking_id]))
+        for product in self.products:
+            self.assertContains(response, product.title)
+
+    def test_order_pages_query_count_is_flat(self):
+        def queries(url):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(context)
+
+        order = self.place_order()
+        detail_url = reverse('order_detail', args=[order.tracking_id])
+        one = queries(reverse('my_orders')), queries(detail_url)
+        for _ in range(4):
+            self.place_order()
+        OrderItem.objects.create(order=order, product=self.products[0], unit_price=Decimal('500.00'))
+        self.assertEqual((queries(reverse('my_orders')), queries(detail_url)), one)
+
+    def test_unknown_tracking_id_is_404(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('order_detail', args=['TRKNOSUCHORDER'])).status_code, 404)
+
+
+class SalesRollupTests(TestCase):
+    """The daily rollups match the orders, and each run only reads new status events."""
+
+    def setUp(self):
+        cakes = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        breads = ProductCategory.objects.create(name='Breads', slug='breads')
+        self.cake = Product.objects.create(title='Cake', slug='cake', category=cakes, base_price=Decimal('500.00'))
+        self.loaf = Product.objects.create(title='Loaf', slug='loaf', category=breads, base_price=Decimal('90.00'))
+
+    def place_order(self, location, payment_method, lines):
+        order = Order.objects.create(
+            customer_name='Test Shopper', customer_mobile='9876543210', delivery_location=location,
+            delivery_address='1 Anna Salai', payment_method=payment_method,
+            subtotal=0, delivery_fee=0, tax_amount=0, total_amount=0,
+        )
+        for product, weight, quantity in lines:
+            OrderItem.objects.create(
+                order=order, product=product, weight=weight, quantity=quantity, unit_price=product.base_price,
+            )
+        return order
+
+    def rollup(self):
+        return analytics.rollup(settle_time=timedelta(0))
+
+    def rows(self, dimension):
+        return {
+            row.label: (row.orders, row.units, row.grams, row.revenue)
+            # A fully cancelled day/key keeps an all-zero row.
+            for row in DailySales.objects.filter(dimension=dimension).exclude(orders=0)
+        }
+
+    def test_rollups_follow_new_and_cancelled_orders(self):
+        first = self.place_order('Chennai', 'upi', [(self.cake, '1 KG', 2), (self.loaf, '500G', 1)])
+        self.place_order('Madurai', 'cod', [(self.cake, '500G', 1)])
+        self.assertEqual(self.rollup(), 2)
+        self.assertEqual(self.rows('product'), {
+            'Cake': (2, 3, 2500, Decimal('1500.00')),
+            'Loaf': (1, 1, 500, Decimal('90.00')),
+        })
+        self.assertEqual(self.rows('category')['Cakes'], (2, 3, 2500, Decimal('1500.00')))
+        self.assertEqual(self.rows('payment')['UPI'], (1, 3, 2500, Decimal('1090.00')))
+        self.assertEqual(self.rows('location')['Madurai'], (1, 1, 500, Decimal('500.00')))
+
+        first.status = 'shipped'
+        first.save()
+        first.status = 'cancelled'
+        first.save()
+        self.place_order('Madurai', 'cod', [(self.loaf, '1 KG', 1)])
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.rollup(), 3)
+        self.assertLess(len(context), 15)
+        self.assertEqual(self.rollup(), 0)
+
+        incremental = {dimension: self.rows(dimension) for dimension, _ in DailySales.DIMENSIONS}
+        self.assertEqual(incremental['product']['Cake'], (1, 1, 500, Decimal('500.00')))
+        self.assertNotIn('UPI', incremental['payment'])
+        analytics.reset()
+        self.rollup()
+        self.assertEqual({dimension: self.rows(dimension) for dimension, _ in DailySales.DIMENSIONS}, incremental)
+
+    def test_admin_dashboard_reads_rollups(self):
+        self.place_order('Chennai', 'upi', [(self.cake, '1 KG', 2)])
+        self.rollup()
+        admin_user = CustomUser.objects.create_superuser(
+            email='admin@example.com', password='secret123', first_name='Admin', last_name='User',
+        )
+        self.client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('admin:bakery_dailysales_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['sales']['totals']['total_revenue'], Decimal('1000.00'))
+        self.assertFalse(any('bakery_order' in query['sql'] for query in context.captured_queries))
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk the newest-first ordering without gaps or repeats."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        for i in range(7):
+            Product.objects.create(
+                title=f'Cake {i}', slug=f'cake-{i}', category=cls.category,
+                base_price=Decimal('500.00'),
+            )
+        # Imports and fixtures can give many rows the same timestamp.
+        cls.created_at = timezone.now().replace(microsecond=0)
+        Product.objects.filter(pk__in=Product.objects.order_by('id')[2:6]).update(created_at=cls.created_at)
+
+    def test_cursor_round_trip(self):
+        product = Product.objects.first()
+        self.assertEqual(
+            pagination.decode_cursor(pagination.encode_cursor(product)),
+            (product.created_at, product.pk),
+        )
+
+    def test_tampered_cursors_are_rejected(self):
+        product = Product.objects.first()
+        cursor = pagination.encode_cursor(product)
+        forged = base64.urlsafe_b64encode(b'yesterday|1').decode()
+        for bad in ('', '!!!', 'not a cursor', cursor[:-3], cursor + 'A', forged):
+            with self.subTest(cursor=bad):
+                with self.assertRaises(BadRequest):
+                    pagination.decode_cursor(bad)
+        url = reverse('category_products', kwargs={'slug': 'cakes'})
+        self.assertEqual(self.client.get(url, {'cursor': forged}).status_code, 400)
+
+    def test_pages_share_timestamps_without_gaps_or_repeats(self):
+        queryset = Product.objects.filter(category=self.category)
+        seen, cursor = [], None
+        while True:
+            page = pagination.KeysetPage(list(pagination.seek(queryset, cursor, size=3)), size=3)
+            seen.extend(product.pk for product in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(queryset.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(set(seen)), 7)
+
+
+class OrderAdminTests(TestCase):
+    """Order admin pages stay flat as orders grow; bulk status changes are one UPDATE."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = CustomUser.objects.create_superuser(
+            email='admin@example.com', password='secret123', first_name='Admin', last_name='User',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.product = Product.objects.create(title='Cake', slug='cake', category=category, base_price=Decimal('500.00'))
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def add_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(
+                user=self.admin_user, customer_name='Test Shopper', customer_mobile='9876543210',
+                delivery_location='Chennai', delivery_address='1 Anna Salai', payment_method='upi',
+                subtotal=Decimal('500.00'), delivery_fee=0, tax_amount=0, total_amount=Decimal('500.00'),
+            )
+            OrderItem.objects.create(order=order, product=self.product, unit_price=Decimal('500.00'))
+            Payment.objects.create(order=order, amount=Decimal('500.00'))
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = [reverse(f'admin:bakery_{model}_changelist') for model in ('order', 'orderitem', 'payment')]
+
+        def queries():
+            counts = []
+            for url in urls:
+                with CaptureQueriesContext(connection) as context:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                counts.append(len(context))
+            return counts
+
+        self.add_orders(1)
+        one = queries()
+        self.add_orders(10)
+        self.assertEqual(queries(), one)
+
+    def test_unfiltered_count_is_estimated_for_large_tables(self):
+        self.add_orders(2)
+        with mock.patch.object(pagination, 'estimated_row_count', return_value=250000):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse('admin:bakery_order_changelist'))
+            self.assertEqual(response.context['cl'].result_count, 250000)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+            filtered = self.client.get(reverse('admin:bakery_order_changelist'), {'status__exact': 'pending'})
+            self.assertEqual(filtered.context['cl'].result_count, 2)
+
+    def test_bulk_status_change_records_events(self):
+        self.add_orders(3)
+        first = Order.objects.order_by('id').first()
+        first.status = 'shipped'
+        first.save()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('admin:bakery_order_changelist'), {
+                'action': 'mark_shipped',
+                '_selected_action': list(Order.objects.values_list('pk', flat=True)),
+            })
+        self.assertEqual(response.status_code, 302)
+        updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "bakery_order"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 3)
+        self.assertEqual(OrderStatusEvent.objects.filter(status='shipped').count(), 3)
+
+
+class CartAdminTests(TestCase):
+    """Cart lines edited in the admin keep the stored cart totals in step."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = CustomUser.objects.create_superuser(
+            email='admin@example.com', password='secret123', first_name='Admin', last_name='User',
+        )
+        category = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        cls.cake = Product.objects.create(title='Cake', slug='cake', category=category, base_price=Decimal('500.00'))
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.cart = Cart.objects.create(user=self.admin_user)
+        self.item = cart_service.add_item(self.cart, self.cake, '1 KG', 2, Decimal('500.00'))
+
+    def totals(self):
+        self.cart.refresh_from_db()
+        return self.cart.subtotal, self.cart.item_count
+
+    def test_cart_inline_edits_recalculate_totals(self):
+        response = self.client.post(reverse('admin:bakery_cart_change', args=[self.cart.pk]), {
+            'user': self.admin_user.pk,
+            'items-TOTAL_FORMS': 1, 'items-INITIAL_FORMS': 1,
+            'items-MIN_NUM_FORMS': 0, 'items-MAX_NUM_FORMS': 1000,
+            'items-0-id': self.item.pk, 'items-0-cart': self.cart.pk, 'items-0-product': self.cake.pk,
+            'items-0-weight': '1 KG', 'items-0-quantity': 5, 'items-0-price': '500.00',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.totals(), (Decimal('2500.00'), 5))
+
+    def test_cart_item_edits_and_deletes_recalculate_totals(self):
+        response = self.client.post(reverse('admin:bakery_cartitem_change', args=[self.item.pk]), {
+            'cart': self.cart.pk, 'product': self.cake.pk, 'weight': '1 KG', 'quantity': 3, 'price': '500.00',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.totals(), (Decimal('1500.00'), 3))
+
+        response = self.client.post(reverse('admin:bakery_cartitem_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.item.pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.totals(), (Decimal('0.00'), 0))
+
+        item = cart_service.add_item(self.cart, self.cake, '1 KG', 1, Decimal('500.00'))
+        Cart.objects.filter(pk=self.cart.pk).update(item_count=9)
+        response = self.client.post(reverse('admin:bakery_cartitem_delete', args=[item.pk]), {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.totals(), (Decimal('0.00'), 0))
+
+
+class CatalogueImportTests(TestCase):
+    """Exported catalogues import back; imports upsert by slug in batches and skip bad rows."""
+
+    def setUp(self):
+        cakes = ProductCategory.objects.create(name='Cakes', slug='cakes')
+        self.cake = Product.objects.create(
+            title='Cake', slug='cake', category=cakes, base_price=Decimal('500.00'), weight_options='500G,1KG',
+        )
+
+    def import_rows(self, rows, **kwargs):
+        errors = []
+        importer = catalogue_io.CatalogueImporter(
+            workers=0, batch_size=2, on_error=lambda line, message: errors.append(line), **kwargs,
+        )
+        return importer.run(enumerate(rows, 2)), errors
+
+    def test_round_trip_and_upsert(self):
+        for fmt in catalogue_io.FORMATS:
+            stream = io.StringIO()
+            call_command('export_catalogue', format=fmt, stdout=stream)
+            exported = stream.getvalue()
+            stream = io.StringIO(exported)
+            result, errors = self.import_rows(row for _, row in catalogue_io.read_rows(stream, fmt))
+            self.assertEqual((result.created, result.updated, errors), (0, 1, []))
+
+        row = {'title': 'Sourdough Loaf', 'category': 'breads', 'category_name': 'Breads', 'base_price': '90'}
+        rows = [
+            {'slug': 'cake', 'title': 'Chocolate Cake', 'category': 'cakes', 'base_price': '650.5', 'is_featured': 'yes'},
+            row,
+            {**row, 'base_price': 'free'},
+            {**row, 'slug': 'rye', 'title': 'Rye', 'weight_options': '1 KG,2 tonnes'},
+            {**row, 'slug': 'rye', 'title': 'Rye Loaf'},
+        ]
+        with CaptureQueriesContext(connection) as context:
+            result, errors = self.import_rows(rows)
+        self.assertLess(len(context), 25)
+        self.assertEqual((result.created, result.updated, result.skipped, result.categories), (2, 1, 2, 1))
+        self.assertEqual(errors, [4, 5])
+
+        self.cake.refresh_from_db()
+        self.assertEqual((self.cake.title, self.cake.base_price, self.cake.is_featured),
+                         ('Chocolate Cake', Decimal('650.50'), True))
+        loaf = Product.objects.select_related('category').get(slug='sourdough-loaf')
+        self.assertEqual(loaf.category.name, 'Breads')
+        self.assertEqual(Product.objects.get(slug='rye').title, 'Rye Loaf')
+        self.assertIn(loaf, list(search.search('sourdough')))
+
+    def test_images_are_stored_by_content_and_resized(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=os.path.join(tmp, 'media')):
+            Image.new('RGB', (400, 300), (200, 120, 40)).save(os.path.join(tmp, 'cake.png'))
+            rows = [
+                {'slug': 'cake', 'title': 'Cake', 'category': 'cakes', 'base_price': '500', 'image': 'cake.png'},
+                {'slug': 'tart', 'title': 'Tart', 'category': 'cakes', 'base_price': '300', 'image': '../cake.png'},
+                {'slug': 'bun', 'title': 'Bun', 'category': 'cakes', 'base_price': '30', 'image': 'missing.png'},
+            ]
+            result, errors = self.import_rows(rows, image_root=tmp)
+            self.assertEqual((result.updated, result.images, errors), (1, 1, [3, 4]))
+            self.cake.refresh_from_db()
+            self.assertTrue(self.cake.image.name.startswith(catalogue_io.IMPORTED_IMAGES))
+            self.assertTrue(self.cake.image_digest)
+            self.assertTrue(os.path.exists(self.cake.image.path))
+            self.assertTrue(self.cake.thumbnail_url(320).endswith('/320.jpg'))
+
+    def test_import_reaches_the_web_workers(self):
+        cache.clear()
+        self.assertNotContains(self.client.get(reverse('all_products')), 'BREADS')
+
+        # The import command is a short-lived process with its own cache.
+        with mock.patch.object(catalogue, 'cache', LocMemCache('import-command', {})), \
+                mock.patch.object(catalogue, '_version', None), \
+                mock.patch.object(catalogue, '_local', None):
+            result, errors = self.import_rows([
+                {'title': 'Sourdough Loaf', 'category': 'breads', 'category_name': 'Breads', 'base_price': '90'},
+            ])
+        self.assertEqual((result.created, errors), (1, []))
+
+        with override_settings(CATALOGUE_VERSION_TTL=0):
+            self.assertContains(self.client.get(reverse('all_products')), 'BREADS')
+            self.assertEqual(
+                [s['label'] for s in suggest.index.lookup('sourd')], ['Sourdough Loaf'],
+            )
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 from django.contrib.auth import views as auth_views
 
+# The catalogue, search and wishlist pages have async versions for ASGI.
+pages = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     path('', views.login_view, name='login'), 
     path('registration/login/', views.login_view, name='login'),
@@ -10,21 +14,27 @@ urlpatterns = [
     path('logout/', auth_views.LogoutView.as_view(next_page='/'), name='logout'),
     path('home/', views.home, name='home'),
     path('about/', views.about, name='about'),
-    path('products/', views.all_products, name='all_products'),
-    path('products/<slug:slug>/', views.category_products, name='category_products'),
+    path('products/', pages.all_products, name='all_products'),
+    path('products/<slug:slug>/', pages.category_products, name='category_products'),
+    path('products/<slug:slug>/more/', pages.category_products_more, name='category_products_more'),
     path('products/<slug:category_slug>/<int:product_id>/', 
-         views.product_detail, name='product_detail'),
+         pages.product_detail, name='product_detail'),
     path('payment/', views.payment_page, name='payment_page'),
     path('process-payment/', views.process_payment, name='process_payment'),
-    path('order-confirmation/', views.order_confirmation, name='order_confirmation'),
+    path('orders/', views.my_orders, name='my_orders'),
+    path('orders/<str:tracking_id>/', views.order_detail, name='order_detail'),
     path('blog/', views.blog, name='blog'),
     path('contact/', views.contact, name='contact'),
-    path('wishlist/', views.wishlist_view, name='wishlist'),
+    path('wishlist/', pages.wishlist_view, name='wishlist'),
     path('wishlist/remove/<int:product_id>/', views.remove_from_wishlist, name='remove_from_wishlist'),
     path('wishlist/clear/', views.clear_wishlist, name='clear_wishlist'),
     path('wishlist/toggle/<int:product_id>/', views.toggle_wishlist, name='toggle_wishlist'),
     path('cart/', views.cart_page, name='cart_page'),
+    path('cart/add/', views.add_to_cart, name='add_to_cart'),
     path('cart/update/', views.update_cart_item, name='update_cart_item'),
+    path('cart/update/bulk/', views.bulk_update_cart, name='bulk_update_cart'),
     path("cart/remove/<int:item_id>/", views.remove_from_cart, name="remove_from_cart"),
-    path("search/", views.search_products, name="search_products"),
+    path("search/", pages.search_products, name="search_products"),
+    path("search/more/", pages.search_more, name="search_more"),
+    path("search/suggest/", views.search_suggest, name="search_suggest"),
 ]
\ No newline at end of file
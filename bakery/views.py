@@ -2,22 +2,34 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.core.paginator import Paginator
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth import get_user_model
 from .models import ProductCategory, Product, Wishlist,ContactMessage
-from .models import Order, OrderItem, Payment,Cart, CartItem
+from .models import Order, Cart, CartItem
 from .forms import RegisterForm, LoginForm, PasswordResetForm
+from .wishlist import invalidate_wishlist
+from .catalogue import catalogue_version, get_catalogue
+from .search import search, SEARCH_PAGE_SIZE
+from .suggest import index as suggestion_index, SUGGEST_LIMIT
+from . import cart as cart_service
+from . import checkout
+from . import orders
+from . import recommend
+from . import tasks
+from .pagination import KeysetPage, seek
+from .pagecache import render_cached
+from .conditional import category_validators, condition, product_validators
 from django.core.exceptions import ValidationError
-from django.core.exceptions import PermissionDenied
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import ContactMessage
+from django.db import transaction
+import json
 import re
 from decimal import Decimal
-from django.utils import timezone  
-from datetime import timedelta 
-import random
+from django.utils.functional import SimpleLazyObject
+from urllib.parse import urlencode
 
 def login_view(request):
     if request.method == 'POST':
@@ -29,6 +41,7 @@ def login_view(request):
             
             if user is not None:
                 login(request, user)
+                cart_service.merge_session_cart(request, user)
                 messages.success(request, 'You have been logged in successfully!')
                 return redirect('home')
             else:
@@ -49,6 +62,7 @@ def register_view(request):
             user.username = user.email 
             user.save()
             login(request, user)
+            cart_service.merge_session_cart(request, user)
             messages.success(request, 'Registration successful!')
             return redirect('home')
     else:
@@ -91,6 +105,7 @@ def toggle_wishlist(request, product_id):
     
     if not created:
         wishlist_item.delete()
+    invalidate_wishlist(request.user)
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'success': True})
@@ -98,7 +113,7 @@ def toggle_wishlist(request, product_id):
 
 @login_required(login_url='login')
 def wishlist_view(request):
-    items = Wishlist.objects.filter(user=request.user).select_related('product')
+    items = Wishlist.objects.filter(user=request.user).select_related('product__category')
     return render(request, 'bakery/wishlist.html', {'wishlist_items': items})
 
 @require_POST
@@ -106,6 +121,7 @@ def wishlist_view(request):
 def remove_from_wishlist(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     Wishlist.objects.filter(user=request.user, product=product).delete()
+    invalidate_wishlist(request.user)
     return redirect('wishlist')
 
 def logout_view(request):
@@ -114,180 +130,228 @@ def logout_view(request):
     return redirect('login')
 
 def all_products(request):
-    categories = ProductCategory.objects.prefetch_related('products')
-    
-    if request.user.is_authenticated:
-        wishlist_product_ids = Wishlist.objects.filter(
-            user=request.user
-        ).values_list('product_id', flat=True)
-    else:
-        wishlist_product_ids = []
-
-    for category in categories:
-        for product in category.products.all():
-            product.is_in_wishlist = product.id in wishlist_product_ids
-
+    # The grid is fragment-cached per catalogue version, so the snapshot is
+    # only evaluated when that fragment has to be rendered again.
     return render(request, 'bakery/products.html', {
-        'categories': categories
+        'catalogue_version': catalogue_version(),
+        'categories': SimpleLazyObject(lambda: get_catalogue().categories),
     })
 
+def _category_page(category, cursor):
+    return KeysetPage(list(
+        seek(Product.objects.filter(category=category).select_related('category'), cursor)
+    ))
+
+@condition(category_validators)
 def category_products(request, slug):
     category = get_object_or_404(ProductCategory, slug=slug)
-    products = Product.objects.filter(category=category)
-
-    if request.user.is_authenticated:
-        wishlist_ids = Wishlist.objects.filter(
-            user=request.user,
-            product__in=products
-        ).values_list('product_id', flat=True)
-    else:
-        wishlist_ids = []
-
-    for product in products:
-        product.is_in_wishlist = product.id in wishlist_ids
+    products = _category_page(category, request.GET.get('cursor'))
 
     return render(request, 'bakery/category_products.html', {
         'category': category,
         'products': products
     })
 
+def category_products_more(request, slug):
+    """Infinite-scroll fragment: the next page of product cards as HTML."""
+    category = get_object_or_404(ProductCategory, slug=slug)
+    products = _category_page(category, request.GET.get('cursor'))
+    html = render_to_string(
+        'bakery/include/category_product_cards.html', {'products': products}, request=request,
+    )
+    next_url = None
+    if products.has_next:
+        next_url = f"{reverse('category_products_more', args=[slug])}?cursor={products.next_cursor}"
+    return JsonResponse({'html': html, 'next': next_url})
+
 @login_required(login_url='login')
+@condition(product_validators)
 def product_detail(request, category_slug, product_id):
     product = get_object_or_404(
-        Product,
+        Product.objects.select_related('category'),
         id=product_id,
         category__slug=category_slug
     )
-    related_products = Product.objects.filter(
-        category=product.category
-    ).exclude(id=product.id)[:3]
-    weight_options = ['500 G', '1 KG', '2 KG', '3 KG', '4 KG', '5 KG']
-    
+    related_products = list(recommend.related_products(product))
+    if not related_products:
+        related_products = list(recommend.fallback_related(product))
+
     if request.method == 'POST':
-        pincode = request.POST.get('pincode', '').strip()
-        weight = request.POST.get('weight', '').strip()
-        quantity = int(request.POST.get('quantity', '1'))
-        
-        errors = {}
+        return _product_detail_post(request, product, related_products, category_slug)
 
-        if not pincode or not pincode.isdigit() or len(pincode) != 6:
-            errors['pincode_error'] = True
-        if not weight or weight not in weight_options:
-            errors['weight_error'] = True
-            
-        if errors:
-            return render(request, 'bakery/product_detail.html', {
-                'product': product,
-                'related_products': related_products,
-                'weight_options': weight_options,
-                **errors,
-                'pincode': pincode,
-                'selected_weight': weight,
-                'quantity': quantity,
-            })
-
-        if 'add_to_cart' in request.POST:
-            cart, created = Cart.objects.get_or_create(user=request.user if request.user.is_authenticated else None)
-
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                product=product,
-                weight=weight,
-                defaults={
-                    'quantity': quantity,
-                    'price': product.base_price
-                }
-            )
-            
-            if not created:
-                cart_item.quantity += quantity
-                cart_item.save()
-            
-            messages.success(request, 'Product added to cart!')
-            return redirect('cart_page') 
-            
-        else: 
-            base_price = float(product.base_price) if isinstance(product.base_price, Decimal) else product.base_price
-
-            request.session['order_data'] = {
-                'product_id': product.id,
-                'product_title': product.title,
-                'category_slug': category_slug,
-                'pincode': pincode,
-                'weight': weight,
-                'quantity': quantity,
-                'base_price': base_price,
-            }
-            return redirect('payment_page')
-    
     return render(request, 'bakery/product_detail.html', {
         'product': product,
         'related_products': related_products,
-        'weight_options': weight_options,
+        'weight_options': product.weight_list,
     })
 
-import json
-from django.shortcuts import render
-from .models import Cart
+def _product_detail_post(request, product, related_products, category_slug):
+    weight_options = product.weight_list
+    pincode = request.POST.get('pincode', '').strip()
+    weight = request.POST.get('weight', '').strip()
+    quantity = _clean_quantity(request.POST.get('quantity', '1'))
+    
+    errors = {}
+
+    if not pincode or not pincode.isdigit() or len(pincode) != 6:
+        errors['pincode_error'] = True
+    if not weight or weight not in weight_options:
+        errors['weight_error'] = True
+    if quantity is None:
+        errors['quantity_error'] = True
+        
+    if errors:
+        return render(request, 'bakery/product_detail.html', {
+            'product': product,
+            'related_products': related_products,
+            'weight_options': weight_options,
+            **errors,
+            'pincode': pincode,
+            'selected_weight': weight,
+            'quantity': quantity or 1,
+        })
+
+    if 'add_to_cart' in request.POST:
+        cart = cart_service.get_cart(request)
+        cart_service.add_item(cart, product, weight, quantity, product.price_for(weight))
+        
+        messages.success(request, 'Product added to cart!')
+        return redirect('cart_page') 
+        
+    else: 
+        request.session.pop(checkout.SESSION_KEY, None)
+        request.session['order_data'] = {
+            'product_id': product.id,
+            'product_title': product.title,
+            'category_slug': category_slug,
+            'pincode': pincode,
+            'weight': weight,
+            'quantity': quantity,
+        }
+        return redirect('payment_page')
 
 def cart_page(request):
-    if request.user.is_authenticated:
-        cart, created = Cart.objects.get_or_create(user=request.user)
-    else:
-        cart_id = request.session.get('cart_id')
-        if cart_id:
-            cart = Cart.objects.filter(id=cart_id).first()
-            if not cart:
-                cart = Cart.objects.create()
-                request.session['cart_id'] = cart.id
-        else:
-            cart = Cart.objects.create()
-            request.session['cart_id'] = cart.id
-
-    cart_items = cart.items.all()
-
-    cart_data = [
-        {
-            "product": item.product.title,
-            "price": float(item.price),
-            "quantity": item.quantity,
-            "weight": item.weight,
-            "total_price": float(item.total_price),
-        }
-        for item in cart_items
-    ]
+    cart = cart_service.get_cart(request)
+    cart_items, cart_data = cart_service.load_lines(cart)
 
     context = {
         "cart_items": cart_items,
         "subtotal": cart.subtotal,
         "delivery_charge": cart.delivery_charge,
+        "discount": cart.discount,
         "tax_amount": cart.tax_amount,
         "cart_total": cart.total,
         "cart_data_json": json.dumps(cart_data),
     }
     return render(request, "bakery/cart.html", context)
 
+def _parse_update(update):
+    """
+    ``(item_id, quantity)`` for one cart line change, 0 meaning remove.
+    Raises ``ValueError``/``TypeError``/``KeyError``/``AttributeError`` on
+    malformed input.
+    """
+    quantity = 0 if update.get('remove') else int(update['quantity'])
+    if quantity < 0:
+        raise ValueError
+    return int(update['item_id']), quantity
+
+def _apply_cart_updates(request, quantities):
+    cart = cart_service.get_cart(request)
+    try:
+        cart_service.apply_updates(cart, quantities)
+    except CartItem.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Item not found'}, status=404)
+
+    return JsonResponse({
+        'success': True,
+        'item_count': cart.item_count,
+        'subtotal': str(cart.subtotal),
+        'tax_amount': str(cart.tax_amount.quantize(Decimal('0.01'))),
+        'delivery_charge': str(cart.delivery_charge),
+        'total': str(cart.total.quantize(Decimal('0.01'))),
+    })
+
 @require_POST
 def update_cart_item(request):
-    if request.method == 'POST':
+    """
+    Change one line of the shopper's cart: ``{"item_id": 3, "quantity": 2}``,
+    quantity 0 removing it.  Responds like ``bulk_update_cart``.
+    """
+    try:
+        item_id, quantity = _parse_update(json.loads(request.body))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+    return _apply_cart_updates(request, {item_id: quantity})
+
+@require_POST
+def bulk_update_cart(request):
+    """
+    Apply a batch of cart line changes in one request:
+    ``{"updates": [{"item_id": 3, "quantity": 2}, {"item_id": 5, "remove": true}]}``.
+    Responds with the recomputed cart totals.
+    """
+    try:
+        updates = json.loads(request.body).get('updates')
+        if not isinstance(updates, list) or not updates:
+            raise ValueError
+        if len(updates) > cart_service.MAX_BATCH_SIZE:
+            return JsonResponse({'success': False, 'error': 'Too many updates'}, status=400)
+        quantities = dict(_parse_update(update) for update in updates)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+    return _apply_cart_updates(request, quantities)
+
+MAX_ADD_QUANTITY = 99
+
+def _clean_quantity(value):
+    """``value`` as an int in ``1..MAX_ADD_QUANTITY``, or None if it isn't one."""
+    try:
+        quantity = int(value)
+    except (ValueError, TypeError):
+        return None
+    return quantity if 1 <= quantity <= MAX_ADD_QUANTITY else None
+
+@require_POST
+def add_to_cart(request):
+    """
+    Add a product to the cart without leaving the page:
+    ``{"product_id": 7, "weight": "1KG", "quantity": 2}``.  Responds with
+    the line and the cart's new totals.
+    """
+    try:
         data = json.loads(request.body)
-        item_id = data.get('item_id')
-        quantity = int(data.get('quantity', 1))
-        try:
-            item = CartItem.objects.get(id=item_id)
-            item.quantity = quantity
-            item.save()
-            return JsonResponse({'success': True})
-        except CartItem.DoesNotExist:
-            return JsonResponse({'success': False, 'error': 'Item not found'})
-    return JsonResponse({'success': False, 'error': 'Invalid request'})
+        product_id = int(data['product_id'])
+        weight = str(data['weight']).strip()
+        quantity = _clean_quantity(data.get('quantity', 1))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+
+    product = Product.objects.filter(pk=product_id).only('id', 'base_price', 'weight_options').first()
+    if product is None:
+        return JsonResponse({'success': False, 'error': 'Product not found'}, status=404)
+    if weight not in product.weight_list:
+        return JsonResponse({'success': False, 'error': 'Invalid weight'}, status=400)
+    if quantity is None:
+        return JsonResponse({'success': False, 'error': 'Invalid quantity'}, status=400)
+
+    cart = cart_service.get_cart(request)
+    cart_service.add_item(cart, product, weight, quantity, product.price_for(weight))
+    if not isinstance(cart, cart_service.SessionCart):
+        cart.refresh_from_db(fields=['subtotal', 'item_count'])
+    return JsonResponse({
+        'success': True,
+        'item_count': cart.item_count,
+        'subtotal': str(cart.subtotal),
+    })
 
+@require_POST
 @login_required(login_url='login')
 def remove_from_cart(request, item_id):
     """Remove a specific item from the user's cart"""
     cart = get_object_or_404(Cart, user=request.user)
     item = get_object_or_404(CartItem, id=item_id, cart=cart)
-    item.delete()
+    cart_service.remove_item(item)
     return redirect('cart_page') 
 
  
@@ -339,40 +403,46 @@ def validate_notes(value):
             'question marks ( ? ), or parentheses ( ( ) ). Max 200 characters.'
         )
 
-def payment_page(request):
+def _checkout_lines(request):
+    """``(product_id, weight, quantity)`` lines of the checkout in progress."""
+    if request.session.get(checkout.SESSION_KEY) == 'cart':
+        return checkout.cart_lines(cart_service.get_cart(request))
     order_data = request.session.get('order_data')
-    if not order_data:
-        return redirect('home')
-    
-    product = get_object_or_404(Product, id=order_data['product_id'])
-    quantity = int(order_data['quantity'])
-    base_price = Decimal(str(order_data['base_price']))
-    
-    subtotal = quantity * base_price
-    discount = subtotal * Decimal('0.15')
-    delivery_fee = Decimal('40') if subtotal < Decimal('500') else Decimal('0')
-    gst = subtotal * Decimal('0.05')
-    total = subtotal - discount + delivery_fee + gst
-    
-    context = {
-        'product': {
-            'id': product.id,
-            'title': product.title,
-            'description': product.description,
-            'weight': order_data['weight'],
-            'quantity': quantity,
-            'image_url': product.image.url if product.image else '/static/images/default-product.jpg',
-            'base_price': base_price
-        },
-        'prices': {
-            'subtotal': subtotal,
-            'discount': discount,
-            'delivery_fee': delivery_fee,
-            'gst': gst,
-            'total': total
+    if order_data:
+        return [(order_data['product_id'], order_data['weight'], int(order_data['quantity']))]
+    return []
+
+def _payment_context(priced, prices):
+    lines = [
+        {
+            'id': line['product'].id,
+            'title': line['product'].title,
+            'description': line['product'].description,
+            'weight': line['weight'],
+            'quantity': line['quantity'],
+            'image_url': line['product'].thumbnail_url(480) if line['product'].image else '/static/images/default-product.jpg',
+            'base_price': line['unit_price'],
         }
+        for line in priced
+    ]
+    return {
+        'lines': lines,
+        'total_quantity': sum(line['quantity'] for line in lines),
+        'prices': prices,
     }
-    return render(request, 'bakery/payment.html', context)
+
+def payment_page(request):
+    if request.method == 'POST' and 'cart_data' in request.POST:
+        # "Proceed to buy" from the cart: check out every cart line.
+        request.session[checkout.SESSION_KEY] = 'cart'
+        return redirect('payment_page')
+
+    lines = _checkout_lines(request)
+    if not lines:
+        return redirect('home')
+
+    priced, prices = checkout.price_lines(lines)
+    return render(request, 'bakery/payment.html', _payment_context(priced, prices))
 
 def process_payment(request):
     if request.method == 'POST':
@@ -439,191 +509,177 @@ def process_payment(request):
                     errors['cvv'] = 'Enter valid CVV'
         
         if not errors:
-            order = Order.objects.create(
-                customer_name=name,
-                customer_mobile=mobile,
-                delivery_location=location,
-                delivery_address=address,
-                special_notes=notes,
-                payment_method=payment_method,
-                subtotal=Decimal(request.POST.get('subtotal', 0)),
-                discount=Decimal(request.POST.get('discount', 0)),
-                delivery_fee=Decimal(request.POST.get('delivery_fee', 0)),
-                tax_amount=Decimal(request.POST.get('gst', 0)),
-                total_amount=Decimal(request.POST.get('total', 0)),
-            )
-            OrderItem.objects.create(
-                order=order,
-                product=get_object_or_404(Product, id=request.POST.get('product_id')),
-                quantity=int(request.POST.get('quantity', 1)),
-                unit_price=Decimal(request.POST.get('base_price', 0)),
-                weight=request.POST.get('weight'),
-            )
-            tracking_id = f"TRK{order.id}{random.randint(1000, 9999)}"
-            context = {
-    'order': order,
-    'order_date': order.order_date,
-    'expected_delivery': order.order_date + timedelta(days=1),
-    'tracking_id': f"TRK{order.id}{random.randint(1000, 9999)}",
-    'timeline': [
-        {'step': 'PLACE YOUR ORDER', 'time': order.order_date},
-        {'step': 'BILLING YOUR ORDER', 'time': order.order_date + timedelta(hours=1)},
-        {'step': 'LOADING YOUR ORDER', 'time': order.order_date + timedelta(hours=3, minutes=30)},
-        {'step': 'DELIVERY EXPECTED', 'time': order.order_date + timedelta(days=1)},
-    ]
-}
-            return render(request, 'bakery/order_confirmation.html', context)
+            order_fields = {
+                'customer_name': name,
+                'customer_mobile': mobile,
+                'delivery_location': location,
+                'delivery_address': address,
+                'special_notes': notes,
+                'payment_method': payment_method,
+                'user': request.user if request.user.is_authenticated else None,
+            }
+            try:
+                if request.session.get(checkout.SESSION_KEY) == 'cart':
+                    order = checkout.checkout_cart(cart_service.get_cart(request), **order_fields)
+                else:
+                    order = checkout.create_order(_checkout_lines(request), **order_fields)
+            except ValueError:
+                return redirect('home')
+            request.session.pop(checkout.SESSION_KEY, None)
+            request.session.pop('order_data', None)
+            return redirect(order.get_absolute_url())
 
-        product_id = request.POST.get('product_id')
-        product = get_object_or_404(Product, id=product_id)
-        
-        context = {
-            'product': {
-                'id': product.id,
-                'title': product.title,
-                'description': product.description,
-                'weight': request.POST.get('weight'),
-                'quantity': int(request.POST.get('quantity', 1)),
-                'image_url': product.image.url if product.image else '/static/images/default-product.jpg',
-                'base_price': Decimal(request.POST.get('base_price', 0))
-            },
-            'prices': {
-                'subtotal': Decimal(request.POST.get('subtotal', 0)),
-                'discount': Decimal(request.POST.get('discount', 0)),
-                'delivery_fee': Decimal(request.POST.get('delivery_fee', 0)),
-                'gst': Decimal(request.POST.get('gst', 0)),
-                'total': Decimal(request.POST.get('total', 0))
-            },
+        lines = _checkout_lines(request)
+        if not lines:
+            return redirect('home')
+        priced, prices = checkout.price_lines(lines)
+        context = _payment_context(priced, prices)
+        context.update({
             'form_data': request.POST,
             'errors': errors
-        }
+        })
         return render(request, 'bakery/payment.html', context)
     
     return redirect('payment_page')
 
-def order_confirmation(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    return render(request, 'bakery/order_confirmation.html', {'order': order})
-
-def delivery_details(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    return render(request, 'bakery/delivery_details.html', {'order': order})
+@login_required(login_url='login')
+def my_orders(request):
+    page_obj = Paginator(orders.user_orders(request.user), orders.ORDERS_PAGE_SIZE).get_page(request.GET.get('page'))
+    return render(request, 'bakery/my_orders.html', {'page_obj': page_obj})
+
+def order_detail(request, tracking_id):
+    # The tracking id is unguessable, so it is the order's link for guests too.
+    order = get_object_or_404(orders.with_details(Order.objects), tracking_id=tracking_id)
+    return render(request, 'bakery/order_confirmation.html', {
+        'order': order,
+        'order_date': order.order_date,
+        'expected_delivery': order.order_date + orders.DELIVERY_TIME,
+        'tracking_id': order.tracking_id,
+        'timeline': orders.timeline(order),
+    })
 
 
 @login_required(login_url='login')
 def clear_wishlist(request):
     user = request.user
     user.wishlist_items.all().delete()
+    invalidate_wishlist(user)
     return redirect('wishlist') 
 
+# Content of the mostly static pages, built once at import.
+ABOUT_CARDS = (
+    "images/card1.png",
+    "images/card2.png",
+    "images/card3.png",
+    "images/card4.png",
+    "images/card5.png",
+)
+
+HOME_BANNERS = (
+    {
+        'title': "Baked with Love, Served with Joy",
+        'subtitle': "Freshly baked breads, cakes, and pastries made daily with the finest ingredients",
+        'bannerImg': "images/slide1.png",
+        'arrowImg': "images/polygon.png",
+        'textClass': "text-dark",
+    },
+    {
+        'title': "Crafting Artisan Bakes Since 2012",
+        'subtitle': "Freshly baked breads, cakes, and pastries made daily with the fineExperience the rich tradition of baking with every bite.st ingredients",
+        'bannerImg': "images/slide2.png",
+        'arrowImg': "images/polygon2.png",
+        'textClass': "text-white",
+    },
+    {
+        'title': "Your Neighborhood Bakery",
+        'subtitle': "From oven to your table - fresh, warm, and delicious.",
+        'bannerImg': "images/slide3.png",
+        'arrowImg': "images/polygon3.png",
+        'textClass': "text-dark",
+    },
+    {
+        'title': "Fresh. Local. Handmade.",
+        'subtitle': "We bake daily so you can enjoy real flavor, every time.",
+        'bannerImg': "images/slide4.png",
+        'arrowImg': "images/polygon4.png",
+        'textClass': "text-dark",
+    },
+)
+
+HOME_TESTIMONIALS = (
+    {
+        "image": "images/user1.png",
+        "text": '"A hidden gem with real passion behind every bake."',
+        "subtext":'"You can taste the quality in every bite. It’s clear they care deeply about their craft."',
+        "author": "— Daniel K., Chef & Culinary Enthusiast",
+    },
+    {
+        "image": "images/user2.png",
+        "text": '"The kids love the cookies—and so do I!"',
+        "subtext":'"We stop by after school for their chocolate chip cookies. Soft, gooey, and always fresh."',
+        "author": "— Lena W., Mom of Two",
+    },
+    {
+        "image": "images/user3.png",
+        "text": '"Absolutely the nest bakery in town!"',
+        "subtext":'"From the moment you walk in,the smell is heavenly.Their sourdough is unmatched,and the staff is always so warm and welcoming."',
+        "author": "— Jessica M.,Local Foodie",
+    },
+    {
+        "image": "images/user4.png",
+        "text": '"Their croissants are the better than and I had in  Paris."',
+        "subtext":'"Crispy, buttery,and perfectly flasky—these croissants are pure perfection. I come here every weekend just for them!"',
+        "author": "— Mark R., Travel Blogger",
+    },
+    {
+        "image": "images/user5.png",
+        "text": '"Our wedding cake was everything we dreamed of."',
+        "subtext":'"Beautiful,delicious, and made with love. Thank you for making our special day unforgettable!"',
+        "author": "— Priya & Aaran, Newlyweds",
+    },
+)
+
+BRANCH_LOCATIONS = (
+    {"city": "Chennai", "addr": "No. 45, Anna Salai, T. Nagar, Chennai - 600017"},
+    {"city": "Coimbatore", "addr": "12, DB Road, RS Puram, Coimbatore - 641002"},
+    {"city": "Madurai", "addr": "28, KK Nagar Main Road, Madurai - 625020"},
+    {"city": "Tiruchirappalli (Trichy)", "addr": "7, Salai Road, Thillai Nagar, Trichy - 620018"},
+    {"city": "Salem", "addr": "15, Five Roads, Fairlands, Salem - 636016"},
+    {"city": "Tirunelveli", "addr": "11, South Bypass Road, Palayamkottai, Tirunelveli - 627002"},
+    {"city": "Erode", "addr": "9, Brough Road, Erode - 638001"},
+    {"city": "Vellore", "addr": "14, Katpadi Road, Gandhi Nagar, Vellore - 632006"},
+    {"city": "Thoothukudi (Tuticorin)", "addr": "6, Beach Road, Tuticorin - 628001"},
+    {"city": "Thanjavur", "addr": "10, Medical College Road, Thanjavur - 613004"},
+    {"city": "Dindigul", "addr": "4, GTN Road, Dindigul - 624005"},
+    {"city": "Kanchipuram", "addr": "3, Ekambaranathar Sannathi Street, Kanchipuram - 631502"},
+    {"city": "Karur", "addr": "22, Kovai Road, Karur - 639002"},
+    {"city": "Nagercoil", "addr": "16, Cape Road, Vadasery, Nagercoil - 629001"},
+    {"city": "Cuddalore", "addr": "8, Beach Road, Cuddalore - 607001"},
+    {"city": "Villupuram", "addr": "19, Tindivanam Road, Villupuram - 605602"},
+    {"city": "Namakkal", "addr": "5, Salem Road, Namakkal - 637001"},
+    {"city": "Tiruppur", "addr": "20, Avinashi Road, Tiruppur - 641603"},
+)
+
+CONTACT_PAGE_TITLE = 'Our Branches Across Tamil Nadu'
+
 @login_required(login_url='login')
 def about(request):
-    cards = [
-        "images/card1.png",
-        "images/card2.png",
-        "images/card3.png",
-        "images/card4.png",
-        "images/card5.png",
-    ]
-    return render(request, "bakery/about.html", {"cards": cards})
+    return render_cached(request, "bakery/about.html", {"cards": ABOUT_CARDS})
 
 @login_required(login_url='login')
 def blog(request):
-    return render(request, 'bakery/blog.html')
+    return render_cached(request, 'bakery/blog.html')
 
 @login_required(login_url='login')
 def home(request):
-    banners = [
-        {
-            'title': "Baked with Love, Served with Joy",
-            'subtitle': "Freshly baked breads, cakes, and pastries made daily with the finest ingredients",
-            'bannerImg': "images/slide1.png",
-            'arrowImg': "images/polygon.png",
-            'textClass': "text-dark",
-        },
-        {
-            'title': "Crafting Artisan Bakes Since 2012",
-            'subtitle': "Freshly baked breads, cakes, and pastries made daily with the fineExperience the rich tradition of baking with every bite.st ingredients",
-            'bannerImg': "images/slide2.png",
-            'arrowImg': "images/polygon2.png",
-            'textClass': "text-white",
-        },
-        {
-            'title': "Your Neighborhood Bakery",
-            'subtitle': "From oven to your table - fresh, warm, and delicious.",
-            'bannerImg': "images/slide3.png",
-            'arrowImg': "images/polygon3.png",
-            'textClass': "text-dark",
-        },
-        {
-            'title': "Fresh. Local. Handmade.",
-            'subtitle': "We bake daily so you can enjoy real flavor, every time.",
-            'bannerImg': "images/slide4.png",
-            'arrowImg': "images/polygon4.png",
-            'textClass': "text-dark",
-        },
-    ]
-    testimonials = [
-        {
-            "image": "images/user1.png",
-            "text": '"A hidden gem with real passion behind every bake."',
-            "subtext":'"You can taste the quality in every bite. It’s clear they care deeply about their craft."',
-            "author": "— Daniel K., Chef & Culinary Enthusiast",
-        },
-        {
-            "image": "images/user2.png",
-            "text": '"The kids love the cookies—and so do I!"',
-            "subtext":'"We stop by after school for their chocolate chip cookies. Soft, gooey, and always fresh."',
-            "author": "— Lena W., Mom of Two",
-        },
-        {
-            "image": "images/user3.png",
-            "text": '"Absolutely the nest bakery in town!"',
-            "subtext":'"From the moment you walk in,the smell is heavenly.Their sourdough is unmatched,and the staff is always so warm and welcoming."',
-            "author": "— Jessica M.,Local Foodie",
-        },
-        {
-            "image": "images/user4.png",
-            "text": '"Their croissants are the better than and I had in  Paris."',
-            "subtext":'"Crispy, buttery,and perfectly flasky—these croissants are pure perfection. I come here every weekend just for them!"',
-            "author": "— Mark R., Travel Blogger",
-        },
-        {
-            "image": "images/user5.png",
-            "text": '"Our wedding cake was everything we dreamed of."',
-            "subtext":'"Beautiful,delicious, and made with love. Thank you for making our special day unforgettable!"',
-            "author": "— Priya & Aaran, Newlyweds",
-        },
-    ]
-    return render(request, 'bakery/home.html', {
-        'banners': banners,
-        'testimonials': testimonials,
+    return render_cached(request, 'bakery/home.html', {
+        'banners': HOME_BANNERS,
+        'testimonials': HOME_TESTIMONIALS,
     })
 
 
 @login_required(login_url='login')
 def contact(request):
-    locations = [
-        {"city": "Chennai", "addr": "No. 45, Anna Salai, T. Nagar, Chennai - 600017"},
-        {"city": "Coimbatore", "addr": "12, DB Road, RS Puram, Coimbatore - 641002"},
-        {"city": "Madurai", "addr": "28, KK Nagar Main Road, Madurai - 625020"},
-        {"city": "Tiruchirappalli (Trichy)", "addr": "7, Salai Road, Thillai Nagar, Trichy - 620018"},
-        {"city": "Salem", "addr": "15, Five Roads, Fairlands, Salem - 636016"},
-        {"city": "Tirunelveli", "addr": "11, South Bypass Road, Palayamkottai, Tirunelveli - 627002"},
-        {"city": "Erode", "addr": "9, Brough Road, Erode - 638001"},
-        {"city": "Vellore", "addr": "14, Katpadi Road, Gandhi Nagar, Vellore - 632006"},
-        {"city": "Thoothukudi (Tuticorin)", "addr": "6, Beach Road, Tuticorin - 628001"},
-        {"city": "Thanjavur", "addr": "10, Medical College Road, Thanjavur - 613004"},
-        {"city": "Dindigul", "addr": "4, GTN Road, Dindigul - 624005"},
-        {"city": "Kanchipuram", "addr": "3, Ekambaranathar Sannathi Street, Kanchipuram - 631502"},
-        {"city": "Karur", "addr": "22, Kovai Road, Karur - 639002"},
-        {"city": "Nagercoil", "addr": "16, Cape Road, Vadasery, Nagercoil - 629001"},
-        {"city": "Cuddalore", "addr": "8, Beach Road, Cuddalore - 607001"},
-        {"city": "Villupuram", "addr": "19, Tindivanam Road, Villupuram - 605602"},
-        {"city": "Namakkal", "addr": "5, Salem Road, Namakkal - 637001"},
-        {"city": "Tiruppur", "addr": "20, Avinashi Road, Tiruppur - 641603"},
-    ]
-    
     if request.method == 'POST':
         errors = {}
         form_data = request.POST.copy() 
@@ -665,75 +721,85 @@ def contact(request):
         
         if not errors:
             try:
-                contact = ContactMessage.objects.create(
-                    user=request.user,
-                    name=name,
-                    email=email,
-                    phone=phone,
-                    subject=subject,
-                    message=message
-                )
-
-                send_mail(
-                    f'New Contact Message: {subject}',
-                    f'''From: {name} <{email}>
-Phone: {phone}
-User: {request.user.username}
-
-Message:
-{message}''',
-                    settings.DEFAULT_FROM_EMAIL,
-                    [settings.CONTACT_EMAIL],
-                    fail_silently=False,
-                )
+                with transaction.atomic():
+                    contact = ContactMessage.objects.create(
+                        user=request.user,
+                        name=name,
+                        email=email,
+                        phone=phone,
+                        subject=subject,
+                        message=message
+                    )
+
+                    # Mailed by the run_tasks worker, so a slow or failing
+                    # mail server never holds up (or fails) the request.
+                    tasks.enqueue(tasks.send_contact_notification, message_id=contact.pk)
                 form_data = {}
             
             except Exception as e:
                 errors['database'] = "Failed to save your message. Please try again."
         
         context = {
-            'locations': locations,
-            'page_title': 'Our Branches Across Tamil Nadu',
+            'locations': BRANCH_LOCATIONS,
+            'page_title': CONTACT_PAGE_TITLE,
             'errors': errors,
             'form_data': form_data
         }
         return render(request, 'bakery/contact.html', context)
 
-    context = {
-        'locations': locations,
-        'page_title': 'Our Branches Across Tamil Nadu'
-    }
-    return render(request, 'bakery/contact.html', context)
+    return render_cached(request, 'bakery/contact.html', {
+        'locations': BRANCH_LOCATIONS,
+        'page_title': CONTACT_PAGE_TITLE,
+    })
 
-from django.db.models import Q
+def _search_page(query, number):
+    page_obj = Paginator(search(query), SEARCH_PAGE_SIZE).get_page(number)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
 
 @login_required(login_url='login')
 def search_products(request):
     query = request.GET.get('q', '').strip() 
     products = []
     categories = []
+    page_obj = None
 
     if query:
-        products = Product.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query)
-        ).select_related('category')
-
-        categories = ProductCategory.objects.filter(products__in=products).distinct()
-    if request.user.is_authenticated:
-        wishlist_ids = Wishlist.objects.filter(
-            user=request.user,
-            product__in=products
-        ).values_list('product_id', flat=True)
-    else:
-        wishlist_ids = []
+        page_obj = _search_page(query, request.GET.get('page'))
+        products = page_obj.object_list
 
-    for product in products:
-        product.is_in_wishlist = product.id in wishlist_ids
+        categories = list({product.category_id: product.category for product in products}.values())
 
     return render(request, 'bakery/search_results.html', {
         'query': query,
         'products': products,
         'categories': categories,
+        'page_obj': page_obj,
+    })
+
+@login_required(login_url='login')
+def search_more(request):
+    """Infinite-scroll fragment: the next page of search results as HTML."""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'html': '', 'next': None})
+
+    page_obj = _search_page(query, request.GET.get('page'))
+    html = render_to_string(
+        'bakery/include/search_result_cards.html', {'products': page_obj.object_list}, request=request,
+    )
+    next_url = None
+    if page_obj.has_next():
+        next_url = f"{reverse('search_more')}?{urlencode({'q': query, 'page': page_obj.next_page_number()})}"
+    return JsonResponse({'html': html, 'next': next_url})
+
+def search_suggest(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(int(request.GET.get('limit', SUGGEST_LIMIT)), SUGGEST_LIMIT)
+    except ValueError:
+        limit = SUGGEST_LIMIT
+    return JsonResponse({
+        'query': query,
+        'suggestions': suggestion_index.lookup(query, limit),
     })
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Wishlist
+
+_USER_ATTR = '_wishlist_product_ids'
+
+
+def _cache_key(user_id):
+    return f"bakery:wishlist:{user_id}"
+
+
+def wishlist_product_ids(user):
+    """
+    Frozenset of the product ids in ``user``'s wishlist.
+
+    The set is memoised on the user object, so every view, template and
+    ``Product.in_wishlist`` call during one request shares a single query.
+    With ``WISHLIST_CACHE_TIMEOUT`` set it is also kept in the shared cache
+    between requests until the wishlist changes.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    ids = getattr(user, _USER_ATTR, None)
+    if ids is not None:
+        return ids
+
+    timeout = getattr(settings, 'WISHLIST_CACHE_TIMEOUT', 0)
+    if timeout:
+        ids = cache.get(_cache_key(user.pk))
+    if ids is None:
+        ids = frozenset(
+            Wishlist.objects.filter(user=user).values_list('product_id', flat=True)
+        )
+        if timeout:
+            cache.set(_cache_key(user.pk), ids, timeout)
+
+    setattr(user, _USER_ATTR, ids)
+    return ids
+
+
+def invalidate_wishlist(user):
+    """Drop the memoised and cached id set after the wishlist was modified."""
+    if hasattr(user, _USER_ATTR):
+        delattr(user, _USER_ATTR)
+    if getattr(settings, 'WISHLIST_CACHE_TIMEOUT', 0):
+        cache.delete(_cache_key(user.pk))
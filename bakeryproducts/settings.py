@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+import dj_database_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,7 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'bakery.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,6 +65,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'bakery.context_processors.wishlist',
+                'bakery.context_processors.cart_summary',
             ],
         },
     },
@@ -82,11 +86,100 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep each worker's connection open between requests.
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent
+            # writers wait on busy_timeout instead of failing to upgrade a
+            # read lock with "database is locked".
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # A file rather than the in-memory default, so tests that write from
+        # several threads get the same locking (busy_timeout, IMMEDIATE) as
+        # the site.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Applied to every new SQLite connection by bakery.signals.configure_sqlite.
+# The journal mode is not among them: it is stored in the database file, so
+# a deployment switches to WAL once with "manage.py enable_wal" (and the
+# development database in the repository is not rewritten by every run).
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,  # KiB
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY',
+}
+
+# DATABASE_URL=postgres://... switches to PostgreSQL with psycopg's
+# connection pool (requires psycopg[pool]); DATABASE_POOL=0 falls back to
+# persistent per-worker connections.
+if os.environ.get('DATABASE_URL'):
+    DATABASES['default'] = dj_database_url.parse(
+        os.environ['DATABASE_URL'],
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', 600)),
+        conn_health_checks=True,
+    )
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+    elif (DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+            and os.environ.get('DATABASE_POOL', '1') != '0'):
+        # Pooled connections replace persistent ones.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN', 2)),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX', 10)),
+        }
+
 AUTH_USER_MODEL = 'bakery.CustomUser'  
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# CACHE_BACKEND picks the shared cache: 'locmem' (per process, the
+# default), 'file' (shared by the workers on one host) or 'redis' (shared by
+# every host; needs the redis package).  CACHE_LOCATION overrides the
+# directory or URL.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'bakery'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'locmem')]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('CACHE_LOCATION', _cache_location),
+    }
+}
+
+# Seconds the rendered home, about, blog and contact pages are reused
+# (bakery.pagecache); 0 renders them on every request.
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 600))
+
+# Seconds a user's wishlist product ids stay in the shared cache between
+# requests; 0 keeps them for the current request only.
+WISHLIST_CACHE_TIMEOUT = 0
+
+# Seconds a process keeps using the catalogue version it last read from the
+# database (bakery.catalogue) before reading it again: how long another
+# worker's catalogue edit may take to show up in this one.
+CATALOGUE_VERSION_TTL = float(os.environ.get('CATALOGUE_VERSION_TTL', 2))
+
+# Route the catalogue, search and wishlist pages to their async versions
+# (bakery.async_views).  bakeryproducts.asgi turns this on unless
+# ASYNC_VIEWS=0; WSGI serves the sync views.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
+# Mail is sent by the run_tasks worker (bakery.tasks), never in a request.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+CONTACT_EMAIL = os.environ.get('CONTACT_EMAIL', DEFAULT_FROM_EMAIL)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -132,6 +225,15 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic minifies our CSS/JS, fingerprints every file and writes
+# gzip/Brotli copies; WhiteNoise serves the fingerprinted names with a
+# far-future immutable Cache-Control.  Only the hashed copies are kept.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'bakery.storage.StaticFilesStorage'},
+}
+WHITENOISE_KEEP_ONLY_HASHED_FILES = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,26 @@
+# Gunicorn deployment profiles.
+#
+#   WSGI (sync workers):  gunicorn bakeryproducts.wsgi
+#   ASGI (uvicorn):       GUNICORN_PROFILE=asgi gunicorn bakeryproducts.asgi:application
+#
+# Both read this file from the project root.  The sync profile serves the
+# plain sync views without any async/sync adaptation.  Under ASGI the
+# catalogue, search and wishlist pages are served by their async versions
+# (bakery.async_views) on each worker's event loop, other views from its
+# thread pool; ASYNC_VIEWS=0 keeps the sync versions there too.
+#
+# On SQLite, run "python manage.py enable_wal" once before the first start.
+import multiprocessing
+import os
+
+profile = os.environ.get('GUNICORN_PROFILE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+timeout = 30
+keepalive = 5
+
+if profile == 'asgi':
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    worker_class = 'sync'
@@ -0,0 +1,6 @@
+document.addEventListener('DOMContentLoaded',function(){const cart=document.getElementById('cart');if(!cart){return;}
+const FLUSH_DELAY=400;const pending=new Map();let timer=null;function csrfToken(){const input=document.querySelector('[name=csrfmiddlewaretoken]');return input?input.value:'';}
+function queueUpdate(itemId,quantity){pending.set(itemId,parseInt(quantity));clearTimeout(timer);timer=setTimeout(flush,FLUSH_DELAY);}
+function flush(){if(!pending.size){return;}
+const updates=Array.from(pending,([itemId,quantity])=>({item_id:itemId,quantity:quantity}));pending.clear();fetch(cart.dataset.bulkUrl,{method:'POST',keepalive:true,headers:{'Content-Type':'application/json','X-CSRFToken':csrfToken()},body:JSON.stringify({updates:updates})}).then(response=>response.json()).then(data=>{if(data.success){location.reload();}});}
+document.querySelectorAll('.increment').forEach(btn=>{btn.addEventListener('click',function(){const input=this.parentNode.querySelector('.quantity');input.value=parseInt(input.value)+1;queueUpdate(this.dataset.itemId,input.value);});});document.querySelectorAll('.decrement').forEach(btn=>{btn.addEventListener('click',function(){const input=this.parentNode.querySelector('.quantity');if(input.value>1){input.value=parseInt(input.value)-1;queueUpdate(this.dataset.itemId,input.value);}});});document.querySelectorAll('.quantity').forEach(input=>{input.addEventListener('change',function(){if(parseInt(this.value)>=1){queueUpdate(this.dataset.itemId,this.value);}});});document.querySelectorAll('.remove').forEach(btn=>{btn.addEventListener('click',function(){queueUpdate(this.dataset.itemId,0);clearTimeout(timer);flush();});});window.addEventListener('pagehide',flush);});
\ No newline at end of file
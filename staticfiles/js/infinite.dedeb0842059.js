@@ -0,0 +1,3 @@
+document.addEventListener('DOMContentLoaded',function(){if(!('IntersectionObserver'in window)){return;}
+document.querySelectorAll('[data-infinite-scroll]').forEach(sentinel=>{const grid=document.querySelector(sentinel.dataset.infiniteScroll);let loading=false;sentinel.style.visibility='hidden';const observer=new IntersectionObserver(entries=>{if(!entries[0].isIntersecting||loading){return;}
+loading=true;fetch(sentinel.dataset.nextUrl,{headers:{'X-Requested-With':'XMLHttpRequest'}}).then(response=>response.json()).then(data=>{grid.insertAdjacentHTML('beforeend',data.html);if(data.next){sentinel.dataset.nextUrl=data.next;observer.unobserve(sentinel);observer.observe(sentinel);}else{observer.disconnect();sentinel.remove();}}).catch(()=>{observer.disconnect();sentinel.style.visibility='';}).finally(()=>{loading=false;});},{rootMargin:'400px'});observer.observe(sentinel);});});
\ No newline at end of file